@@ -8,7 +8,7 @@ import logging
 import uuid
 import time
 from datetime import datetime
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
 from enum import Enum
 import os
 
@@ -287,6 +287,100 @@ class LogManager:
         logger = self.get_logger(LogType.USER)
         logger.info(f"[QUERY_RESPONSE] query_id={query_id}, response=\"{response}\", duration={duration}ms")
     
+    def log_query_classify_start(self, query_id: str, query: str):
+        """
+        Log the start of query classification
+        
+        Args:
+            query_id: Query identifier
+            query: Raw query text
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.debug(f"[QUERY_CLASSIFY_START] query_id={query_id}, query=\"{query}\"")
+    
+    def log_query_pattern_check(self, query_id: str, pattern: Any, query_type: str):
+        """
+        Log a classifier pattern being checked
+        
+        Args:
+            query_id: Query identifier
+            pattern: Pattern checked
+            query_type: Query type the pattern belongs to
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.debug(f"[QUERY_PATTERN_CHECK] query_id={query_id}, type={query_type}, pattern={pattern}")
+    
+    def log_query_pattern_match(self, query_id: str, query_type: str, pattern: Any):
+        """
+        Log the classifier pattern that matched
+        
+        Args:
+            query_id: Query identifier
+            query_type: Matched query type
+            pattern: Matching pattern
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.debug(f"[QUERY_PATTERN_MATCH] query_id={query_id}, type={query_type}, pattern={pattern}")
+    
+    def log_query_classify_result(self, query_id: str, query_type: str, confidence: float):
+        """
+        Log the final query classification
+        
+        Args:
+            query_id: Query identifier
+            query_type: Classified query type
+            confidence: Classification confidence
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.info(f"[QUERY_CLASSIFY_RESULT] query_id={query_id}, type={query_type}, confidence={confidence}")
+    
+    def log_query_process_start(self, query_id: str, query: str, state_keys: List[str]):
+        """
+        Log the start of query processing
+        
+        Args:
+            query_id: Query identifier
+            query: Raw query text
+            state_keys: Keys of the current state passed to the processor
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.info(f"[QUERY_PROCESS_START] query_id={query_id}, query=\"{query}\", state_keys={state_keys}")
+    
+    def log_query_state_lookup(self, query_id: str, state_found: bool, state_info: Dict[str, Any]):
+        """
+        Log the state lookup for a query
+        
+        Args:
+            query_id: Query identifier
+            state_found: Whether state data was available
+            state_info: Summary of the state data
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.info(f"[QUERY_STATE_LOOKUP] query_id={query_id}, found={state_found}, info={state_info}")
+    
+    def log_query_response_generate(self, query_id: str, response_type: str, response_length: int):
+        """
+        Log template response generation
+        
+        Args:
+            query_id: Query identifier
+            response_type: Kind of response generated
+            response_length: Length of the response text
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.info(f"[QUERY_RESPONSE_GENERATE] query_id={query_id}, type={response_type}, length={response_length}")
+    
+    def log_query_process_complete(self, query_id: str, processing_time: float):
+        """
+        Log the end of query processing
+        
+        Args:
+            query_id: Query identifier
+            processing_time: Processing time in milliseconds
+        """
+        logger = self.get_logger(LogType.USER)
+        logger.info(f"[QUERY_PROCESS_COMPLETE] query_id={query_id}, duration={processing_time:.2f}ms")
+    
     # Flow tracking logging methods
     def log_flow_start(self, flow_id: str, flow_type: str):
         """
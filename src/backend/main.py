@@ -20,7 +20,7 @@ import uuid
 
 # Import State Tracker and Loggers
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
-from state_tracker import get_state_tracker
+from state_tracker import get_state_tracker, get_session_registry
 
 # Import custom logging modules (avoid conflict with built-in logging)
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'logging'))
@@ -204,6 +204,8 @@ def preprocess_image(image_url):
 class ChatCompletionRequest(BaseModel):
     max_tokens: Optional[int] = None
     messages: List[Dict[str, Any]]
+    # Backend-only options (skip_state_tracker, session_id); not forwarded to the model
+    metadata: Optional[Dict[str, Any]] = None
 
 @app.post("/v1/chat/completions")
 async def proxy_chat_completions(request: ChatCompletionRequest):
@@ -219,8 +221,10 @@ async def proxy_chat_completions(request: ChatCompletionRequest):
     
     # 檢查是否為 Fallback 請求
     skip_state_tracker = False
+    session_id = None  # Session/camera whose State Tracker receives this frame
     if hasattr(request, 'metadata') and request.metadata:
         skip_state_tracker = request.metadata.get("skip_state_tracker", False)
+        session_id = request.metadata.get("session_id")
     
     try:
         logger.info(f"[{request_id}] Processing request with model: {ACTIVE_MODEL}")
@@ -317,8 +321,10 @@ async def proxy_chat_completions(request: ChatCompletionRequest):
             # Log sanitized messages
             logger.info(f"[{request_id}] Received messages: {json.dumps(sanitized_messages, indent=2)}")
             
-            # Process images and store original image data for state tracker
+            # Process images and store the first frame for the state tracker
             original_image_data = None
+            frame_image_data = None
+            frame_processed = False
             for message in request.messages:
                 if isinstance(message.get('content'), list):
                     for content_item in message['content']:
@@ -340,8 +346,17 @@ async def proxy_chat_completions(request: ChatCompletionRequest):
                                     logger.warning(f"[{request_id}] Failed to extract original image data: {e}")
                             
                             # Apply enhanced image processing
-                            content_item['image_url']['url'] = preprocess_image(original_url)
+                            processed_url = preprocess_image(original_url)
+                            content_item['image_url']['url'] = processed_url
                             image_count += 1
+                            
+                            # Keep the frame as sent to the model so the image fallback can reuse it
+                            if frame_image_data is None and original_image_data is not None:
+                                if processed_url != original_url:
+                                    frame_image_data = base64.b64decode(processed_url.split(',', 1)[1])
+                                    frame_processed = True
+                                else:
+                                    frame_image_data = original_image_data
             
             image_processing_time = time.time() - image_processing_start
             logger.info(f"[{request_id}] Image processing completed in {image_processing_time:.2f}s")
@@ -361,7 +376,7 @@ async def proxy_chat_completions(request: ChatCompletionRequest):
             logger.info(f"[{request_id}] Message formatting completed in {format_time:.2f}s")
             
             # Prepare request for model
-            request_data = request.model_dump()
+            request_data = request.model_dump(exclude={"metadata"})
             logger.info(f"[{request_id}] Sending request to model server")
             
             # 計算提示詞長度用於日誌記錄
@@ -489,11 +504,12 @@ async def proxy_chat_completions(request: ChatCompletionRequest):
                                     
                                     # Process state tracker integration
                                     state_tracker_start = time.time()
-                                    state_tracker = get_state_tracker()
+                                    state_tracker = get_state_tracker(session_id)
                                     state_updated = await state_tracker.process_vlm_response(
                                         vlm_text, 
                                         observation_id, 
-                                        image_data=original_image_data
+                                        image_data=frame_image_data,
+                                        image_processed=frame_processed
                                     )
                                     state_tracker_time = time.time() - state_tracker_start
                                     
@@ -581,10 +597,10 @@ async def health_check():
     }
 
 @app.get("/api/v1/state")
-async def get_current_state():
+async def get_current_state(session_id: Optional[str] = None):
     """Get current state from State Tracker"""
     try:
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(session_id)
         current_state = state_tracker.get_current_state()
         summary = state_tracker.get_state_summary()
         
@@ -598,10 +614,10 @@ async def get_current_state():
         raise HTTPException(status_code=500, detail=f"Error getting state: {str(e)}")
 
 @app.get("/api/v1/state/metrics")
-async def get_processing_metrics():
+async def get_processing_metrics(session_id: Optional[str] = None):
     """Get quantifiable processing metrics"""
     try:
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(session_id)
         metrics = state_tracker.get_processing_metrics()
         summary = state_tracker.get_metrics_summary()
         
@@ -615,10 +631,10 @@ async def get_processing_metrics():
         raise HTTPException(status_code=500, detail=f"Error getting metrics: {str(e)}")
 
 @app.get("/api/v1/state/memory")
-async def get_memory_stats():
+async def get_memory_stats(session_id: Optional[str] = None):
     """Get sliding window memory management statistics"""
     try:
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(session_id)
         memory_stats = state_tracker.get_memory_stats()
         sliding_window_data = state_tracker.get_sliding_window_data()
         history_analysis = state_tracker.get_state_history_analysis()
@@ -658,7 +674,7 @@ async def process_vlm_text(request: dict):
         visual_logger.log_rag_data_transfer(observation_id, vlm_text, True)
         
         state_tracker_start = time.time()
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(request.get("session_id"))
         result = await state_tracker.process_vlm_response(vlm_text, observation_id, image_data=None)
         state_tracker_time = time.time() - state_tracker_start
         current_state = state_tracker.get_current_state()
@@ -736,14 +752,15 @@ async def process_instant_query(request: dict):
         # 新增：獲取 query_id（向後兼容）
         query_id = request.get("query_id")
         
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(request.get("session_id"))
         
         # 修改：傳遞 query_id（如果有的話）
+        # VLM fallback is awaited, so other requests keep being served meanwhile
         if query_id:
-            result = state_tracker.process_instant_query(query, query_id=query_id)
+            result = await state_tracker.process_instant_query_async(query, query_id=query_id)
         else:
             # 向後兼容：如果沒有 query_id，使用現有邏輯
-            result = state_tracker.process_instant_query(query)
+            result = await state_tracker.process_instant_query_async(query)
         
         # Validate result
         if not result or not hasattr(result, 'response_text'):
@@ -765,10 +782,10 @@ async def process_instant_query(request: dict):
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 @app.get("/api/v1/state/query/capabilities")
-async def get_query_capabilities():
+async def get_query_capabilities(session_id: Optional[str] = None):
     """Get query processing capabilities and examples"""
     try:
-        state_tracker = get_state_tracker()
+        state_tracker = get_state_tracker(session_id)
         capabilities = state_tracker.get_query_capabilities()
         
         return {
@@ -779,6 +796,21 @@ async def get_query_capabilities():
         logger.error(f"Error getting query capabilities: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting capabilities: {str(e)}")
 
+@app.get("/api/v1/state/sessions")
+async def get_state_sessions():
+    """Get active State Tracker sessions and eviction statistics"""
+    try:
+        registry = get_session_registry()
+        registry.evict_idle()
+        
+        return {
+            "status": "success",
+            "sessions": registry.get_stats()
+        }
+    except Exception as e:
+        logger.error(f"Error getting sessions: {e}")
+        raise HTTPException(status_code=500, detail=f"Error getting sessions: {str(e)}")
+
 @app.get("/api/v1/config")
 async def get_full_config():
     """Return the complete merged configuration including app config and active model config"""
@@ -984,4 +1016,7 @@ if __name__ == "__main__":
         system_logger.log_system_shutdown()
     except Exception as e:
         system_logger.log_error("server_startup", str(e))
-        raise
\ No newline at end of file
+        raise
+    finally:
+        # Flush pending State Tracker journal events before exiting
+        get_session_registry().close()
\ No newline at end of file
@@ -8,9 +8,12 @@ and visual cues for intelligent semantic matching.
 
 try:
     from .knowledge_base import RAGKnowledgeBase
-    from .task_loader import TaskKnowledgeLoader, TaskKnowledge, TaskStep
+    from .task_loader import TaskKnowledgeLoader, TaskKnowledge, TaskStep, TaskLoadError
     from .vector_search import ChromaVectorSearchEngine, MatchResult
     from .vector_optimizer import VectorOptimizer
+    from .lexical_index import LexicalIndex
+    from .encoders import Encoder, SentenceTransformerEncoder, OnnxEncoder, HashingEncoder, create_encoder
+    from .encode_batcher import EncodeBatcher
     from .validation import TaskKnowledgeValidator, validate_task_file
     from .performance_tester import PerformanceTester
     from .task_models import TaskStep, TaskKnowledge, MatchResult
@@ -20,9 +23,12 @@ except ImportError:
     import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
     from src.memory.rag.knowledge_base import RAGKnowledgeBase
-    from src.memory.rag.task_loader import TaskKnowledgeLoader, TaskKnowledge, TaskStep
+    from src.memory.rag.task_loader import TaskKnowledgeLoader, TaskKnowledge, TaskStep, TaskLoadError
     from src.memory.rag.vector_search import ChromaVectorSearchEngine, MatchResult
     from src.memory.rag.vector_optimizer import VectorOptimizer
+    from src.memory.rag.lexical_index import LexicalIndex
+    from src.memory.rag.encoders import Encoder, SentenceTransformerEncoder, OnnxEncoder, HashingEncoder, create_encoder
+    from src.memory.rag.encode_batcher import EncodeBatcher
     from src.memory.rag.validation import TaskKnowledgeValidator, validate_task_file
     from src.memory.rag.performance_tester import PerformanceTester
     from src.memory.rag.task_models import TaskStep, TaskKnowledge, MatchResult
@@ -32,9 +38,17 @@ __all__ = [
     'TaskKnowledgeLoader',
     'TaskKnowledge',
     'TaskStep',
+    'TaskLoadError',
     'ChromaVectorSearchEngine',
     'MatchResult',
     'VectorOptimizer',
+    'LexicalIndex',
+    'Encoder',
+    'SentenceTransformerEncoder',
+    'OnnxEncoder',
+    'HashingEncoder',
+    'create_encoder',
+    'EncodeBatcher',
     'TaskKnowledgeValidator',
     'validate_task_file',
     'PerformanceTester',
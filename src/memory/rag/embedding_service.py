@@ -0,0 +1,653 @@
+"""
+Local Embedding/Search Service
+
+Hosts one RAGKnowledgeBase (encoder + ChromaDB index) behind a small
+localhost HTTP API so several backend worker processes can share it instead
+of each loading their own model and vector store.
+
+Endpoints (JSON):
+    GET  /v1/health   encoder and task information
+    GET  /v1/stats    knowledge base statistics
+    POST /v1/encode   {"texts": [...]} -> {"embeddings": [[...], ...]}
+    POST /v1/search   {"queries": [{"observation", "task_name", "top_k", "step_ids", "embedding",
+                                    "widen_below"}]}
+                      -> {"results": [{"matches": [match, ...], "widened": bool}, ...]}
+
+A query with ``widen_below`` is a locality-first search: when its best match
+(within task_name/step_ids) scores below the threshold, the service repeats
+it over the full index with the same embedding, in the same request.
+
+Workers use RemoteVectorSearchEngine (a thin client with batched requests)
+in place of ChromaVectorSearchEngine; see RAGKnowledgeBase(embedding_service_url=...).
+
+Usage (from the src directory):
+    python -m memory.rag.embedding_service --port 8765 --tasks ../data/tasks
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import numpy as np
+
+from .encode_batcher import EncodeBatcher
+from .encoders import Encoder, load_rag_config
+from .thread_counters import ThreadLocalCounters
+from .task_loader import TaskKnowledge, TaskStep
+from .vector_search import MatchResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SERVICE_URL = "http://127.0.0.1:8765"
+
+
+class EmbeddingServiceError(Exception):
+    """Raised when the embedding service cannot be reached or rejects a request"""
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class EmbeddingService:
+    """
+    HTTP front end for a shared knowledge base
+
+    Search requests are handled as a batch: all observations without a
+    precomputed embedding are encoded in one encoder call before the
+    per-query index lookups.
+    """
+
+    def __init__(self, knowledge_base, host: str = "127.0.0.1", port: int = 8765):
+        """
+        Initialize the service
+
+        Args:
+            knowledge_base: Initialized RAGKnowledgeBase to serve
+            host: Interface to bind (keep on localhost)
+            port: TCP port (0 picks a free port)
+        """
+        self.knowledge_base = knowledge_base
+        self.server = ThreadingHTTPServer((host, port), self._make_handler())
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+        self.request_count = 0
+        self.query_count = 0
+        self._stats_lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL the service is reachable at"""
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; avoid delayed-ACK stalls
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                logger.debug("embedding service: " + format % args)
+
+            def _send_json(self, status: int, payload: Dict[str, Any]) -> None:
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _read_json(self) -> Dict[str, Any]:
+                length = int(self.headers.get("Content-Length", 0))
+                return json.loads(self.rfile.read(length) or b"{}")
+
+            def do_GET(self):
+                if self.path == "/v1/health":
+                    self._send_json(200, service.health())
+                elif self.path == "/v1/stats":
+                    self._send_json(200, service.stats())
+                else:
+                    self._send_json(404, {"error": f"Unknown path: {self.path}"})
+
+            def do_POST(self):
+                try:
+                    payload = self._read_json()
+                    if self.path == "/v1/encode":
+                        self._send_json(200, service.encode(payload.get("texts", [])))
+                    elif self.path == "/v1/search":
+                        self._send_json(200, service.search(payload.get("queries", [])))
+                    else:
+                        self._send_json(404, {"error": f"Unknown path: {self.path}"})
+                except Exception as e:
+                    logger.error(f"Embedding service request failed: {str(e)}")
+                    self._send_json(500, {"error": str(e)})
+
+        return Handler
+
+    def health(self) -> Dict[str, Any]:
+        """Describe the hosted encoder and tasks"""
+        engine = self.knowledge_base.vector_engine
+        return {
+            "status": "ok",
+            "model_name": engine.model_name,
+            "model_version": engine.model_version,
+            "tasks": sorted(self.knowledge_base.loaded_tasks)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Service and knowledge base statistics"""
+        with self._stats_lock:
+            counters = {"requests": self.request_count, "queries": self.query_count}
+        return {"service": counters, "knowledge_base": self.knowledge_base.get_system_stats()}
+
+    def _count(self, queries: int) -> None:
+        with self._stats_lock:
+            self.request_count += 1
+            self.query_count += queries
+
+    def encode(self, texts: List[str]) -> Dict[str, Any]:
+        """Encode texts in one batch"""
+        self._count(len(texts))
+        if not texts:
+            return {"embeddings": []}
+        embeddings = self._encode_texts(list(texts))
+        return {"embeddings": np.asarray(embeddings, dtype=np.float32).tolist()}
+
+    def _encode_texts(self, texts: List[str]) -> Any:
+        """
+        Encode texts, coalescing single-text requests from concurrent workers
+
+        Each request is handled on its own thread, so single observations
+        from different workers go through the engine's micro-batcher (when
+        it has one) and share encoder calls.
+        """
+        engine = self.knowledge_base.vector_engine
+        batcher = getattr(engine, "encode_batcher", None)
+        if batcher is not None and len(texts) == 1:
+            return [batcher.encode(texts[0])]
+        return engine.model.encode(texts, show_progress_bar=False)
+
+    def search(self, queries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run a batch of searches
+
+        Args:
+            queries: Search parameters per query
+
+        Returns:
+            {"results": [{"matches": [match, ...], "widened": bool}, ...]} in query order
+        """
+        self._count(len(queries))
+        engine = self.knowledge_base.vector_engine
+
+        # Encode every query that did not bring its own embedding in one call
+        missing = [i for i, query in enumerate(queries) if query.get("embedding") is None and query.get("observation")]
+        embeddings = {}
+        if missing:
+            encoded = self._encode_texts([queries[i]["observation"] for i in missing])
+            embeddings = dict(zip(missing, encoded))
+
+        results = []
+        for i, query in enumerate(queries):
+            arguments = {
+                "top_k": query.get("top_k", 1),
+                "observation_id": query.get("observation_id"),
+                "query_embedding": query.get("embedding") if query.get("embedding") is not None else embeddings.get(i)
+            }
+            widened = False
+            if query.get("widen_below") is not None:
+                matches, widened = engine.find_best_match_local_first(
+                    query.get("observation", ""), query.get("task_name"), query.get("step_ids"),
+                    query["widen_below"], **arguments
+                )
+            else:
+                matches = engine.find_best_match(
+                    query.get("observation", ""), query.get("task_name"), step_ids=query.get("step_ids"), **arguments
+                )
+            results.append({
+                "matches": [
+                    {
+                        "task_name": match.task_name,
+                        "step_id": match.step_id,
+                        "similarity": match.similarity,
+                        "dense_similarity": match.dense_similarity,
+                        "lexical_score": match.lexical_score,
+                        "matched_cues": match.matched_cues
+                    }
+                    for match in matches
+                ],
+                "widened": widened
+            })
+        return {"results": results}
+
+    def start(self) -> None:
+        """Serve requests in a background thread"""
+        self._thread = threading.Thread(target=self.server.serve_forever, name="embedding-service", daemon=True)
+        self._thread.start()
+        logger.info(f"Embedding service listening on {self.url}")
+
+    def serve_forever(self) -> None:
+        """Serve requests in the calling thread"""
+        logger.info(f"Embedding service listening on {self.url}")
+        self.server.serve_forever()
+
+    def stop(self) -> None:
+        """Stop serving and close the socket"""
+        self.server.shutdown()
+        self.server.server_close()
+        if self._thread:
+            self._thread.join(5.0)
+            self._thread = None
+
+
+# ---------------------------------------------------------------------------
+# Client
+# ---------------------------------------------------------------------------
+
+class EmbeddingServiceClient:
+    """
+    Thin JSON client for the embedding service
+
+    Keeps one persistent HTTP connection per calling thread.
+    """
+
+    def __init__(self, base_url: str = DEFAULT_SERVICE_URL, timeout: float = 10.0):
+        """
+        Args:
+            base_url: Service URL (e.g. http://127.0.0.1:8765)
+            timeout: Socket timeout in seconds
+        """
+        parsed = urlparse(base_url)
+        self.base_url = base_url
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+        self._counters = ThreadLocalCounters("requests", "request_time")
+
+    @property
+    def request_count(self) -> int:
+        return int(self._counters.get("requests"))
+
+    @property
+    def total_request_time(self) -> float:
+        return self._counters.get("request_time")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            self._local.connection = connection
+        return connection
+
+    def _request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body is not None else {}
+        start_time = time.time()
+
+        # Retry once on a stale keep-alive connection
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = json.loads(response.read() or b"{}")
+                break
+            except (http.client.HTTPException, ConnectionError, OSError) as e:
+                connection.close()
+                self._local.connection = None
+                if attempt == 1:
+                    raise EmbeddingServiceError(f"Embedding service unreachable at {self.base_url}: {str(e)}")
+
+        self._counters.add("requests")
+        self._counters.add("request_time", time.time() - start_time)
+
+        if response.status != 200:
+            raise EmbeddingServiceError(f"Embedding service error {response.status}: {data.get('error')}")
+        return data
+
+    def health(self) -> Dict[str, Any]:
+        return self._request("GET", "/v1/health")
+
+    def stats(self) -> Dict[str, Any]:
+        return self._request("GET", "/v1/stats")
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        return self._request("POST", "/v1/encode", {"texts": list(texts)})["embeddings"]
+
+    def search(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return self._request("POST", "/v1/search", {"queries": queries})["results"]
+
+
+class _SearchBatch:
+    """
+    Adapts the /v1/search endpoint to the encode(list) interface EncodeBatcher
+    expects, so concurrent single-query searches share one request
+    """
+
+    def __init__(self, client: EmbeddingServiceClient):
+        self.client = client
+
+    def encode(self, queries: List[Dict[str, Any]], **kwargs) -> List[Dict[str, Any]]:
+        return self.client.search(list(queries))
+
+
+class RemoteEncoder(Encoder):
+    """Encoder that delegates to the embedding service"""
+
+    backend = "remote"
+
+    def __init__(self, client: EmbeddingServiceClient, name: str, version: str):
+        super().__init__(name)
+        self.client = client
+        self._version = version
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return np.asarray(self.client.encode(texts), dtype=np.float32)
+
+
+class RemoteVectorSearchEngine:
+    """
+    Drop-in replacement for ChromaVectorSearchEngine backed by the service
+
+    Task data stays in this process (results are rebuilt from the local step
+    table); only encoding and index lookups go over the wire. Index updates
+    are owned by the service, which watches the same task directory.
+    """
+
+    def __init__(self,
+                 base_url: str = DEFAULT_SERVICE_URL,
+                 timeout: float = 10.0,
+                 micro_batch_size: int = 16,
+                 micro_batch_wait_ms: float = 2.0):
+        """
+        Connect to a running embedding service
+
+        Args:
+            base_url: Service URL
+            timeout: Socket timeout in seconds
+            micro_batch_size: Maximum single-query searches coalesced into one
+                request (1 disables search micro-batching)
+            micro_batch_wait_ms: Maximum time a search waits for others to join
+
+        Raises:
+            EmbeddingServiceError: If the service is not reachable
+        """
+        self.client = EmbeddingServiceClient(base_url, timeout)
+        health = self.client.health()
+
+        self.model_name = health["model_name"]
+        self.model_version = health["model_version"]
+        self.model = RemoteEncoder(self.client, self.model_name, self.model_version)
+        self.collection_name = f"remote:{base_url}"
+
+        # Replaced (never mutated) on every change so searches read them without locking
+        self.task_knowledge: Dict[str, TaskKnowledge] = {}
+        self.step_table: Dict[Tuple[str, int], TaskStep] = {}
+        self._index_lock = threading.RLock()  # serializes writers
+
+        self._counters = ThreadLocalCounters("searches", "search_time")
+
+        # Single-query searches from concurrent threads share /v1/search requests
+        self.search_batcher: Optional[EncodeBatcher] = None
+        if micro_batch_size > 1:
+            self.search_batcher = EncodeBatcher(_SearchBatch(self.client), micro_batch_size, micro_batch_wait_ms)
+
+        logger.info(f"Using embedding service at {base_url} ({self.model_name}@{self.model_version})")
+
+    @property
+    def search_count(self) -> int:
+        return int(self._counters.get("searches"))
+
+    @property
+    def total_search_time(self) -> float:
+        return self._counters.get("search_time")
+
+    def add_task_knowledge(self, task: TaskKnowledge, embeddings: Optional[Dict[int, Any]] = None) -> None:
+        """Register a task locally so remote results can be resolved to steps"""
+        self.add_tasks_knowledge([task])
+
+    def add_tasks_knowledge(self,
+                            tasks: List[TaskKnowledge],
+                            embeddings: Optional[Dict[str, Dict[int, Any]]] = None) -> None:
+        """Register several tasks locally with a single table swap"""
+        with self._index_lock:
+            task_knowledge, step_table = self._without(*(task.task_name for task in tasks))
+            for task in tasks:
+                task_knowledge[task.task_name] = task
+                for step in task.steps:
+                    step_table[(task.task_name, step.step_id)] = step
+            self.step_table = step_table
+            self.task_knowledge = task_knowledge
+
+    def _without(self, *task_names: str) -> Tuple[Dict[str, TaskKnowledge], Dict[Tuple[str, int], TaskStep]]:
+        """Copies of the tables with the given tasks removed"""
+        task_knowledge = dict(self.task_knowledge)
+        excluded = set()
+        for task_name in task_names:
+            previous = task_knowledge.pop(task_name, None)
+            if previous:
+                excluded.update((task_name, step.step_id) for step in previous.steps)
+        step_table = {key: step for key, step in self.step_table.items() if key not in excluded}
+        return task_knowledge, step_table
+
+    def remove_task_knowledge(self, task_name: str) -> int:
+        """Forget a task locally; the service updates its own index"""
+        with self._index_lock:
+            self.task_knowledge, self.step_table = self._without(task_name)
+        return 0
+
+    def encode_observation(self, observation: str) -> List[float]:
+        """Encode an observation remotely"""
+        return self.client.encode([observation])[0]
+
+    def encode_observations(self, observations: List[str]) -> List[List[float]]:
+        """Encode several observations in one service request"""
+        return self.client.encode(list(observations))
+
+    def find_best_match(self,
+                        observation: str,
+                        task_name: str = None,
+                        top_k: int = 1,
+                        observation_id: str = None,
+                        step_ids: Optional[List[int]] = None,
+                        query_embedding: Optional[List[float]] = None) -> List[MatchResult]:
+        """Single-query search (same arguments as ChromaVectorSearchEngine), micro-batched with other threads"""
+        if not observation or not observation.strip():
+            logger.warning("Empty observation provided to find_best_match")
+            return []
+        query = self._make_query(observation, task_name, top_k, observation_id, step_ids, query_embedding)
+        return self._search_one(query)[0]
+
+    def find_best_match_local_first(self,
+                                    observation: str,
+                                    task_name: str,
+                                    step_ids: Optional[List[int]],
+                                    threshold: float,
+                                    top_k: int = 5,
+                                    observation_id: str = None,
+                                    query_embedding: Optional[List[float]] = None) -> Tuple[List[MatchResult], bool]:
+        """
+        Locality-first search in one service request (see ChromaVectorSearchEngine)
+
+        Returns:
+            Tuple of (matches, whether the search was widened to the full index)
+        """
+        if not observation or not observation.strip():
+            logger.warning("Empty observation provided to find_best_match_local_first")
+            return [], False
+        query = self._make_query(observation, task_name, top_k, observation_id, step_ids, query_embedding)
+        query["widen_below"] = threshold
+        return self._search_one(query)
+
+    @staticmethod
+    def _make_query(observation: str,
+                    task_name: Optional[str],
+                    top_k: int,
+                    observation_id: Optional[str],
+                    step_ids: Optional[List[int]],
+                    query_embedding: Optional[List[float]]) -> Dict[str, Any]:
+        """Build the wire form of one search"""
+        return {
+            "observation": observation,
+            "task_name": task_name,
+            "top_k": top_k,
+            "observation_id": observation_id,
+            "step_ids": list(step_ids) if step_ids else None,
+            "embedding": query_embedding.tolist() if hasattr(query_embedding, "tolist") else query_embedding
+        }
+
+    def _search_one(self, query: Dict[str, Any]) -> Tuple[List[MatchResult], bool]:
+        """Run one search through the micro-batcher (or directly when it is disabled)"""
+        if self.search_batcher is None:
+            return self._run_searches([query])[0]
+
+        start_time = time.time()
+        self._counters.add("searches")
+        try:
+            result = self.search_batcher.encode(query)
+        except Exception as e:
+            logger.error(f"Remote search failed: {str(e)}")
+            return [], False
+        matches = self._resolve_matches(result["matches"], self.step_table)
+        self._counters.add("search_time", time.time() - start_time)
+        return matches, result.get("widened", False)
+
+    def find_best_matches(self, queries: List[Dict[str, Any]]) -> List[List[MatchResult]]:
+        """
+        Run several searches in one service request
+
+        Args:
+            queries: Dicts with observation, task_name, top_k, step_ids and
+                optional embedding
+
+        Returns:
+            List of MatchResult lists in query order (empty on failure)
+        """
+        return [matches for matches, _ in self._run_searches(queries)]
+
+    def _run_searches(self, queries: List[Dict[str, Any]]) -> List[Tuple[List[MatchResult], bool]]:
+        """Send queries in one request; returns (matches, widened) per query"""
+        start_time = time.time()
+        self._counters.add("searches", len(queries))
+
+        try:
+            remote_results = self.client.search(queries)
+        except EmbeddingServiceError as e:
+            logger.error(f"Remote search failed: {str(e)}")
+            return [([], False) for _ in queries]
+
+        step_table = self.step_table
+        results = [
+            (self._resolve_matches(result["matches"], step_table), result.get("widened", False))
+            for result in remote_results
+        ]
+
+        self._counters.add("search_time", time.time() - start_time)
+        return results
+
+    @staticmethod
+    def _resolve_matches(remote_matches: List[Dict[str, Any]],
+                         step_table: Dict[Tuple[str, int], TaskStep]) -> List[MatchResult]:
+        """Rebuild MatchResults from remote hits using the local step table"""
+        matches = []
+        for remote in remote_matches:
+            step = step_table.get((remote["task_name"], remote["step_id"]))
+            if step is None:
+                logger.debug(f"Skipping remote result for unknown step: {remote['task_name']}/{remote['step_id']}")
+                continue
+            matches.append(MatchResult(
+                step_id=step.step_id,
+                task_description=step.task_description,
+                tools_needed=step.tools_needed,
+                completion_indicators=step.completion_indicators,
+                visual_cues=step.visual_cues,
+                estimated_duration=step.estimated_duration or "",
+                safety_notes=step.safety_notes,
+                similarity=remote["similarity"],
+                confidence_level="",  # Will be set in __post_init__
+                matched_cues=remote.get("matched_cues", []),
+                task_name=remote["task_name"],
+                dense_similarity=remote.get("dense_similarity"),
+                lexical_score=remote.get("lexical_score", 0.0)
+            ))
+        return matches
+
+    def get_performance_stats(self) -> Dict[str, Any]:
+        avg_search_time = (self.total_search_time / max(1, self.search_count)) * 1000
+        return {
+            "total_searches": self.search_count,
+            "total_search_time_ms": self.total_search_time * 1000,
+            "avg_search_time_ms": avg_search_time,
+            "loaded_tasks": len(self.task_knowledge),
+            "model_name": self.model_name,
+            "encoder_backend": RemoteEncoder.backend,
+            "collection_name": self.collection_name,
+            "service_requests": self.client.request_count,
+            "search_batcher": self.search_batcher.get_stats() if self.search_batcher else None,
+            "performance_target_met": avg_search_time < 10.0
+        }
+
+    def close(self) -> None:
+        """Stop the search micro-batcher (queued searches are sent first)"""
+        if self.search_batcher is not None:
+            self.search_batcher.close()
+
+    def clear_collection(self) -> None:
+        """Forget all tasks locally (the shared index is left untouched)"""
+        with self._index_lock:
+            self.task_knowledge = {}
+            self.step_table = {}
+
+    def health_check(self) -> Dict[str, Any]:
+        try:
+            self.client.health()
+            return {"status": "healthy", "issues": [], "warnings": []}
+        except EmbeddingServiceError as e:
+            return {"status": "error", "issues": [str(e)], "warnings": []}
+
+
+def main(argv=None) -> int:
+    """Command line entry point: run the embedding service"""
+    parser = argparse.ArgumentParser(description="Shared embedding/search service for backend workers")
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765)')
+    parser.add_argument('--tasks', default='data/tasks', help='Task YAML directory (default: data/tasks)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .knowledge_base import RAGKnowledgeBase
+    knowledge_base = RAGKnowledgeBase(tasks_directory=args.tasks)
+    knowledge_base.initialize(precompute_embeddings=True, snapshot_path=knowledge_base.snapshot_path)
+    hot_reload_config = load_rag_config().get("task_hot_reload", {})
+    if hot_reload_config.get("enabled", True):
+        knowledge_base.start_task_watcher(poll_interval=hot_reload_config.get("poll_interval", 1.0))
+
+    service = EmbeddingService(knowledge_base, args.host, args.port)
+    try:
+        service.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        knowledge_base.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,236 @@
+"""
+Encode Micro-Batcher
+
+Coalesces concurrent single-text encode requests into batched encoder calls.
+A background thread takes the first queued request, keeps collecting for up
+to ``max_wait_ms`` or until ``max_batch_size`` requests are queued, encodes
+them together and resolves each caller's future with its own vector.
+
+The wait is adaptive: when nothing else is queued and recent requests did
+not overlap (a single caller, or callers spaced further apart than the
+window), the batch is flushed at once instead of waiting for company that
+is not coming.
+
+Used by the vector search engines for observation encoding, where multiple
+cameras, replay and fallback processing can submit observations at once.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, InvalidStateError
+from typing import Any, Deque, Dict, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of recent requests kept for queue-time percentiles
+QUEUE_TIME_WINDOW = 1000
+
+# Smoothing of the overlap estimate and the level above which the worker waits for more requests
+CONCURRENCY_SMOOTHING = 0.2
+CONCURRENCY_WAIT_THRESHOLD = 0.5
+
+
+class EncodeBatcher:
+    """
+    Thread-based micro-batcher in front of an encoder
+
+    ``encode`` blocks the calling thread, ``submit`` returns a Future and
+    ``encode_async`` can be awaited from asyncio code.
+    """
+
+    def __init__(self, encoder, max_batch_size: int = 16, max_wait_ms: float = 2.0):
+        """
+        Initialize the batcher and start its worker thread
+
+        Args:
+            encoder: Object with a SentenceTransformer-style encode(list) method
+            max_batch_size: Maximum texts per encoder call
+            max_wait_ms: Maximum time to wait for more requests after the first
+        """
+        self.encoder = encoder
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+
+        self._queue: "queue.Queue[Tuple[str, Future, float]]" = queue.Queue()
+        self._closed = threading.Event()
+
+        # Requests submitted but not yet resolved, and a moving average of how
+        # many were outstanding when a new one arrived (0 for a lone caller)
+        self._load_lock = threading.Lock()
+        self._outstanding = 0
+        self.concurrency = 0.0
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self.request_count = 0
+        self.batch_count = 0
+        self.total_encode_time = 0.0
+        self.max_batch_seen = 0
+        self._queue_times_ms: Deque[float] = deque(maxlen=QUEUE_TIME_WINDOW)
+
+        self._thread = threading.Thread(target=self._run, name="encode-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, text: str) -> Future:
+        """
+        Queue a text for encoding
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Future resolving to the text's embedding vector
+        """
+        future: Future = Future()
+        if self._closed.is_set():
+            future.set_exception(RuntimeError("EncodeBatcher is closed"))
+            return future
+
+        with self._load_lock:
+            self.concurrency += CONCURRENCY_SMOOTHING * (self._outstanding - self.concurrency)
+            self._outstanding += 1
+        future.add_done_callback(self._request_done)
+
+        self._queue.put((text, future, time.perf_counter()))
+        return future
+
+    def _request_done(self, future: Future) -> None:
+        with self._load_lock:
+            self._outstanding -= 1
+
+    def encode(self, text: str, timeout: float = 30.0) -> np.ndarray:
+        """
+        Encode a text, blocking until its batch has been processed
+
+        Args:
+            text: Text to encode
+            timeout: Seconds to wait for the result
+
+        Returns:
+            Embedding vector
+        """
+        return self.submit(text).result(timeout)
+
+    async def encode_async(self, text: str) -> np.ndarray:
+        """Awaitable form of encode"""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect_batch(self) -> List[Tuple[str, Future, float]]:
+        """Block for the first request, then gather more until the batch is full or the wait expires"""
+        try:
+            batch = [self._queue.get(timeout=0.5)]
+        except queue.Empty:
+            return []
+
+        deadline = time.perf_counter() + self.max_wait_ms / 1000.0
+        while len(batch) < self.max_batch_size:
+            # Take whatever is already queued without waiting
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            # Nothing queued: only wait for more if callers have been overlapping
+            if self.concurrency < CONCURRENCY_WAIT_THRESHOLD:
+                break
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Drop requests whose callers gave up (e.g. a cancelled encode_async);
+        # the rest are marked running so they can no longer be cancelled
+        return [request for request in batch if request[1].set_running_or_notify_cancel()]
+
+    @staticmethod
+    def _resolve(future: Future, result: Any = None, error: Exception = None) -> None:
+        """Deliver a result or error without letting one bad future stop the worker"""
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            logger.debug("Dropped result for an already resolved encode request")
+
+    def _run(self) -> None:
+        """Worker loop: collect, encode, fan out"""
+        while not (self._closed.is_set() and self._queue.empty()):
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            texts = [text for text, _, _ in batch]
+            encode_start = time.perf_counter()
+            try:
+                embeddings = self.encoder.encode(texts, batch_size=len(texts), show_progress_bar=False)
+            except Exception as e:
+                logger.error(f"Batched encode of {len(texts)} texts failed: {str(e)}")
+                for _, future, _ in batch:
+                    self._resolve(future, error=e)
+                continue
+            encode_time = time.perf_counter() - encode_start
+
+            for i, (_, future, _) in enumerate(batch):
+                if i < len(embeddings):
+                    self._resolve(future, embeddings[i])
+                else:
+                    self._resolve(future, error=RuntimeError(
+                        f"Encoder returned {len(embeddings)} embeddings for a batch of {len(batch)}"
+                    ))
+
+            with self._stats_lock:
+                self.request_count += len(batch)
+                self.batch_count += 1
+                self.total_encode_time += encode_time
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+                self._queue_times_ms.extend((encode_start - queued_at) * 1000 for _, _, queued_at in batch)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Process queued requests, then stop the worker thread"""
+        self._closed.set()
+        self._thread.join(timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get batching and queue-time metrics
+
+        Returns:
+            Dictionary with request/batch counts, batch sizes and queue times
+            (milliseconds spent waiting before the encoder call)
+        """
+        with self._stats_lock:
+            queue_times = sorted(self._queue_times_ms)
+            batches = self.batch_count
+
+            def percentile(fraction: float) -> float:
+                return queue_times[int(fraction * (len(queue_times) - 1))] if queue_times else 0.0
+
+            return {
+                "requests": self.request_count,
+                "batches": batches,
+                "avg_batch_size": self.request_count / batches if batches else 0.0,
+                "max_batch_size_seen": self.max_batch_seen,
+                "max_batch_size": self.max_batch_size,
+                "max_wait_ms": self.max_wait_ms,
+                "concurrency": self.concurrency,
+                "avg_encode_ms": self.total_encode_time / batches * 1000 if batches else 0.0,
+                "queue_time_ms": {
+                    "avg": sum(queue_times) / len(queue_times) if queue_times else 0.0,
+                    "p50": percentile(0.50),
+                    "p95": percentile(0.95),
+                    "max": queue_times[-1] if queue_times else 0.0
+                },
+                "pending": self._queue.qsize()
+            }
@@ -0,0 +1,363 @@
+"""
+Embedding Encoder Backends
+
+Pluggable text encoders used by the RAG vector search engine:
+1. SentenceTransformerEncoder - PyTorch sentence-transformers (default)
+2. OnnxEncoder - exported (optionally int8-quantized) ONNX model on onnxruntime,
+   much lighter to import and faster on CPU-only devices
+3. HashingEncoder - dependency-free hashed bag-of-words, for tests and smoke runs
+
+Backends are selected from src/config/rag_config.json (see create_encoder).
+"""
+
+import hashlib
+import json
+import logging
+import re
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[2] / "config" / "rag_config.json"
+
+
+class Encoder(ABC):
+    """
+    Text encoder interface
+
+    ``encode`` follows the SentenceTransformer calling convention so callers
+    can pass either a single string (returns a 1-D vector) or a list of
+    strings (returns a 2-D array). Returned vectors are L2-normalized.
+    """
+
+    backend: str = "base"
+
+    # Post-processing applied to the model output; bump when it changes so
+    # embeddings cached under the previous scheme are recomputed
+    normalization: str = "l2-v1"
+
+    def __init__(self, name: str):
+        self.name = name
+
+    @property
+    @abstractmethod
+    def version(self) -> str:
+        """Version identifier used as part of embedding cache keys"""
+
+    @abstractmethod
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        """Encode a list of texts into a 2-D float32 array"""
+
+    def encode(self,
+               texts: Union[str, List[str]],
+               batch_size: int = 32,
+               show_progress_bar: bool = False,
+               convert_to_numpy: bool = True,
+               **kwargs) -> np.ndarray:
+        """
+        Encode one text or a list of texts
+
+        Args:
+            texts: Text or list of texts
+            batch_size: Texts encoded per backend call
+            show_progress_bar: Accepted for SentenceTransformer compatibility
+            convert_to_numpy: Accepted for SentenceTransformer compatibility
+
+        Returns:
+            1-D vector for a single text, otherwise a 2-D array
+        """
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+
+        if not batch:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        chunks = [self._encode_batch(batch[i:i + batch_size]) for i in range(0, len(batch), batch_size)]
+        embeddings = np.vstack(chunks).astype(np.float32, copy=False)
+        return embeddings[0] if single else embeddings
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}(name={self.name}, version={self.version})"
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize each row, leaving all-zero rows untouched"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class SentenceTransformerEncoder(Encoder):
+    """sentence-transformers model on PyTorch"""
+
+    backend = "sentence_transformers"
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, device: Optional[str] = None):
+        """
+        Load a sentence-transformers model
+
+        Args:
+            model_name: Model name or local path
+            device: Optional torch device (e.g. "cpu")
+        """
+        super().__init__(model_name)
+
+        # Imported here so other backends never pay for the torch import
+        import sentence_transformers
+        from sentence_transformers import SentenceTransformer
+
+        logger.info(f"Loading sentence transformer model: {model_name}")
+        self.model = SentenceTransformer(model_name, device=device)
+        self._library_version = getattr(sentence_transformers, "__version__", "unknown")
+
+    @property
+    def version(self) -> str:
+        model_config = getattr(self.model, "_model_config", None) or {}
+        versions = model_config.get("__version__", {}) if isinstance(model_config, dict) else {}
+        return f"sentence-transformers-{versions.get('sentence_transformers') or self._library_version}"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        return self.model.encode(
+            texts,
+            batch_size=len(texts),
+            show_progress_bar=False,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        )
+
+
+class OnnxEncoder(Encoder):
+    """
+    Exported transformer on onnxruntime with mean pooling
+
+    The model directory must contain ``tokenizer.json`` and ``model.onnx``
+    (or ``model_quantized.onnx`` when ``quantized`` is set), as written by
+    export_onnx_model.
+    """
+
+    backend = "onnx"
+
+    def __init__(self,
+                 model_path: str,
+                 quantized: bool = True,
+                 max_length: int = 256,
+                 num_threads: Optional[int] = None):
+        """
+        Load an ONNX encoder
+
+        Args:
+            model_path: Directory with tokenizer.json and the ONNX model
+            quantized: Use the int8 dynamically quantized model file
+            max_length: Maximum tokens per text
+            num_threads: Optional intra-op thread count for onnxruntime
+        """
+        model_dir = Path(model_path)
+        super().__init__(model_dir.name)
+
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("OnnxEncoder requires the onnxruntime and tokenizers packages") from e
+
+        self.model_file = model_dir / ("model_quantized.onnx" if quantized else "model.onnx")
+        if not self.model_file.exists():
+            raise FileNotFoundError(f"ONNX model not found: {self.model_file} (see export_onnx_model)")
+
+        self.tokenizer = Tokenizer.from_file(str(model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_length)
+        self.tokenizer.enable_padding()
+
+        options = onnxruntime.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+        self.session = onnxruntime.InferenceSession(
+            str(self.model_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+        self._version = f"onnx-{hashlib.sha256(self.model_file.read_bytes()).hexdigest()[:16]}"
+
+        logger.info(f"Loaded ONNX encoder: {self.model_file}")
+
+    @property
+    def version(self) -> str:
+        return self._version
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+
+        feeds = {
+            "input_ids": input_ids,
+            "attention_mask": attention_mask,
+            "token_type_ids": np.zeros_like(input_ids)
+        }
+        feeds = {name: value for name, value in feeds.items() if name in self.input_names}
+
+        token_embeddings = self.session.run(None, feeds)[0]
+
+        # Mean pooling over non-padding tokens, as sentence-transformers does
+        mask = attention_mask[:, :, None].astype(np.float32)
+        pooled = (token_embeddings * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return _normalize_rows(pooled)
+
+
+class HashingEncoder(Encoder):
+    """
+    Hashed bag-of-words encoder
+
+    Deterministic and dependency-free; similarity reflects shared words only.
+    Intended for tests and for running the pipeline without model downloads.
+    """
+
+    backend = "hashing"
+    _TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+    def __init__(self, dimension: int = 384):
+        """
+        Args:
+            dimension: Embedding dimension (number of hash buckets)
+        """
+        super().__init__(f"hashing-{dimension}")
+        self.dimension = dimension
+
+    @property
+    def version(self) -> str:
+        return "hashing-v1"
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in self._TOKEN_PATTERN.findall(text.lower()):
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest, "little")
+                # Signed hashing keeps unrelated tokens from only ever adding up
+                sign = 1.0 if bucket & (1 << 63) else -1.0
+                matrix[row, bucket % self.dimension] += sign
+        return _normalize_rows(matrix)
+
+
+def export_onnx_model(model_name: str = DEFAULT_MODEL_NAME,
+                      output_dir: str = "cache/onnx/all-MiniLM-L6-v2",
+                      quantize: bool = True,
+                      opset: int = 17) -> Path:
+    """
+    Export a sentence-transformers model to ONNX for OnnxEncoder
+
+    Requires torch and sentence-transformers at export time only.
+
+    Args:
+        model_name: sentence-transformers model name or path
+        output_dir: Destination directory
+        quantize: Also write an int8 dynamically quantized model
+        opset: ONNX opset version
+
+    Returns:
+        Path of the output directory
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    st_model = SentenceTransformer(model_name, device="cpu")
+    transformer = st_model[0].auto_model.eval()
+    tokenizer = st_model.tokenizer
+    tokenizer.save_pretrained(str(output_path))
+
+    sample = tokenizer(["an example sentence"], return_tensors="pt")
+    input_names = ["input_ids", "attention_mask"] + (["token_type_ids"] if "token_type_ids" in sample else [])
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    class _HiddenStates(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, *inputs):
+            return self.model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    model_file = output_path / "model.onnx"
+    torch.onnx.export(
+        _HiddenStates(transformer),
+        tuple(sample[name] for name in input_names),
+        str(model_file),
+        input_names=input_names,
+        output_names=["last_hidden_state"],
+        dynamic_axes=dynamic_axes,
+        opset_version=opset
+    )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(model_file), str(output_path / "model_quantized.onnx"), weight_type=QuantType.QInt8)
+
+    logger.info(f"Exported ONNX encoder for {model_name} to {output_path}")
+    return output_path
+
+
+def load_rag_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the RAG configuration file
+
+    Args:
+        config_path: Optional path (defaults to src/config/rag_config.json)
+
+    Returns:
+        Configuration dictionary, empty if the file is missing or invalid
+    """
+    path = Path(config_path) if config_path else DEFAULT_CONFIG_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Failed to load RAG config {path}: {str(e)}")
+        return {}
+
+
+def create_encoder(encoder_config: Optional[Dict[str, Any]] = None,
+                   model_name: str = DEFAULT_MODEL_NAME) -> Encoder:
+    """
+    Create the encoder selected in the configuration
+
+    Args:
+        encoder_config: The "encoder" section of rag_config.json
+        model_name: Model used by the sentence_transformers backend when the
+            config does not name one
+
+    Returns:
+        Encoder instance
+    """
+    encoder_config = encoder_config or {}
+    backend = encoder_config.get("backend", SentenceTransformerEncoder.backend)
+
+    if backend == SentenceTransformerEncoder.backend:
+        options = encoder_config.get("sentence_transformers", {})
+        return SentenceTransformerEncoder(options.get("model_name", model_name), device=options.get("device"))
+
+    if backend == OnnxEncoder.backend:
+        options = encoder_config.get("onnx", {})
+        model_path = Path(options.get("model_path", f"cache/onnx/{model_name}"))
+        if not model_path.is_absolute():
+            model_path = DEFAULT_CONFIG_PATH.parents[2] / model_path
+        return OnnxEncoder(
+            str(model_path),
+            quantized=options.get("quantized", True),
+            max_length=options.get("max_length", 256),
+            num_threads=options.get("num_threads")
+        )
+
+    if backend == HashingEncoder.backend:
+        options = encoder_config.get("hashing", {})
+        return HashingEncoder(dimension=options.get("dimension", 384))
+
+    raise ValueError(f"Unknown encoder backend: {backend}")
@@ -7,23 +7,29 @@ This serves as the primary interface for the memory system's long-term knowledge
 
 from typing import List, Dict, Any, Optional
 import logging
+import threading
+import time
 from pathlib import Path
 from .task_loader import TaskKnowledgeLoader, TaskKnowledge
 from .vector_search import ChromaVectorSearchEngine, MatchResult
 from .vector_optimizer import VectorOptimizer
 from .validation import validate_task_file
+from .task_watcher import TaskFileWatcher
+from .task_snapshot import load_task_snapshot, compile_task_snapshot
+from .encoders import Encoder, create_encoder, load_rag_config
+from .thread_counters import ThreadLocalCounters
 
 # Import logging system
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'logging'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'app_logging'))
 try:
     from log_manager import get_log_manager
 except ImportError:
     # Fallback for different import contexts
     try:
-        from logging.log_manager import get_log_manager
+        from app_logging.log_manager import get_log_manager
     except ImportError:
         # Create a dummy log manager if all else fails
         class DummyLogManager:
@@ -49,7 +55,10 @@ class RAGKnowledgeBase:
     def __init__(self, 
                  tasks_directory: str = "data/tasks",
                  model_name: str = "all-MiniLM-L6-v2",
-                 cache_dir: str = "cache/embeddings"):
+                 cache_dir: str = "cache/embeddings",
+                 encoder: Optional[Encoder] = None,
+                 config_path: Optional[str] = None,
+                 embedding_service_url: Optional[str] = None):
         """
         Initialize the RAG Knowledge Base
         
@@ -57,6 +66,12 @@ class RAGKnowledgeBase:
             tasks_directory: Directory containing task YAML files
             model_name: Sentence transformer model for embeddings
             cache_dir: Directory for caching embeddings
+            encoder: Optional encoder backend; by default the backend selected
+                in src/config/rag_config.json (see encoders.create_encoder)
+            config_path: Optional path of an alternative rag_config.json
+            embedding_service_url: Optional URL of a shared embedding service
+                (see embedding_service.py); when set, no encoder or vector store
+                is loaded in this process
         """
         # Convert relative paths to absolute paths based on project root
         if not Path(tasks_directory).is_absolute():
@@ -82,58 +97,215 @@ class RAGKnowledgeBase:
         
         # Initialize components
         self.task_loader = TaskKnowledgeLoader(self.tasks_directory)
-        self.vector_engine = ChromaVectorSearchEngine(model_name, cache_dir)
+        self.remote_index = bool(embedding_service_url)
+        rag_config = load_rag_config(config_path)
+        micro_batching = rag_config.get("micro_batching", {})
+        if self.remote_index:
+            from .embedding_service import RemoteVectorSearchEngine
+            self.vector_engine = RemoteVectorSearchEngine(
+                embedding_service_url,
+                micro_batch_size=micro_batching.get("max_batch_size", 16),
+                micro_batch_wait_ms=micro_batching.get("max_wait_ms", 2.0)
+            )
+        else:
+            if encoder is None:
+                encoder = create_encoder(rag_config.get("encoder"), model_name)
+            self.vector_engine = ChromaVectorSearchEngine(
+                model_name, cache_dir, encoder=encoder,
+                micro_batch_size=micro_batching.get("max_batch_size", 16),
+                micro_batch_wait_ms=micro_batching.get("max_wait_ms", 2.0)
+            )
         self.vector_optimizer = VectorOptimizer(
             self.vector_engine, 
             cache_dir=f"{cache_dir}_optimizer"
         )
         
-        # Track loaded tasks
+        # Default location of the compiled task snapshot (see initialize)
+        self.snapshot_path = Path(cache_dir).parent / "task_snapshot.pkl"
+        
+        # Track loaded tasks, keyed by task_name like the vector index and
+        # match results, and the source file each one was loaded from
         self.loaded_tasks: Dict[str, TaskKnowledge] = {}
+        self._file_tasks: Dict[Path, str] = {}
         self.is_initialized = False
         
+        # Locality-first search settings (see find_matching_step)
+        self.locality_steps_back = 1
+        self.locality_steps_ahead = 2
+        self.locality_threshold = 0.60
+        self.search_stats = ThreadLocalCounters("local", "widened", "global", "decoded")
+        
+        # Hot reload of task files (see start_task_watcher)
+        self.task_watcher: Optional[TaskFileWatcher] = None
+        self._reload_lock = threading.Lock()
+        self.reload_stats = {"reloads": 0, "failures": 0, "removals": 0, "last_reload_ms": 0.0}
+        
         logger.info(f"RAG Knowledge Base initialized with tasks directory: {tasks_directory}")
     
-    def initialize(self, precompute_embeddings: bool = True) -> None:
+    def initialize(self, 
+                   precompute_embeddings: bool = True,
+                   snapshot_path: Optional[str] = None) -> None:
         """
         Initialize the knowledge base by loading all tasks
         
         Args:
             precompute_embeddings: Whether to precompute embeddings during initialization
+            snapshot_path: Optional compiled task snapshot (see task_snapshot.py); used
+                instead of the YAML files when their hashes and the encoder still match,
+                and recompiled from the YAML files otherwise
         """
         logger.info("Initializing RAG Knowledge Base...")
+        start_time = time.time()
         
         try:
-            # Load all tasks from directory
-            self.loaded_tasks = self.task_loader.load_all_tasks()
+            snapshot = None
+            if snapshot_path:
+                snapshot = load_task_snapshot(
+                    snapshot_path, self.tasks_directory,
+                    self.vector_engine.model_name, self.vector_engine.model_version
+                )
             
-            if not self.loaded_tasks:
-                logger.warning("No tasks loaded from directory")
-                return
+            if snapshot is not None:
+                self._load_from_snapshot(snapshot)
+                logger.info(f"Loaded {len(self.loaded_tasks)} tasks from snapshot {snapshot_path} "
+                            f"in {(time.time() - start_time) * 1000:.1f}ms")
+            else:
+                # Load all tasks from directory
+                self.loaded_tasks = self._key_by_task_name(self.task_loader.load_all_tasks())
+                
+                if not self.loaded_tasks:
+                    logger.warning("No tasks loaded from directory")
+                    return
+                
+                # Build embeddings once (content-keyed cache, only changed steps encoded);
+                # with a shared embedding service the service owns the embeddings
+                if precompute_embeddings and not self.remote_index:
+                    self.vector_optimizer.precompute_all_embeddings(self.loaded_tasks)
+            
+            # Feed the same embeddings to the vector search engine in one batch
+            # (a single snapshot publish); rows already persisted with identical
+            # content hashes are skipped
+            self.vector_engine.add_tasks_knowledge(
+                list(self.loaded_tasks.values()),
+                embeddings={
+                    task_name: self.vector_optimizer.get_task_embeddings(task_name)
+                    for task_name in self.loaded_tasks
+                }
+            )
             
-            # Add tasks to vector search engine
-            for task_name, task in self.loaded_tasks.items():
-                self.vector_engine.add_task_knowledge(task)
+            self.is_initialized = True
             
-            # Precompute embeddings using vector optimizer
-            if precompute_embeddings:
-                self.vector_optimizer.precompute_all_embeddings(self.loaded_tasks)
+            if snapshot_path and snapshot is None and precompute_embeddings and not self.remote_index:
+                try:
+                    self.compile_snapshot(snapshot_path)
+                except Exception as e:
+                    logger.warning(f"Failed to compile task snapshot {snapshot_path}: {str(e)}")
             
-            self.is_initialized = True
-            logger.info(f"RAG Knowledge Base initialized with {len(self.loaded_tasks)} tasks")
+            logger.info(f"RAG Knowledge Base initialized with {len(self.loaded_tasks)} tasks "
+                        f"in {(time.time() - start_time) * 1000:.1f}ms")
             
         except Exception as e:
             logger.error(f"Failed to initialize RAG Knowledge Base: {str(e)}")
             raise
     
-    def find_matching_step(self, observation: str, task_name: str = None, observation_id: str = None) -> MatchResult:
+    def _load_from_snapshot(self, snapshot) -> None:
+        """
+        Populate tasks and embeddings from a validated task snapshot
+        
+        Args:
+            snapshot: TaskSnapshot returned by load_task_snapshot
+        """
+        self.loaded_tasks = dict(snapshot.tasks)
+        self._file_tasks = {}
+        
+        for task_name, task in self.loaded_tasks.items():
+            file_name = snapshot.task_files.get(task_name)
+            if file_name:
+                file_path = self.tasks_directory / file_name
+                self.task_loader.register_task(file_path.stem, task, file_path)
+                self._file_tasks[file_path] = task_name
+            if snapshot.embeddings.get(task_name):
+                self.vector_optimizer.load_task_embeddings(
+                    task_name, task,
+                    snapshot.embeddings[task_name],
+                    snapshot.embedding_keys.get(task_name, {})
+                )
+    
+    def _key_by_task_name(self, tasks_by_file: Dict[str, TaskKnowledge]) -> Dict[str, TaskKnowledge]:
+        """
+        Re-key tasks loaded per file by their task_name
+        
+        Args:
+            tasks_by_file: Tasks keyed by file stem, as returned by the task loader
+            
+        Returns:
+            Tasks keyed by task_name (each task's source file is recorded too)
+        """
+        tasks = {}
+        self._file_tasks = {}
+        for file_stem, task in sorted(tasks_by_file.items()):
+            if task.task_name in tasks:
+                logger.warning(f"Task {task.task_name} is defined by several files, using {file_stem}")
+            tasks[task.task_name] = task
+            self._file_tasks[self.task_loader.get_task_file(file_stem)] = task.task_name
+        return tasks
+    
+    def get_task_file(self, task_name: str) -> Optional[Path]:
+        """
+        Get the YAML file a loaded task was read from
+        
+        Args:
+            task_name: Name of the task
+            
+        Returns:
+            Source file path, or None if unknown
+        """
+        for file_path, name in self._file_tasks.items():
+            if name == task_name:
+                return file_path
+        return None
+    
+    def compile_snapshot(self, snapshot_path: str) -> Path:
+        """
+        Compile the loaded tasks and their embeddings into a binary snapshot
+        
+        Args:
+            snapshot_path: Destination file
+            
+        Returns:
+            Path of the written snapshot
+        """
+        return compile_task_snapshot(self, Path(snapshot_path))
+    
+    def find_matching_step(self, 
+                           observation: str, 
+                           task_name: str = None, 
+                           observation_id: str = None,
+                           current_task: str = None,
+                           current_step: int = None,
+                           locality_threshold: Optional[float] = None,
+                           query_embedding: Optional[List[float]] = None,
+                           record_stats: bool = True) -> MatchResult:
         """
         Find the best matching step for a given observation
         
+        When the caller's current position (current_task/current_step) is
+        given, a locality-first search is used: the neighbouring steps of the
+        current task are scored first, and the search only widens to the full
+        index if the local best falls below the locality threshold.
+        
         Args:
             observation: Text observation from VLM
             task_name: Optional task name to limit search
             observation_id: Optional observation ID for logging
+            current_task: Optional task the user is currently on
+            current_step: Optional step the user is currently on
+            locality_threshold: Minimum local similarity to accept without
+                widening (defaults to self.locality_threshold)
+            query_embedding: Optional precomputed observation embedding
+                (see encode_observations)
+            record_stats: Whether to count the search in search_stats
+                (False for offline replays)
             
         Returns:
             MatchResult object with matching information
@@ -144,15 +316,51 @@ class RAGKnowledgeBase:
             # Log the search request
             logger.info(f"RAG search: observation='{observation[:100]}...', task_filter='{task_name}'")
             
+            matches = None
+            search_scope = "global"
+            
+            # Locality-first: score neighbouring steps of the current task, widening
+            # to the full index inside the engine (one service request when remote)
+            if current_task in self.loaded_tasks and current_step is not None and not task_name:
+                threshold = self.locality_threshold if locality_threshold is None else locality_threshold
+                neighbour_ids = self._get_neighbour_step_ids(current_task, current_step)
+                
+                matches, widened = self.vector_engine.find_best_match_local_first(
+                    observation, current_task, neighbour_ids, threshold, top_k=5,
+                    observation_id=observation_id, query_embedding=query_embedding
+                )
+                
+                if not widened:
+                    search_scope = "local"
+                    if record_stats:
+                        self.search_stats.add("local")
+                    logger.info(f"RAG search: local hit near '{current_task}' step {current_step} "
+                                f"(steps {neighbour_ids}, best={matches[0].similarity:.3f})")
+                else:
+                    search_scope = "widened"
+                    if record_stats:
+                        self.search_stats.add("widened")
+                    logger.info(f"RAG search: no local match above {threshold:.2f} near '{current_task}' "
+                                f"step {current_step}, widened to full index")
+            
             # Search for matches using the correct method
-            if task_name and task_name in self.loaded_tasks:
-                # Search within specific task
-                logger.info(f"RAG search: searching within task '{task_name}'")
-                matches = self.vector_engine.find_best_match(observation, task_name, top_k=5, observation_id=observation_id)
-            else:
-                # Search across all tasks
-                logger.info(f"RAG search: searching across all {len(self.loaded_tasks)} tasks")
-                matches = self.vector_engine.find_best_match(observation, None, top_k=5, observation_id=observation_id)
+            if matches is None:
+                if search_scope == "global" and record_stats:
+                    self.search_stats.add("global")
+                
+                if task_name and task_name in self.loaded_tasks:
+                    # Search within specific task
+                    logger.info(f"RAG search: searching within task '{task_name}'")
+                    matches = self.vector_engine.find_best_match(observation, task_name, top_k=5, observation_id=observation_id,
+                                                                 query_embedding=query_embedding)
+                else:
+                    # Search across all tasks
+                    logger.info(f"RAG search: searching across all {len(self.loaded_tasks)} tasks")
+                    matches = self.vector_engine.find_best_match(observation, None, top_k=5, observation_id=observation_id,
+                                                                 query_embedding=query_embedding)
+            
+            for match in matches:
+                match.search_scope = search_scope
             
             if not matches:
                 logger.info(f"RAG search: no matches found for observation")
@@ -234,6 +442,83 @@ class RAGKnowledgeBase:
             
             return self._create_no_match_result()
     
+    def _get_neighbour_step_ids(self, task_name: str, step_id: int) -> List[int]:
+        """
+        Get the step IDs physically reachable from a step
+        
+        Args:
+            task_name: Name of the task
+            step_id: Current step ID
+            
+        Returns:
+            Step IDs from locality_steps_back before to locality_steps_ahead after
+        """
+        task = self.loaded_tasks[task_name]
+        low = step_id - self.locality_steps_back
+        high = step_id + self.locality_steps_ahead
+        return [step.step_id for step in task.steps if low <= step.step_id <= high]
+    
+    def get_step_ids(self, task_name: str) -> List[int]:
+        """
+        Get the step IDs of a task in task order
+        
+        Args:
+            task_name: Name of the task
+            
+        Returns:
+            Step IDs, empty if the task is not loaded
+        """
+        task = self.loaded_tasks.get(task_name)
+        return [step.step_id for step in task.steps] if task else []
+    
+    def score_task_steps(self,
+                         observation: str,
+                         task_name: str,
+                         observation_id: str = None,
+                         query_embedding: Optional[List[float]] = None,
+                         record_stats: bool = True) -> List[MatchResult]:
+        """
+        Score an observation against every step of one task
+        
+        Used by the State Tracker's step decoder, which needs a similarity
+        for each step rather than only the best match.
+        
+        Args:
+            observation: VLM observation text
+            task_name: Task whose steps are scored
+            observation_id: Optional observation ID for logging
+            query_embedding: Optional precomputed observation embedding
+            record_stats: Whether to count the search in search_stats
+            
+        Returns:
+            MatchResult per step (search_scope "decoded"), sorted by similarity
+        """
+        step_count = len(self.get_step_ids(task_name))
+        if step_count == 0:
+            return []
+        
+        matches = self.vector_engine.find_best_match(
+            observation, task_name, top_k=step_count, observation_id=observation_id,
+            query_embedding=query_embedding
+        )
+        for match in matches:
+            match.search_scope = "decoded"
+        if record_stats:
+            self.search_stats.add("decoded")
+        return matches
+    
+    def encode_observations(self, observations: List[str]) -> List[List[float]]:
+        """
+        Encode several observations in one encoder call
+        
+        Args:
+            observations: VLM observation texts
+            
+        Returns:
+            Embedding per observation, usable as find_matching_step's query_embedding
+        """
+        return self.vector_engine.encode_observations(observations)
+    
     def find_multiple_matches(self, 
                             observation: str, 
                             top_k: int = 3,
@@ -326,7 +611,9 @@ class RAGKnowledgeBase:
         if task_name not in self.loaded_tasks:
             return None
         
-        return self.task_loader.get_task_summary(task_name)
+        # The task loader caches tasks by file stem
+        file_path = self.get_task_file(task_name)
+        return self.task_loader.get_task_summary(file_path.stem if file_path else task_name)
     
     def get_all_tasks(self) -> List[str]:
         """
@@ -337,35 +624,72 @@ class RAGKnowledgeBase:
         """
         return list(self.loaded_tasks.keys())
     
-    def reload_task(self, task_name: str) -> bool:
+    def reload_task(self, task_name: str, file_path: Optional[Path] = None) -> bool:
         """
         Reload a specific task from file
         
+        Only steps whose content changed are re-encoded and re-indexed; queries
+        keep using the previous version until the new rows are published.
+        
         Args:
             task_name: Name of the task to reload
+            file_path: Optional task file path (defaults to the file it was loaded from)
             
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Clear from cache first
-            if task_name in self.loaded_tasks:
-                del self.loaded_tasks[task_name]
-            
-            # Reload from file
-            task = self.task_loader.load_task(task_name)
-            if task:
-                self.loaded_tasks[task_name] = task
-                self.vector_engine.add_task_knowledge(task)
-                logger.info(f"Successfully reloaded task: {task_name}")
-                return True
-            else:
-                logger.error(f"Failed to reload task: {task_name}")
-                return False
+        if file_path is None:
+            file_path = self.get_task_file(task_name) or self.tasks_directory / f"{task_name}.yaml"
+        return self._load_task_file(Path(file_path)) is not None
+    
+    def _load_task_file(self, file_path: Path) -> Optional[str]:
+        """
+        Load or reload the task defined by a YAML file
+        
+        Args:
+            file_path: Task file path
+            
+        Returns:
+            The task's task_name if successful, None otherwise
+        """
+        start_time = time.time()
+        
+        with self._reload_lock:
+            try:
+                task = self.task_loader.load_task(file_path.stem, file_path)
+                if not task:
+                    logger.error(f"Failed to reload task file: {file_path}")
+                    self.reload_stats["failures"] += 1
+                    return None
                 
-        except Exception as e:
-            logger.error(f"Error reloading task {task_name}: {str(e)}")
-            return False
+                task_name = task.task_name
+                if self.remote_index:
+                    # The embedding service re-indexes from its own task watcher
+                    self.vector_engine.add_task_knowledge(task)
+                elif not self.vector_optimizer.update_task_embeddings(task_name, task):
+                    self.reload_stats["failures"] += 1
+                    return None
+                
+                # Swap in the new task only after its embeddings and index rows are live
+                # (new dicts, so concurrent readers never see them change size)
+                previous_name = self._file_tasks.get(file_path)
+                self.loaded_tasks = {**self.loaded_tasks, task_name: task}
+                self._file_tasks = {**self._file_tasks, file_path: task_name}
+                
+                # The file now defines a differently named task
+                if previous_name not in (None, task_name) and previous_name not in self._file_tasks.values():
+                    self._unload_task(previous_name)
+                
+                reload_ms = (time.time() - start_time) * 1000
+                self.reload_stats["reloads"] += 1
+                self.reload_stats["last_reload_ms"] = reload_ms
+                logger.info(f"Successfully reloaded task: {task_name} from {file_path.name} in {reload_ms:.1f}ms")
+                return task_name
+                
+            except Exception as e:
+                self.reload_stats["failures"] += 1
+                logger.error(f"Error reloading task file {file_path}: {str(e)}")
+                return None
     
     def add_new_task(self, task_file_path: str) -> bool:
         """
@@ -377,31 +701,140 @@ class RAGKnowledgeBase:
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Validate the task file first
-            if not validate_task_file(task_file_path):
-                logger.error(f"Task file validation failed: {task_file_path}")
-                return False
+        task_file_path = Path(task_file_path)
+        
+        # Validate the task file first
+        is_valid, errors = validate_task_file(task_file_path)
+        if not is_valid:
+            logger.error(f"Task file validation failed: {task_file_path}: {errors}")
+            return False
+        
+        # Loading and indexing a new task is the same as reloading it
+        task_name = self._load_task_file(task_file_path)
+        if task_name is None:
+            logger.error(f"Failed to load task from file: {task_file_path}")
+            return False
+        
+        logger.info(f"Successfully added new task: {task_name}")
+        return True
+    
+    def _unload_task(self, task_name: str) -> None:
+        """Drop a task from loaded_tasks, the vector index and the embedding cache (caller holds _reload_lock)"""
+        self.loaded_tasks = {name: loaded for name, loaded in self.loaded_tasks.items() if name != task_name}
+        self.vector_engine.remove_task_knowledge(task_name)
+        self.vector_optimizer.invalidate_task_cache(task_name)
+    
+    def remove_task(self, task_name: str) -> bool:
+        """
+        Remove a task and its index rows (e.g. after its file was deleted)
+        
+        Args:
+            task_name: Name of the task to remove
             
-            # Load the task
-            task = self.task_loader.load_task_from_file(task_file_path)
-            if not task:
-                logger.error(f"Failed to load task from file: {task_file_path}")
+        Returns:
+            True if the task was loaded and has been removed, False otherwise
+        """
+        with self._reload_lock:
+            if task_name not in self.loaded_tasks:
                 return False
             
-            # Add to knowledge base
-            self.loaded_tasks[task.task_name] = task
-            self.vector_engine.add_task_knowledge(task)
-            
-            # Update optimizer cache
-            self.vector_optimizer.update_task_embeddings(task.task_name, task)
+            try:
+                self._unload_task(task_name)
+                for file_path in [path for path, name in self._file_tasks.items() if name == task_name]:
+                    self.task_loader.unload_task(file_path.stem)
+                self._file_tasks = {path: name for path, name in self._file_tasks.items() if name != task_name}
+                self.reload_stats["removals"] += 1
+                logger.info(f"Removed task: {task_name}")
+                return True
+            except Exception as e:
+                logger.error(f"Error removing task {task_name}: {str(e)}")
+                return False
+    
+    def _remove_task_file(self, file_path: Path) -> Optional[str]:
+        """
+        Remove the task defined by a deleted YAML file
+        
+        Args:
+            file_path: Deleted task file
             
-            logger.info(f"Successfully added new task: {task.task_name}")
-            return True
+        Returns:
+            The task_name that was removed (or reloaded from another file
+            defining the same name), None if the file defined no loaded task
+        """
+        with self._reload_lock:
+            task_name = self._file_tasks.get(file_path)
+            if task_name is None:
+                return None
+            self._file_tasks = {path: name for path, name in self._file_tasks.items() if path != file_path}
+            self.task_loader.unload_task(file_path.stem)
+            other_file = self.get_task_file(task_name)
+        
+        # Another file may still define the same task name
+        if other_file is not None:
+            return self._load_task_file(other_file)
+        return task_name if self.remove_task(task_name) else None
+    
+    def apply_task_file_changes(self,
+                                added: List[Path],
+                                modified: List[Path],
+                                removed: List[Path]) -> Dict[str, List[str]]:
+        """
+        Apply task file changes reported by the task watcher
+        
+        Args:
+            added: Newly created task files
+            modified: Changed task files
+            removed: Deleted task files
             
-        except Exception as e:
-            logger.error(f"Error adding new task from {task_file_path}: {str(e)}")
-            return False
+        Returns:
+            Dictionary with the task names that were reloaded or removed, and
+            the file stems that failed to load
+        """
+        start_time = time.time()
+        summary = {"reloaded": [], "removed": [], "failed": []}
+        
+        for file_path in list(added) + list(modified):
+            task_name = self._load_task_file(file_path)
+            if task_name is not None:
+                summary["reloaded"].append(task_name)
+            else:
+                summary["failed"].append(file_path.stem)
+        
+        for file_path in removed:
+            task_name = self._remove_task_file(file_path)
+            if task_name is not None:
+                summary["removed"].append(task_name)
+        
+        logger.info(f"Applied task file changes in {(time.time() - start_time) * 1000:.1f}ms: "
+                    f"reloaded={summary['reloaded']}, removed={summary['removed']}, failed={summary['failed']}")
+        return summary
+    
+    def start_task_watcher(self, poll_interval: float = 1.0) -> None:
+        """
+        Start watching the tasks directory and hot-reload changed task files
+        
+        Args:
+            poll_interval: Seconds between directory scans
+        """
+        if self.task_watcher is None:
+            self.task_watcher = TaskFileWatcher(
+                self.tasks_directory,
+                self.apply_task_file_changes,
+                poll_interval=poll_interval
+            )
+        self.task_watcher.start()
+    
+    def stop_task_watcher(self) -> None:
+        """Stop the task file watcher if it is running"""
+        if self.task_watcher is not None:
+            self.task_watcher.stop()
+    
+    def shutdown(self) -> None:
+        """Stop the task watcher and the vector engine's background batcher"""
+        self.stop_task_watcher()
+        close = getattr(self.vector_engine, "close", None)
+        if close is not None:
+            close()
     
     def get_system_stats(self) -> Dict[str, Any]:
         """
@@ -410,6 +843,7 @@ class RAGKnowledgeBase:
         Returns:
             Dictionary with system performance and usage statistics
         """
+        search_counts = {scope: int(count) for scope, count in self.search_stats.totals().items()}
         stats = {
             "knowledge_base": {
                 "total_tasks": len(self.loaded_tasks),
@@ -417,6 +851,17 @@ class RAGKnowledgeBase:
                 "is_initialized": self.is_initialized,
                 "tasks_directory": str(self.tasks_directory)
             },
+            "locality_search": {
+                **search_counts,
+                "local_hit_rate": search_counts["local"] / max(1, search_counts["local"] + search_counts["widened"]),
+                "steps_back": self.locality_steps_back,
+                "steps_ahead": self.locality_steps_ahead,
+                "threshold": self.locality_threshold
+            },
+            "hot_reload": {
+                **self.reload_stats,
+                "watcher": self.task_watcher.get_stats() if self.task_watcher else None
+            },
             "vector_engine": self.vector_engine.get_performance_stats(),
             "vector_optimizer": self.vector_optimizer.get_optimization_stats(),
             "task_loader": self.task_loader.get_performance_stats()
@@ -437,6 +882,8 @@ class RAGKnowledgeBase:
             tools_needed=[],
             completion_indicators=[],
             visual_cues=[],
+            estimated_duration="",
+            safety_notes=[],
             similarity=0.0,
             confidence_level="none",
             matched_cues=[],
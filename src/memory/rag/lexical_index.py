@@ -0,0 +1,251 @@
+"""
+Lexical Inverted Index for Task Steps
+
+Implements a small BM25 index over step titles, visual cues and tools.
+The index is built at load time alongside the vector store and is used to:
+1. Score exact keyword hits (e.g. "portafilter", "grinder") that dense
+   embeddings tend to blur
+2. Compute matched visual cues by token-set intersection
+"""
+
+import heapq
+import logging
+import math
+import re
+from collections import Counter
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from .task_loader import TaskStep
+
+logger = logging.getLogger(__name__)
+
+# Words shorter than this carry little signal in VLM descriptions
+MIN_TOKEN_LENGTH = 3
+
+STOPWORDS = frozenset({
+    "the", "and", "with", "into", "from", "that", "this", "then", "than",
+    "are", "was", "were", "has", "have", "been", "being", "for", "its",
+    "there", "their", "some", "what", "which", "while", "will", "can",
+    "not", "but", "all", "any", "out", "over", "onto", "about", "also",
+})
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into normalized index tokens
+
+    Args:
+        text: Free text (observation, title, cue or tool name)
+
+    Returns:
+        List of lowercase tokens with stopwords and short words removed
+    """
+    if not text:
+        return []
+
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) < MIN_TOKEN_LENGTH or token in STOPWORDS:
+            continue
+        # Light plural folding so "beans" matches "bean"
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+class LexicalIndex:
+    """
+    BM25 inverted index over task step text fields
+
+    Documents are keyed by the same IDs used in the vector store, so lexical
+    scores can be fused with dense similarities for the same candidates.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize an empty index
+
+        Args:
+            k1: BM25 term-frequency saturation parameter
+            b: BM25 document-length normalization parameter
+        """
+        self.k1 = k1
+        self.b = b
+
+        # token -> {doc_id: term frequency}
+        self.postings: Dict[str, Dict[str, int]] = {}
+        self.doc_lengths: Dict[str, int] = {}
+        self.doc_tokens: Dict[str, Counter] = {}
+        self.total_length = 0
+
+        # doc_id -> [(cue, cue token set)] for matched-cue computation
+        self.cue_tokens: Dict[str, List[Tuple[str, FrozenSet[str]]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.doc_lengths)
+
+    @property
+    def avg_doc_length(self) -> float:
+        """Average indexed document length in tokens"""
+        return self.total_length / len(self.doc_lengths) if self.doc_lengths else 0.0
+
+    @staticmethod
+    def step_tokens(step: TaskStep) -> List[str]:
+        """
+        Collect the indexed tokens of a task step
+
+        Args:
+            step: TaskStep to index
+
+        Returns:
+            Tokens from the step title, visual cues and tools
+        """
+        tokens = tokenize(step.title)
+        for cue in step.visual_cues:
+            tokens.extend(tokenize(cue.replace('_', ' ')))
+        for tool in step.tools_needed:
+            tokens.extend(tokenize(tool.replace('_', ' ')))
+        return tokens
+
+    def add_step(self, doc_id: str, step: TaskStep) -> None:
+        """
+        Index (or re-index) a task step
+
+        Args:
+            doc_id: Document ID shared with the vector store
+            step: TaskStep to index
+        """
+        self.remove(doc_id)
+
+        counts = Counter(self.step_tokens(step))
+        for token, frequency in counts.items():
+            self.postings.setdefault(token, {})[doc_id] = frequency
+
+        length = sum(counts.values())
+        self.doc_tokens[doc_id] = counts
+        self.doc_lengths[doc_id] = length
+        self.total_length += length
+
+        self.cue_tokens[doc_id] = [
+            (cue, frozenset(tokenize(cue.replace('_', ' '))))
+            for cue in step.visual_cues if cue
+        ]
+
+    def remove(self, doc_id: str) -> None:
+        """
+        Remove a document from the index if present
+
+        Args:
+            doc_id: Document ID to remove
+        """
+        counts = self.doc_tokens.pop(doc_id, None)
+        if counts is None:
+            return
+
+        for token in counts:
+            postings = self.postings.get(token)
+            if postings is not None:
+                postings.pop(doc_id, None)
+                if not postings:
+                    del self.postings[token]
+
+        self.total_length -= self.doc_lengths.pop(doc_id, 0)
+        self.cue_tokens.pop(doc_id, None)
+
+    def copy(self) -> "LexicalIndex":
+        """
+        Copy the index so it can be modified without affecting readers
+
+        Posting lists are copied; per-document token counts and cue sets are
+        never mutated in place and are shared.
+
+        Returns:
+            Independent LexicalIndex with the same documents
+        """
+        clone = LexicalIndex(self.k1, self.b)
+        clone.postings = {token: dict(postings) for token, postings in self.postings.items()}
+        clone.doc_lengths = dict(self.doc_lengths)
+        clone.doc_tokens = dict(self.doc_tokens)
+        clone.cue_tokens = dict(self.cue_tokens)
+        clone.total_length = self.total_length
+        return clone
+
+    def clear(self) -> None:
+        """Remove every document from the index"""
+        self.postings.clear()
+        self.doc_lengths.clear()
+        self.doc_tokens.clear()
+        self.cue_tokens.clear()
+        self.total_length = 0
+
+    def score(self,
+              query_tokens: Iterable[str],
+              doc_ids: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """
+        Compute BM25 scores for a tokenized query
+
+        Args:
+            query_tokens: Tokens produced by tokenize()
+            doc_ids: Optional candidate IDs to restrict scoring to
+
+        Returns:
+            Dictionary of doc_id -> BM25 score for documents with any hit
+        """
+        candidates: Optional[Set[str]] = set(doc_ids) if doc_ids is not None else None
+        num_docs = len(self.doc_lengths)
+        if num_docs == 0:
+            return {}
+
+        avg_length = self.avg_doc_length or 1.0
+        scores: Dict[str, float] = {}
+
+        for token in set(query_tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+
+            idf = math.log(1.0 + (num_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                if candidates is not None and doc_id not in candidates:
+                    continue
+                length_norm = self.k1 * (1.0 - self.b + self.b * self.doc_lengths[doc_id] / avg_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self.k1 + 1.0) / (frequency + length_norm)
+
+        return scores
+
+    def top(self,
+            query_tokens: Iterable[str],
+            k: int,
+            doc_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Find the highest-scoring documents for a tokenized query
+
+        Args:
+            query_tokens: Tokens produced by tokenize()
+            k: Maximum number of documents to return
+            doc_ids: Optional candidate IDs to restrict scoring to
+
+        Returns:
+            List of (doc_id, BM25 score), best first
+        """
+        scores = self.score(query_tokens, doc_ids)
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+    def matched_cues(self, doc_id: str, query_tokens: Set[str]) -> List[str]:
+        """
+        Find the visual cues of a document that share a token with the query
+
+        Args:
+            doc_id: Document ID
+            query_tokens: Token set of the observation
+
+        Returns:
+            List of cues (original text) with at least one shared token
+        """
+        return [
+            cue for cue, tokens in self.cue_tokens.get(doc_id, [])
+            if tokens & query_tokens
+        ]
@@ -7,18 +7,191 @@ for the RAG vector search system, including:
 2. Cache performance analysis
 3. Optimization effectiveness measurement
 4. System load testing
+5. Regression runs: p50/p95/p99 latency split into embedding and search
+   time, memory deltas and throughput per concurrency level, saved as JSON
+   baselines and compared against them (see main)
 """
 
+import argparse
+import json
+import os
 import time
 import statistics
 import logging
-from typing import List, Dict, Any, Tuple
+import tracemalloc
+from pathlib import Path
+from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import random
 
 logger = logging.getLogger(__name__)
 
+BASELINE_FORMAT_VERSION = 1
+
+# Metrics compared against a baseline: (path, direction); direction is
+# "lower" when smaller values are better
+REGRESSION_METRICS = [
+    ("latency.embed_ms.p50", "lower"),
+    ("latency.embed_ms.p95", "lower"),
+    ("latency.search_ms.p50", "lower"),
+    ("latency.search_ms.p95", "lower"),
+    ("latency.total_ms.p50", "lower"),
+    ("latency.total_ms.p95", "lower"),
+    ("latency.total_ms.p99", "lower"),
+    ("memory.python_peak_kb", "lower"),
+]
+
+# Differences below these absolute amounts are treated as noise
+REGRESSION_NOISE_FLOOR = {"_ms": 1.0, "_kb": 256.0, "throughput": 5.0}
+
+
+def latency_summary(values: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies (nearest-rank percentiles)
+    
+    Args:
+        values: Latencies in milliseconds
+        
+    Returns:
+        Dictionary with mean, p50, p95, p99 and max
+    """
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    
+    def percentile(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+    
+    return {
+        "mean": statistics.mean(ordered),
+        "p50": percentile(0.50),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1]
+    }
+
+
+def _current_rss_kb() -> Optional[float]:
+    """Resident set size of this process in KB, if psutil is available"""
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process(os.getpid()).memory_info().rss / 1024
+
+
+def _lookup(results: Dict[str, Any], path: str) -> Optional[float]:
+    """Read a dotted metric path, returning None if any part is missing"""
+    value: Any = results
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value if isinstance(value, (int, float)) else None
+
+
+def _noise_floor(path: str) -> float:
+    for marker, floor in REGRESSION_NOISE_FLOOR.items():
+        if marker in path:
+            return floor
+    return 0.0
+
+
+def save_baseline(results: Dict[str, Any], path: Path) -> Path:
+    """
+    Write regression results as a JSON baseline
+    
+    Args:
+        results: Output of PerformanceTester.run_regression_suite
+        path: Destination file
+        
+    Returns:
+        Path of the written file
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = dict(results, format_version=BASELINE_FORMAT_VERSION)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_baseline(path: Path) -> Optional[Dict[str, Any]]:
+    """
+    Load a JSON baseline
+    
+    Args:
+        path: Baseline file
+        
+    Returns:
+        Baseline dictionary, or None if missing, unreadable or of another format
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning(f"Failed to read performance baseline {path}: {str(e)}")
+        return None
+    if baseline.get("format_version") != BASELINE_FORMAT_VERSION:
+        logger.warning(f"Ignoring performance baseline {path}: unsupported format")
+        return None
+    return baseline
+
+
+def compare_to_baseline(results: Dict[str, Any],
+                        baseline: Dict[str, Any],
+                        tolerance: float = 0.20) -> Dict[str, Any]:
+    """
+    Compare a regression run with a baseline
+    
+    A metric regresses when it is worse than the baseline by more than
+    ``tolerance`` (relative) and by more than its noise floor (absolute).
+    Throughput is compared per concurrency level present in both runs.
+    
+    Args:
+        results: Current run (run_regression_suite output)
+        baseline: Baseline run
+        tolerance: Allowed relative slowdown, e.g. 0.20 for 20%
+        
+    Returns:
+        Dictionary with passed flag, regressions and per-metric comparisons
+    """
+    metrics = list(REGRESSION_METRICS)
+    levels = set(results.get("concurrency", {})) & set(baseline.get("concurrency", {}))
+    metrics += [(f"concurrency.{level}.throughput_per_second", "higher") for level in sorted(levels, key=int)]
+    
+    comparisons = []
+    for path, direction in metrics:
+        current = _lookup(results, path)
+        previous = _lookup(baseline, path)
+        if current is None or previous is None:
+            continue
+        
+        worse_by = current - previous if direction == "lower" else previous - current
+        limit = abs(previous) * tolerance
+        regressed = worse_by > limit and worse_by > _noise_floor(path)
+        comparisons.append({
+            "metric": path,
+            "baseline": previous,
+            "current": current,
+            "change_percent": (current - previous) / previous * 100 if previous else 0.0,
+            "regressed": regressed
+        })
+    
+    regressions = [comparison for comparison in comparisons if comparison["regressed"]]
+    return {
+        "passed": not regressions,
+        "tolerance": tolerance,
+        "compared": len(comparisons),
+        "regressions": regressions,
+        "comparisons": comparisons
+    }
+
 
 @dataclass
 class PerformanceResult:
@@ -71,6 +244,20 @@ class PerformanceTester:
             "Equipment is ready for the next step"
         ]
         
+        # Observations labelled with a keyword of the expected coffee_brewing step title
+        self.labeled_observations = [
+            ("Coffee beans, a grinder, a dripper and a mug laid out on the counter", "gather"),
+            ("I'm grinding coffee beans to medium consistency", "grind"),
+            ("The grinder is making noise while processing beans", "grind"),
+            ("The kettle is heating water with steam rising", "heat"),
+            ("Water temperature looks optimal for brewing", "heat"),
+            ("Hot water is being poured slowly in circles over the grounds", "pour"),
+            ("The coffee bed is expanding during bloom", "bloom"),
+            ("Coffee is dripping into the mug below", "pour"),
+            ("I see a full cup of fresh coffee", "serve"),
+            ("Steam is rising from the finished cup of coffee", "serve")
+        ]
+        
         logger.info("Performance tester initialized")
     
     def run_basic_speed_test(self, 
@@ -346,6 +533,358 @@ class PerformanceTester:
         logger.info(f"Optimization effectiveness test completed: improvement={speed_improvement:.1f}%")
         return result
     
+    def run_precompute_benchmark(self, repeats: int = 3) -> Dict[str, Any]:
+        """
+        Compare embedding precompute strategies
+        
+        Measures three scenarios over the loaded tasks, each producing the
+        same in-memory embeddings and cache files:
+        1. Per-step baseline: cold cache, one encode call per step, then one
+           cache file written per task (the path the pipeline replaced)
+        2. Batched: cold cache, one encode call for all changed steps
+        3. Warm: cache files present, nothing to re-encode
+        
+        Args:
+            repeats: Number of runs per scenario
+            
+        Returns:
+            Dictionary with average timings and speedups
+        """
+        logger.info(f"Running precompute benchmark with {repeats} repeats...")
+        
+        optimizer = self.knowledge_base.vector_optimizer
+        tasks = self.knowledge_base.loaded_tasks
+        
+        def per_step_cold():
+            optimizer.clear_all_cache()
+            for task_name, task in tasks.items():
+                embeddings = {}
+                embedding_keys = {}
+                for step in task.steps:
+                    combined_text = optimizer._create_step_text_for_embedding(step)
+                    embedding_keys[step.step_id] = optimizer.vector_engine.compute_embedding_key(combined_text)
+                    embeddings[step.step_id] = optimizer.vector_engine.model.encode(
+                        combined_text, show_progress_bar=False, convert_to_numpy=True
+                    )
+                cache_key = f"{task_name}_embeddings"
+                optimizer.embedding_cache[cache_key] = embeddings
+                optimizer.embedding_keys[cache_key] = embedding_keys
+                optimizer._save_task_cache(task_name, embeddings, embedding_keys)
+        
+        def batched_cold():
+            optimizer.clear_all_cache()
+            optimizer._build_task_embeddings(tasks)
+        
+        def warm():
+            optimizer._build_task_embeddings(tasks)
+        
+        def measure(scenario) -> float:
+            times = []
+            for _ in range(repeats):
+                start_time = time.time()
+                scenario()
+                times.append(time.time() - start_time)
+            return statistics.mean(times)
+        
+        avg_per_step = measure(per_step_cold)
+        avg_batched = measure(batched_cold)
+        batched_stage_timings = dict(optimizer.last_precompute_timings)
+        avg_warm = measure(warm)
+        
+        result = {
+            "total_tasks": len(tasks),
+            "total_steps": sum(len(task.steps) for task in tasks.values()),
+            "per_step_cold_seconds": avg_per_step,
+            "batched_cold_seconds": avg_batched,
+            "warm_seconds": avg_warm,
+            "batched_speedup": avg_per_step / avg_batched if avg_batched > 0 else 0,
+            "warm_speedup": avg_batched / avg_warm if avg_warm > 0 else 0,
+            "batched_stage_timings": batched_stage_timings
+        }
+        
+        logger.info(f"Precompute benchmark completed: per_step={avg_per_step:.3f}s, "
+                    f"batched={avg_batched:.3f}s, warm={avg_warm:.3f}s")
+        return result
+    
+    def run_encoder_benchmark(self, 
+                              encoders: Optional[Dict[str, Any]] = None,
+                              task_name: str = "coffee_brewing",
+                              repeats: int = 3) -> Dict[str, Any]:
+        """
+        Compare encoder backends on latency and recall
+        
+        Each encoder embeds the task's steps and the labelled observations;
+        an observation counts as recalled when a step whose title contains
+        its label ranks within the top 1 / top 3 by cosine similarity.
+        
+        Args:
+            encoders: Mapping of label to Encoder; defaults to the engine's
+                encoder, the hashing encoder and the ONNX encoder if exported
+            task_name: Task whose steps are searched
+            repeats: Timed passes over the observations per encoder
+            
+        Returns:
+            Dictionary of per-encoder results (or skip reasons)
+        """
+        from .encoders import HashingEncoder, create_encoder
+        import numpy as np
+        
+        task = self.knowledge_base.loaded_tasks.get(task_name)
+        if task is None:
+            return {"error": f"Task not loaded: {task_name}"}
+        
+        engine = self.knowledge_base.vector_engine
+        results: Dict[str, Any] = {}
+        
+        if encoders is None:
+            encoders = {f"{engine.model.backend} (active)": engine.model, "hashing": HashingEncoder()}
+            if engine.model.backend != "onnx":
+                try:
+                    encoders["onnx"] = create_encoder({"backend": "onnx"})
+                except Exception as e:
+                    results["onnx"] = {"skipped": str(e)}
+        
+        step_texts = [engine._create_step_text_for_embedding(step) for step in task.steps]
+        step_titles = [step.title.lower() for step in task.steps]
+        observations = [observation for observation, _ in self.labeled_observations]
+        
+        for label, encoder in encoders.items():
+            start_time = time.time()
+            step_matrix = np.asarray(encoder.encode(step_texts, show_progress_bar=False), dtype=np.float32)
+            index_time_ms = (time.time() - start_time) * 1000
+            step_matrix /= np.clip(np.linalg.norm(step_matrix, axis=1, keepdims=True), 1e-12, None)
+            
+            latencies = []
+            hits_at_1 = hits_at_3 = 0
+            for run in range(repeats):
+                for observation, expected in self.labeled_observations:
+                    start_time = time.time()
+                    query = np.asarray(encoder.encode(observation, show_progress_bar=False), dtype=np.float32)
+                    latencies.append((time.time() - start_time) * 1000)
+                    
+                    if run > 0:
+                        continue
+                    scores = step_matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+                    ranked = [step_titles[i] for i in np.argsort(-scores)[:3]]
+                    hits_at_1 += expected in ranked[0]
+                    hits_at_3 += any(expected in title for title in ranked)
+            
+            results[label] = {
+                "encoder": repr(encoder),
+                "index_time_ms": index_time_ms,
+                "avg_query_ms": statistics.mean(latencies),
+                "p95_query_ms": sorted(latencies)[int(0.95 * (len(latencies) - 1))],
+                "recall_at_1": hits_at_1 / len(observations),
+                "recall_at_3": hits_at_3 / len(observations)
+            }
+            logger.info(f"Encoder benchmark [{label}]: avg={results[label]['avg_query_ms']:.2f}ms, "
+                        f"recall@1={results[label]['recall_at_1']:.2f}, recall@3={results[label]['recall_at_3']:.2f}")
+        
+        return results
+    
+    def run_latency_profile(self, num_searches: int = 100, warmup: int = 5) -> Dict[str, Any]:
+        """
+        Measure search latency split into embedding and index search time
+        
+        Each observation is encoded once (embed) and then matched with the
+        precomputed query embedding (search), the same split the knowledge
+        base uses internally. The timed pass runs without tracemalloc, whose
+        allocation hooks would inflate the latencies; Python heap growth is
+        measured in a separate traced pass over the same observations, and
+        process RSS is recorded across the timed pass.
+        
+        Args:
+            num_searches: Number of timed searches
+            warmup: Untimed searches run first
+            
+        Returns:
+            Dictionary with latency summaries and memory deltas
+        """
+        logger.info(f"Running latency profile with {num_searches} searches...")
+        
+        engine = self.knowledge_base.vector_engine
+        observations = [self.test_observations[i % len(self.test_observations)] for i in range(num_searches)]
+        
+        for observation in self.test_observations[:warmup]:
+            engine.find_best_match(observation, query_embedding=engine.encode_observation(observation))
+        
+        embed_times, search_times, total_times = [], [], []
+        rss_before = _current_rss_kb()
+        
+        for observation in observations:
+            start = time.perf_counter()
+            embedding = engine.encode_observation(observation)
+            encoded = time.perf_counter()
+            engine.find_best_match(observation, query_embedding=embedding)
+            done = time.perf_counter()
+            
+            embed_times.append((encoded - start) * 1000)
+            search_times.append((done - encoded) * 1000)
+            total_times.append((done - start) * 1000)
+        
+        rss_after = _current_rss_kb()
+        
+        tracing = tracemalloc.is_tracing()
+        if not tracing:
+            tracemalloc.start()
+        heap_before, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        for observation in observations:
+            engine.find_best_match(observation, query_embedding=engine.encode_observation(observation))
+        heap_after, heap_peak = tracemalloc.get_traced_memory()
+        if not tracing:
+            tracemalloc.stop()
+        
+        result = {
+            "searches": num_searches,
+            "latency": {
+                "embed_ms": latency_summary(embed_times),
+                "search_ms": latency_summary(search_times),
+                "total_ms": latency_summary(total_times)
+            },
+            "memory": {
+                "python_delta_kb": (heap_after - heap_before) / 1024,
+                "python_peak_kb": (heap_peak - heap_before) / 1024,
+                "rss_delta_kb": rss_after - rss_before if rss_before is not None and rss_after is not None else None
+            }
+        }
+        
+        logger.info(f"Latency profile completed: total p50={result['latency']['total_ms']['p50']:.2f}ms, "
+                    f"p95={result['latency']['total_ms']['p95']:.2f}ms")
+        return result
+    
+    def run_concurrency_sweep(self,
+                              levels: Tuple[int, ...] = (1, 2, 4, 8),
+                              searches_per_level: int = 64) -> Dict[str, Any]:
+        """
+        Measure throughput and latency at several concurrency levels
+        
+        Args:
+            levels: Numbers of concurrent client threads
+            searches_per_level: Total searches per level (split across threads)
+            
+        Returns:
+            Dictionary keyed by concurrency level (as a string, for JSON)
+        """
+        logger.info(f"Running concurrency sweep over levels {list(levels)}...")
+        
+        def search(observation: str) -> float:
+            start = time.perf_counter()
+            self.knowledge_base.find_matching_step(observation)
+            return (time.perf_counter() - start) * 1000
+        
+        results = {}
+        for level in levels:
+            observations = [self.test_observations[i % len(self.test_observations)] for i in range(searches_per_level)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as executor:
+                latencies = list(executor.map(search, observations))
+            elapsed = time.perf_counter() - start
+            
+            results[str(level)] = {
+                "searches": len(latencies),
+                "elapsed_seconds": elapsed,
+                "throughput_per_second": len(latencies) / elapsed if elapsed > 0 else 0.0,
+                "latency_ms": latency_summary(latencies)
+            }
+            logger.info(f"Concurrency {level}: {results[str(level)]['throughput_per_second']:.1f} searches/sec")
+        
+        return results
+    
+    def run_scaling_benchmark(self,
+                              max_threads: Optional[int] = None,
+                              searches_per_thread: int = 50,
+                              include_encoding: bool = False) -> Dict[str, Any]:
+        """
+        Measure how search throughput scales with concurrent threads
+        
+        Every thread runs the same number of searches, so ideal scaling
+        keeps the elapsed time constant as threads are added. By default
+        query embeddings are computed up front so only the read path
+        (index query, step table and BM25 lookups) is measured.
+        
+        Args:
+            max_threads: Highest thread count (defaults to the CPU count)
+            searches_per_thread: Searches run by each thread
+            include_encoding: Encode observations inside the timed searches
+        
+        Returns:
+            Dictionary with per-level throughput and scaling efficiency
+            (throughput / (threads * single-thread throughput))
+        """
+        engine = self.knowledge_base.vector_engine
+        max_threads = max_threads or os.cpu_count() or 1
+        levels = sorted({1, max_threads} | {2 ** i for i in range(1, max_threads.bit_length()) if 2 ** i < max_threads})
+        logger.info(f"Running scaling benchmark over {levels} threads...")
+        
+        embeddings = {observation: engine.encode_observation(observation) for observation in self.test_observations}
+        
+        def worker(offset: int) -> None:
+            for i in range(searches_per_thread):
+                observation = self.test_observations[(offset + i) % len(self.test_observations)]
+                query_embedding = None if include_encoding else embeddings[observation]
+                engine.find_best_match(observation, query_embedding=query_embedding)
+        
+        worker(0)  # warm up
+        
+        results: Dict[str, Any] = {}
+        single_throughput = None
+        for level in levels:
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=level) as executor:
+                list(executor.map(worker, range(level)))
+            elapsed = time.perf_counter() - start
+            
+            throughput = level * searches_per_thread / elapsed if elapsed > 0 else 0.0
+            single_throughput = single_throughput or throughput
+            results[str(level)] = {
+                "threads": level,
+                "elapsed_seconds": elapsed,
+                "throughput_per_second": throughput,
+                "speedup": throughput / single_throughput if single_throughput else 0.0,
+                "efficiency": throughput / (level * single_throughput) if single_throughput else 0.0
+            }
+            logger.info(f"Scaling {level} threads: {throughput:.1f} searches/sec "
+                        f"(efficiency {results[str(level)]['efficiency']:.0%})")
+        
+        return {
+            "cpu_count": os.cpu_count(),
+            "include_encoding": include_encoding,
+            "searches_per_thread": searches_per_thread,
+            "levels": results
+        }
+    
+    def run_regression_suite(self,
+                             num_searches: int = 200,
+                             levels: Tuple[int, ...] = (1, 2, 4, 8),
+                             searches_per_level: int = 64) -> Dict[str, Any]:
+        """
+        Run the measurements compared by compare_to_baseline
+        
+        Args:
+            num_searches: Searches for the latency profile
+            levels: Concurrency levels for the throughput sweep
+            searches_per_level: Searches per concurrency level
+            
+        Returns:
+            JSON-serializable results with run metadata
+        """
+        engine = self.knowledge_base.vector_engine
+        profile = self.run_latency_profile(num_searches)
+        return {
+            "metadata": {
+                "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "model_name": engine.model_name,
+                "encoder_backend": getattr(engine.model, "backend", "unknown"),
+                "tasks": len(self.knowledge_base.loaded_tasks),
+                "steps": sum(len(task.steps) for task in self.knowledge_base.loaded_tasks.values()),
+                "cpu_count": os.cpu_count()
+            },
+            "latency": profile["latency"],
+            "memory": profile["memory"],
+            "concurrency": self.run_concurrency_sweep(levels, searches_per_level)
+        }
+    
     def run_comprehensive_performance_suite(self) -> Dict[str, Any]:
         """
         Run comprehensive performance test suite
@@ -367,9 +906,21 @@ class PerformanceTester:
             # Concurrent load test
             results["concurrent_load_test"] = self.run_concurrent_load_test()
             
+            # Embed/search latency percentiles and memory deltas
+            results["latency_profile"] = self.run_latency_profile()
+            
+            # Read-path scaling up to the core count
+            results["scaling_benchmark"] = self.run_scaling_benchmark()
+            
             # Optimization effectiveness test
             results["optimization_effectiveness_test"] = self.run_optimization_effectiveness_test()
             
+            # Precompute pipeline benchmark
+            results["precompute_benchmark"] = self.run_precompute_benchmark()
+            
+            # Encoder backend comparison
+            results["encoder_benchmark"] = self.run_encoder_benchmark()
+            
             # System stats
             results["system_stats"] = self.knowledge_base.get_system_stats()
             
@@ -452,4 +1003,61 @@ class PerformanceTester:
         if not recommendations:
             recommendations.append("Performance is good! Consider monitoring for regression")
         
-        return recommendations
\ No newline at end of file
+        return recommendations
+
+
+def main(argv=None) -> int:
+    """Command line entry point: run the regression suite and gate on a baseline"""
+    parser = argparse.ArgumentParser(description="RAG performance regression run")
+    parser.add_argument('--tasks', default='data/tasks',
+                        help='Task YAML directory (default: data/tasks)')
+    parser.add_argument('--baseline', default='cache/perf_baseline.json',
+                        help='Baseline JSON file (default: cache/perf_baseline.json)')
+    parser.add_argument('--output', default=None,
+                        help='Optional file for this run\'s results and comparison')
+    parser.add_argument('--tolerance', type=float, default=0.20,
+                        help='Allowed relative regression (default: 0.20)')
+    parser.add_argument('--searches', type=int, default=200,
+                        help='Searches in the latency profile (default: 200)')
+    parser.add_argument('--levels', default='1,2,4,8',
+                        help='Comma-separated concurrency levels (default: 1,2,4,8)')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Write this run as the new baseline instead of comparing')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .knowledge_base import RAGKnowledgeBase
+    knowledge_base = RAGKnowledgeBase(tasks_directory=args.tasks)
+    knowledge_base.initialize(precompute_embeddings=True)
+
+    tester = PerformanceTester(knowledge_base)
+    levels = tuple(int(level) for level in args.levels.split(',') if level.strip())
+    results = tester.run_regression_suite(num_searches=args.searches, levels=levels)
+
+    baseline = None if args.update_baseline else load_baseline(Path(args.baseline))
+    if baseline is None:
+        save_baseline(results, Path(args.baseline))
+        print(f"Baseline written: {args.baseline}")
+        exit_code = 0
+        report = {"results": results, "comparison": None}
+    else:
+        comparison = compare_to_baseline(results, baseline, args.tolerance)
+        report = {"results": results, "comparison": comparison}
+        for regression in comparison["regressions"]:
+            print(f"REGRESSION {regression['metric']}: {regression['baseline']:.3f} -> "
+                  f"{regression['current']:.3f} ({regression['change_percent']:+.1f}%)")
+        print(f"{comparison['compared']} metrics compared, {len(comparison['regressions'])} regressed "
+              f"(tolerance {args.tolerance:.0%})")
+        exit_code = 0 if comparison["passed"] else 1
+
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
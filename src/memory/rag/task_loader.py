@@ -5,19 +5,24 @@ This module provides functionality to load and manage task knowledge from YAML f
 It includes caching, validation, and easy access to task information for the RAG system.
 """
 
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+import logging
+import os
+import time
 import yaml
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from dataclasses import dataclass
+from dataclasses import dataclass, field, asdict
 try:
     from .validation import TaskKnowledgeValidator, TaskValidationError
 except ImportError:
     # Handle standalone execution
     import sys
-    import os
     sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '..'))
     from src.memory.rag.validation import TaskKnowledgeValidator, TaskValidationError
 
+logger = logging.getLogger(__name__)
+
 
 @dataclass
 class TaskStep:
@@ -85,15 +90,117 @@ class TaskKnowledge:
         return list(set(all_tools))  # Remove duplicates
 
 
+@dataclass
+class TaskLoadError:
+    """Structured description of a task file that failed to load"""
+    task_name: str
+    file_path: str
+    stage: str  # "read", "parse", "validate" or "convert"
+    errors: List[str] = field(default_factory=list)
+    
+    def __str__(self) -> str:
+        return f"{self.task_name} ({self.stage}): {'; '.join(self.errors)}"
+
+
+def convert_task_data(task_data: Dict[str, Any]) -> TaskKnowledge:
+    """Convert validated YAML data to a TaskKnowledge object"""
+    
+    # Convert steps
+    steps = []
+    for step_data in task_data['steps']:
+        step = TaskStep(
+            step_id=step_data['step_id'],
+            title=step_data['title'],
+            task_description=step_data['task_description'],
+            tools_needed=step_data['tools_needed'],
+            completion_indicators=step_data['completion_indicators'],
+            visual_cues=step_data['visual_cues'],
+            estimated_duration=step_data['estimated_duration'],
+            safety_notes=step_data.get('safety_notes', [])
+        )
+        steps.append(step)
+    
+    # Create TaskKnowledge object
+    return TaskKnowledge(
+        task_name=task_data['task_name'],
+        display_name=task_data['display_name'],
+        description=task_data['description'],
+        steps=steps,
+        estimated_total_duration=task_data.get('estimated_total_duration'),
+        difficulty_level=task_data.get('difficulty_level'),
+        metadata=task_data.get('metadata', {}),
+        global_safety_notes=task_data.get('global_safety_notes', []),
+        task_completion_indicators=task_data.get('task_completion_indicators', [])
+    )
+
+
+def parse_task_file(file_path: Path) -> Tuple[Optional[TaskKnowledge], Optional[TaskLoadError], Dict[str, float]]:
+    """
+    Read, parse, validate and convert a task file in a single pass
+    
+    Module-level so it can run in worker processes.
+    
+    Args:
+        file_path: Path to the task YAML file
+        
+    Returns:
+        Tuple of (task or None, load error or None, per-stage timings in ms)
+    """
+    file_path = Path(file_path)
+    task_name = file_path.stem
+    timings: Dict[str, float] = {}
+    
+    def fail(stage: str, errors: List[str]):
+        timings["total_ms"] = sum(timings.values())
+        return None, TaskLoadError(task_name, str(file_path), stage, errors), timings
+    
+    stage_start = time.perf_counter()
+    try:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            content = file.read()
+    except Exception as e:
+        return fail("read", [f"Failed to read task file: {str(e)}"])
+    timings["read_ms"] = (time.perf_counter() - stage_start) * 1000
+    
+    stage_start = time.perf_counter()
+    try:
+        task_data = yaml.safe_load(content)
+    except yaml.YAMLError as e:
+        timings["parse_ms"] = (time.perf_counter() - stage_start) * 1000
+        return fail("parse", [f"YAML parsing error: {str(e)}"])
+    timings["parse_ms"] = (time.perf_counter() - stage_start) * 1000
+    
+    # Same checks as validate_task_file, so pool and sequential loads agree
+    stage_start = time.perf_counter()
+    is_valid, errors = TaskKnowledgeValidator().validate_file_data(task_data)
+    timings["validate_ms"] = (time.perf_counter() - stage_start) * 1000
+    if not is_valid:
+        return fail("validate", list(errors))
+    
+    stage_start = time.perf_counter()
+    try:
+        task_knowledge = convert_task_data(task_data)
+    except Exception as e:
+        return fail("convert", [f"Failed to convert task data: {str(e)}"])
+    timings["convert_ms"] = (time.perf_counter() - stage_start) * 1000
+    
+    timings["total_ms"] = sum(timings.values())
+    return task_knowledge, None, timings
+
+
 class TaskKnowledgeLoader:
     """Loads and manages task knowledge from YAML files"""
     
-    def __init__(self, tasks_directory: Path = None):
+    # Libraries with at least this many changed files are parsed in a process pool
+    PARALLEL_MIN_FILES = 16
+    
+    def __init__(self, tasks_directory: Path = None, max_workers: Optional[int] = None):
         """
         Initialize the task loader
         
         Args:
             tasks_directory: Directory containing task YAML files
+            max_workers: Worker processes for parallel loading (default: CPU count)
         """
         if tasks_directory is None:
             tasks_directory = Path("data/tasks")
@@ -102,6 +209,12 @@ class TaskKnowledgeLoader:
         self.validator = TaskKnowledgeValidator()
         self._task_cache: Dict[str, TaskKnowledge] = {}
         self._loaded_files: Dict[str, Path] = {}
+        self._file_mtimes: Dict[str, int] = {}
+        
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.file_timings: Dict[str, Dict[str, float]] = {}
+        self.load_errors: List[TaskLoadError] = []
+        self.last_load_stats: Dict[str, Any] = {}
     
     def load_task(self, task_name: str, file_path: Optional[Path] = None) -> TaskKnowledge:
         """
@@ -118,93 +231,174 @@ class TaskKnowledgeLoader:
             TaskValidationError: If the task file is invalid
             FileNotFoundError: If the task file is not found
         """
-        # Check cache first
-        if task_name in self._task_cache:
-            return self._task_cache[task_name]
-        
         # Determine file path
         if file_path is None:
-            file_path = self.tasks_directory / f"{task_name}.yaml"
-        
-        # Validate file
-        is_valid, errors = self.validator.validate_task_file(file_path)
-        if not is_valid:
-            raise TaskValidationError(f"Task validation failed for {task_name}: {errors}")
+            file_path = self._loaded_files.get(task_name, self.tasks_directory / f"{task_name}.yaml")
         
-        # Load YAML data
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                task_data = yaml.safe_load(file)
-        except Exception as e:
-            raise TaskValidationError(f"Failed to load task file {file_path}: {str(e)}")
+        # Check cache first; a cached task is only reused while its file is unchanged
+        if task_name in self._task_cache and self._file_mtimes.get(task_name) == self._get_file_mtime(file_path):
+            return self._task_cache[task_name]
         
-        # Convert to TaskKnowledge object
-        task_knowledge = self._convert_to_task_knowledge(task_data)
+        # Read, parse and validate the file once
+        task_knowledge, error, timings = parse_task_file(file_path)
+        self.file_timings[task_name] = timings
+        if error is not None:
+            if error.stage == "read" and not Path(file_path).exists():
+                raise FileNotFoundError(f"Task file not found: {file_path}")
+            raise TaskValidationError(f"Task validation failed for {task_name}: {error.errors}")
         
         # Cache the result
-        self._task_cache[task_name] = task_knowledge
-        self._loaded_files[task_name] = file_path
+        self.register_task(task_name, task_knowledge, file_path)
         
         return task_knowledge
     
-    def _convert_to_task_knowledge(self, task_data: Dict[str, Any]) -> TaskKnowledge:
-        """Convert raw YAML data to TaskKnowledge object"""
+    @staticmethod
+    def _get_file_mtime(file_path: Path) -> Optional[int]:
+        """Get a file's modification time in nanoseconds, or None if missing"""
+        try:
+            return Path(file_path).stat().st_mtime_ns
+        except OSError:
+            return None
+    
+    def load_task_from_file(self, file_path: Path) -> TaskKnowledge:
+        """
+        Load a task from an arbitrary YAML file, named after the file stem
+        
+        Args:
+            file_path: Path to the task YAML file
+            
+        Returns:
+            TaskKnowledge object
+        """
+        file_path = Path(file_path)
+        return self.load_task(file_path.stem, file_path)
+    
+    def register_task(self, task_name: str, task: TaskKnowledge, file_path: Path) -> None:
+        """
+        Cache a task that was loaded elsewhere (e.g. from a compiled snapshot)
         
-        # Convert steps
-        steps = []
-        for step_data in task_data['steps']:
-            step = TaskStep(
-                step_id=step_data['step_id'],
-                title=step_data['title'],
-                task_description=step_data['task_description'],
-                tools_needed=step_data['tools_needed'],
-                completion_indicators=step_data['completion_indicators'],
-                visual_cues=step_data['visual_cues'],
-                estimated_duration=step_data['estimated_duration'],
-                safety_notes=step_data.get('safety_notes', [])
-            )
-            steps.append(step)
+        Args:
+            task_name: Name of the task
+            task: TaskKnowledge object
+            file_path: Source YAML file, used for mtime checks on later loads
+        """
+        self._task_cache[task_name] = task
+        self._loaded_files[task_name] = Path(file_path)
+        self._file_mtimes[task_name] = self._get_file_mtime(file_path)
+    
+    def get_task_file(self, task_name: str) -> Optional[Path]:
+        """
+        Get the source file of a cached task
         
-        # Create TaskKnowledge object
-        task_knowledge = TaskKnowledge(
-            task_name=task_data['task_name'],
-            display_name=task_data['display_name'],
-            description=task_data['description'],
-            steps=steps,
-            estimated_total_duration=task_data.get('estimated_total_duration'),
-            difficulty_level=task_data.get('difficulty_level'),
-            metadata=task_data.get('metadata', {}),
-            global_safety_notes=task_data.get('global_safety_notes', []),
-            task_completion_indicators=task_data.get('task_completion_indicators', [])
-        )
+        Args:
+            task_name: Name the task was loaded under (its file stem)
+            
+        Returns:
+            Path of the YAML file, or None if the task is not loaded
+        """
+        return self._loaded_files.get(task_name)
+    
+    def unload_task(self, task_name: str) -> None:
+        """
+        Drop a task from the cache (e.g. after its file was removed)
         
-        return task_knowledge
+        Args:
+            task_name: Name of the task to drop
+        """
+        self._task_cache.pop(task_name, None)
+        self._loaded_files.pop(task_name, None)
+        self._file_mtimes.pop(task_name, None)
+    
+    def _convert_to_task_knowledge(self, task_data: Dict[str, Any]) -> TaskKnowledge:
+        """Convert raw YAML data to TaskKnowledge object"""
+        return convert_task_data(task_data)
     
-    def load_all_tasks(self) -> Dict[str, TaskKnowledge]:
+    def load_all_tasks(self, parallel: Optional[bool] = None) -> Dict[str, TaskKnowledge]:
         """
         Load all task files from the tasks directory
         
+        Unchanged files are served from the cache. Changed files are parsed and
+        validated once each, in a process pool when there are enough of them.
+        Files that fail are reported in load_errors instead of raising.
+        
+        Args:
+            parallel: Force (True) or disable (False) the process pool; by
+                default it is used for PARALLEL_MIN_FILES or more changed files
+        
         Returns:
             Dictionary mapping task names to TaskKnowledge objects
         """
         if not self.tasks_directory.exists():
             raise FileNotFoundError(f"Tasks directory not found: {self.tasks_directory}")
         
+        start_time = time.perf_counter()
         tasks = {}
         yaml_files = list(self.tasks_directory.glob("*.yaml")) + list(self.tasks_directory.glob("*.yml"))
         
+        # Serve unchanged files from the cache
+        pending = []
         for file_path in yaml_files:
             task_name = file_path.stem
-            try:
-                task_knowledge = self.load_task(task_name, file_path)
-                tasks[task_name] = task_knowledge
-                print(f"Successfully loaded task: {task_name}")
-            except Exception as e:
-                print(f"Failed to load task {task_name}: {str(e)}")
+            if task_name in self._task_cache and self._file_mtimes.get(task_name) == self._get_file_mtime(file_path):
+                tasks[task_name] = self._task_cache[task_name]
+            else:
+                pending.append(file_path)
+        
+        use_pool = parallel if parallel is not None else len(pending) >= self.PARALLEL_MIN_FILES
+        use_pool = use_pool and self.max_workers > 1 and len(pending) > 1
+        results, use_pool = self._parse_files(pending, use_pool)
+        
+        self.load_errors = []
+        for file_path, (task_knowledge, error, timings) in zip(pending, results):
+            task_name = file_path.stem
+            self.file_timings[task_name] = timings
+            if error is not None:
+                self.load_errors.append(error)
+                logger.warning(f"Failed to load task {task_name}: {error}")
                 continue
+            self.register_task(task_name, task_knowledge, file_path)
+            tasks[task_name] = task_knowledge
+            logger.debug(f"Successfully loaded task: {task_name}")
+        
+        self.last_load_stats = {
+            "files": len(yaml_files),
+            "parsed": len(pending),
+            "cached": len(yaml_files) - len(pending),
+            "failed": len(self.load_errors),
+            "mode": "process_pool" if use_pool else "sequential",
+            "workers": min(self.max_workers, len(pending)) if use_pool else 1,
+            "total_ms": (time.perf_counter() - start_time) * 1000
+        }
+        logger.info(f"Loaded {len(tasks)} tasks ({self.last_load_stats['parsed']} parsed, "
+                    f"{self.last_load_stats['cached']} cached, {len(self.load_errors)} failed) "
+                    f"in {self.last_load_stats['total_ms']:.1f}ms [{self.last_load_stats['mode']}]")
         
         return tasks
     
+    def _parse_files(self, file_paths: List[Path], use_pool: bool) -> Tuple[List[Tuple], bool]:
+        """
+        Parse task files sequentially or in a process pool
+        
+        Args:
+            file_paths: Task files to parse
+            use_pool: Whether to use worker processes
+            
+        Returns:
+            Tuple of (parse_task_file results in the order of file_paths,
+            whether the process pool was actually used)
+        """
+        if use_pool:
+            try:
+                workers = min(self.max_workers, len(file_paths))
+                chunksize = max(1, len(file_paths) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    return list(executor.map(parse_task_file, file_paths, chunksize=chunksize)), True
+            except Exception as e:
+                # e.g. process spawning unavailable in the host environment
+                logger.warning(f"Parallel task loading failed, falling back to sequential: {str(e)}")
+        
+        return [parse_task_file(file_path) for file_path in file_paths], False
+    
     def get_task_summary(self, task_name: str) -> Dict[str, Any]:
         """
         Get a summary of a loaded task
@@ -236,6 +430,7 @@ class TaskKnowledgeLoader:
         """Clear the task cache"""
         self._task_cache.clear()
         self._loaded_files.clear()
+        self._file_mtimes.clear()
     
     def is_task_loaded(self, task_name: str) -> bool:
         """Check if a task is already loaded in cache"""
@@ -256,7 +451,11 @@ class TaskKnowledgeLoader:
             "cached_tasks": len(self._task_cache),
             "tasks_directory": str(self.tasks_directory),
             "cache_enabled": True,
-            "loaded_files": len(self._loaded_files)
+            "loaded_files": len(self._loaded_files),
+            "max_workers": self.max_workers,
+            "last_load": self.last_load_stats,
+            "file_timings": self.file_timings,
+            "load_errors": [asdict(error) for error in self.load_errors]
         }
 
 
@@ -0,0 +1,350 @@
+"""
+Compiled Task Library Snapshot
+
+Serializes validated TaskKnowledge objects together with their step
+embeddings into one versioned binary file. The file holds only plain
+builtins (dicts, lists, tuples, strings, numbers and bytes); task objects
+and numpy arrays are rebuilt on load, so the file does not depend on the
+module layout or class definitions. Other values in task data (e.g. YAML
+dates in task metadata) are stored as strings. RAGKnowledgeBase.initialize can
+load the snapshot instead of re-parsing, re-validating and re-embedding every
+task YAML file, as long as the source file hashes and encoder still match.
+
+Usage (from the src directory):
+    python -m memory.rag.task_snapshot compile
+    python -m memory.rag.task_snapshot benchmark --repeats 10
+
+A relative --tasks is resolved against the project root, as RAGKnowledgeBase
+does (default data/tasks). --output defaults to the snapshot the knowledge
+base loads at startup (cache/task_snapshot.pkl under the project root); a
+given --output is resolved against the current directory.
+"""
+
+import argparse
+import datetime
+import hashlib
+import json
+import logging
+import pickle
+import statistics
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from .task_loader import TaskKnowledge, TaskKnowledgeLoader, convert_task_data
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = "task_snapshot"
+SNAPSHOT_FORMAT_VERSION = 3
+TASK_FILE_PATTERNS = ("*.yaml", "*.yml")
+
+
+@dataclass
+class TaskSnapshot:
+    """Contents of a compiled task library snapshot"""
+    model_name: str
+    model_version: str
+    source_hashes: Dict[str, str]
+    tasks: Dict[str, TaskKnowledge]
+    task_files: Dict[str, str] = field(default_factory=dict)  # task_name -> source file name
+    embeddings: Dict[str, Dict[int, Any]] = field(default_factory=dict)
+    embedding_keys: Dict[str, Dict[int, str]] = field(default_factory=dict)
+    created_at: float = 0.0
+    format_version: int = SNAPSHOT_FORMAT_VERSION
+
+
+def compute_source_hashes(tasks_directory: Path) -> Dict[str, str]:
+    """
+    Hash every task file in a directory
+
+    Args:
+        tasks_directory: Directory containing task YAML files
+
+    Returns:
+        Mapping of file name to SHA-256 hex digest of its contents
+    """
+    tasks_directory = Path(tasks_directory)
+    hashes = {}
+    for pattern in TASK_FILE_PATTERNS:
+        for file_path in tasks_directory.glob(pattern):
+            hashes[file_path.name] = hashlib.sha256(file_path.read_bytes()).hexdigest()
+    return hashes
+
+
+class _PlainUnpickler(pickle.Unpickler):
+    """Unpickler that refuses to import anything (snapshots hold builtins only)"""
+
+    def find_class(self, module, name):
+        raise pickle.UnpicklingError(f"Unexpected object in task snapshot: {module}.{name}")
+
+
+def _encode_embedding(embedding: Any) -> tuple:
+    """Encode an embedding as (dtype, shape, raw bytes)"""
+    array = np.asarray(embedding)
+    return (array.dtype.str, array.shape, array.tobytes())
+
+
+def _decode_embedding(encoded: tuple) -> np.ndarray:
+    """Rebuild an embedding encoded by _encode_embedding"""
+    dtype, shape, data = encoded
+    return np.frombuffer(data, dtype=np.dtype(dtype)).reshape(shape)
+
+
+def _plain(value: Any) -> Any:
+    """Convert task data to builtins, storing any other value as a string"""
+    if isinstance(value, dict):
+        return {_plain(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(item) for item in value)
+    if value is None or isinstance(value, (str, bytes, bool, int, float)):
+        return value
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    return str(value)
+
+
+def snapshot_to_payload(snapshot: TaskSnapshot) -> Dict[str, Any]:
+    """
+    Convert a snapshot to plain builtins
+
+    Args:
+        snapshot: Snapshot to convert
+
+    Returns:
+        Payload dictionary tagged with the snapshot format and version
+    """
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "model_name": snapshot.model_name,
+        "model_version": snapshot.model_version,
+        "source_hashes": dict(snapshot.source_hashes),
+        "tasks": {name: _plain(asdict(task)) for name, task in snapshot.tasks.items()},
+        "task_files": dict(snapshot.task_files),
+        "embeddings": {
+            name: {step_id: _encode_embedding(embedding) for step_id, embedding in embeddings.items()}
+            for name, embeddings in snapshot.embeddings.items()
+        },
+        "embedding_keys": {name: dict(keys) for name, keys in snapshot.embedding_keys.items()},
+        "created_at": snapshot.created_at
+    }
+
+
+def snapshot_from_payload(payload: Dict[str, Any]) -> TaskSnapshot:
+    """
+    Rebuild a snapshot from a payload written by snapshot_to_payload
+
+    Args:
+        payload: Payload dictionary (format and version already checked)
+
+    Returns:
+        TaskSnapshot with TaskKnowledge objects and numpy embeddings
+    """
+    return TaskSnapshot(
+        model_name=payload["model_name"],
+        model_version=payload["model_version"],
+        source_hashes=payload["source_hashes"],
+        tasks={name: convert_task_data(data) for name, data in payload["tasks"].items()},
+        task_files=payload["task_files"],
+        embeddings={
+            name: {step_id: _decode_embedding(encoded) for step_id, encoded in embeddings.items()}
+            for name, embeddings in payload["embeddings"].items()
+        },
+        embedding_keys=payload["embedding_keys"],
+        created_at=payload["created_at"]
+    )
+
+
+def save_task_snapshot(snapshot: TaskSnapshot, snapshot_path: Path) -> Path:
+    """
+    Write a snapshot atomically (temporary file + rename)
+
+    Args:
+        snapshot: Snapshot to write
+        snapshot_path: Destination file
+
+    Returns:
+        Path of the written snapshot
+    """
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+
+    tmp_path = snapshot_path.with_suffix(snapshot_path.suffix + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot_to_payload(snapshot), f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp_path.replace(snapshot_path)
+
+    logger.info(f"Task snapshot written to {snapshot_path} ({len(snapshot.tasks)} tasks, "
+                f"{snapshot_path.stat().st_size / 1024:.1f}KB)")
+    return snapshot_path
+
+
+def load_task_snapshot(snapshot_path: Path,
+                       tasks_directory: Path,
+                       model_name: str,
+                       model_version: str) -> Optional[TaskSnapshot]:
+    """
+    Load a snapshot if it is still valid for the given sources and encoder
+
+    Args:
+        snapshot_path: Snapshot file
+        tasks_directory: Directory the snapshot was compiled from
+        model_name: Current encoder model name
+        model_version: Current encoder model version
+
+    Returns:
+        TaskSnapshot, or None if missing, unreadable or stale
+    """
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        logger.info(f"No task snapshot at {snapshot_path}")
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as f:
+            payload = _PlainUnpickler(f).load()
+    except Exception as e:
+        logger.warning(f"Failed to read task snapshot {snapshot_path}: {str(e)}")
+        return None
+
+    if (not isinstance(payload, dict) or payload.get("format") != SNAPSHOT_FORMAT
+            or payload.get("format_version") != SNAPSHOT_FORMAT_VERSION):
+        logger.info(f"Ignoring task snapshot with unsupported format: {snapshot_path}")
+        return None
+
+    try:
+        snapshot = snapshot_from_payload(payload)
+    except Exception as e:
+        logger.warning(f"Failed to decode task snapshot {snapshot_path}: {str(e)}")
+        return None
+
+    if (snapshot.model_name, snapshot.model_version) != (model_name, model_version):
+        logger.info(f"Task snapshot was compiled for {snapshot.model_name}@{snapshot.model_version}, "
+                    f"current encoder is {model_name}@{model_version}")
+        return None
+
+    if snapshot.source_hashes != compute_source_hashes(tasks_directory):
+        logger.info("Task files changed since the snapshot was compiled")
+        return None
+
+    return snapshot
+
+
+def compile_task_snapshot(knowledge_base, snapshot_path: Path) -> Path:
+    """
+    Compile the tasks and embeddings of a knowledge base into a snapshot
+
+    Args:
+        knowledge_base: RAGKnowledgeBase (initialized from the YAML sources if needed)
+        snapshot_path: Destination file
+
+    Returns:
+        Path of the written snapshot
+    """
+    if not knowledge_base.is_initialized:
+        knowledge_base.initialize(precompute_embeddings=True)
+
+    optimizer = knowledge_base.vector_optimizer
+    engine = knowledge_base.vector_engine
+    tasks = dict(knowledge_base.loaded_tasks)
+
+    snapshot = TaskSnapshot(
+        model_name=engine.model_name,
+        model_version=engine.model_version,
+        source_hashes=compute_source_hashes(knowledge_base.tasks_directory),
+        tasks=tasks,
+        task_files={name: knowledge_base.get_task_file(name).name
+                    for name in tasks if knowledge_base.get_task_file(name)},
+        embeddings={name: dict(optimizer.get_task_embeddings(name) or {}) for name in tasks},
+        embedding_keys={name: dict(optimizer.get_task_embedding_keys(name) or {}) for name in tasks},
+        created_at=time.time()
+    )
+    return save_task_snapshot(snapshot, snapshot_path)
+
+
+def benchmark_task_snapshot(knowledge_base, snapshot_path: Path, repeats: int = 5) -> Dict[str, Any]:
+    """
+    Compare task library startup from YAML sources against the snapshot
+
+    The source path covers parsing, validation, conversion and a warm
+    embedding-cache load; the snapshot path covers hashing the sources and
+    unpickling the snapshot. Model loading is identical for both and excluded.
+
+    Args:
+        knowledge_base: RAGKnowledgeBase used to compile the snapshot
+        snapshot_path: Snapshot file (compiled first if missing or stale)
+        repeats: Number of timed runs per path
+
+    Returns:
+        Dictionary with median/min timings in milliseconds and the speedup
+    """
+    from .vector_optimizer import VectorOptimizer
+
+    engine = knowledge_base.vector_engine
+    tasks_directory = knowledge_base.tasks_directory
+
+    if load_task_snapshot(snapshot_path, tasks_directory, engine.model_name, engine.model_version) is None:
+        compile_task_snapshot(knowledge_base, snapshot_path)
+
+    source_times, snapshot_times = [], []
+    for _ in range(repeats):
+        start_time = time.time()
+        tasks = TaskKnowledgeLoader(tasks_directory).load_all_tasks()
+        VectorOptimizer(engine, cache_dir=str(knowledge_base.vector_optimizer.cache_dir)).precompute_all_embeddings(tasks)
+        source_times.append((time.time() - start_time) * 1000)
+
+        start_time = time.time()
+        snapshot = load_task_snapshot(snapshot_path, tasks_directory, engine.model_name, engine.model_version)
+        snapshot_times.append((time.time() - start_time) * 1000)
+        if snapshot is None:
+            raise RuntimeError(f"Task snapshot became invalid during benchmark: {snapshot_path}")
+
+    source_median = statistics.median(source_times)
+    snapshot_median = statistics.median(snapshot_times)
+    return {
+        "tasks": len(snapshot.tasks),
+        "repeats": repeats,
+        "source_load_ms": {"median": source_median, "min": min(source_times)},
+        "snapshot_load_ms": {"median": snapshot_median, "min": min(snapshot_times)},
+        "speedup": source_median / snapshot_median if snapshot_median > 0 else float("inf"),
+        "snapshot_size_kb": Path(snapshot_path).stat().st_size / 1024
+    }
+
+
+def main(argv=None) -> int:
+    """Command line entry point: compile or benchmark a task snapshot"""
+    parser = argparse.ArgumentParser(description="Compile the task library into a binary snapshot")
+    parser.add_argument('command', choices=['compile', 'benchmark'],
+                        help='compile: write the snapshot; benchmark: compare YAML vs snapshot startup')
+    parser.add_argument('--tasks', default='data/tasks',
+                        help='Task YAML directory, relative to the project root (default: data/tasks)')
+    parser.add_argument('--output', default=None,
+                        help='Snapshot file (default: the snapshot the knowledge base loads at startup)')
+    parser.add_argument('--model', default='all-MiniLM-L6-v2',
+                        help='Sentence transformer model (default: all-MiniLM-L6-v2)')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='Benchmark runs per path (default: 5)')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+
+    from .knowledge_base import RAGKnowledgeBase
+    knowledge_base = RAGKnowledgeBase(tasks_directory=args.tasks, model_name=args.model)
+    output = Path(args.output).resolve() if args.output else knowledge_base.snapshot_path
+
+    if args.command == 'compile':
+        path = compile_task_snapshot(knowledge_base, output)
+        print(f"Snapshot written: {path}")
+    else:
+        knowledge_base.initialize(precompute_embeddings=True)
+        print(json.dumps(benchmark_task_snapshot(knowledge_base, output, args.repeats), indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,148 @@
+"""
+Task File Watcher
+
+Polls the task directory for added, modified and removed YAML files and
+reports them to a callback (normally RAGKnowledgeBase.apply_task_file_changes).
+Polling keeps the watcher dependency-free and behaves the same on every
+platform the demo runs on.
+"""
+
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TASK_FILE_PATTERNS = ("*.yaml", "*.yml")
+
+# (added, modified, removed) file paths
+ChangeSet = Tuple[List[Path], List[Path], List[Path]]
+
+
+class TaskFileWatcher:
+    """
+    Background watcher for task YAML files
+
+    Each poll compares (mtime, size) of every task file against the previous
+    snapshot and invokes the callback once with all detected changes.
+    """
+
+    def __init__(self,
+                 tasks_directory: Path,
+                 on_change: Callable[[List[Path], List[Path], List[Path]], None],
+                 poll_interval: float = 1.0):
+        """
+        Initialize the watcher
+
+        Args:
+            tasks_directory: Directory containing task YAML files
+            on_change: Callback receiving (added, modified, removed) paths
+            poll_interval: Seconds between directory scans
+        """
+        self.tasks_directory = Path(tasks_directory)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+
+        self._snapshot: Dict[Path, Tuple[int, int]] = {}
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.poll_count = 0
+        self.change_count = 0
+
+    def _scan_directory(self) -> Dict[Path, Tuple[int, int]]:
+        """Collect (mtime_ns, size) for every task file in the directory"""
+        snapshot = {}
+        if not self.tasks_directory.exists():
+            return snapshot
+
+        for pattern in TASK_FILE_PATTERNS:
+            for file_path in self.tasks_directory.glob(pattern):
+                try:
+                    stat = file_path.stat()
+                except OSError:
+                    # File disappeared between glob and stat
+                    continue
+                snapshot[file_path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def prime(self) -> None:
+        """Record the current directory state as the baseline without reporting it"""
+        self._snapshot = self._scan_directory()
+
+    def poll(self) -> ChangeSet:
+        """
+        Scan the directory once and report changes since the previous scan
+
+        Returns:
+            Tuple of (added, modified, removed) paths
+        """
+        current = self._scan_directory()
+        previous = self._snapshot
+
+        added = sorted(path for path in current if path not in previous)
+        modified = sorted(path for path in current if path in previous and current[path] != previous[path])
+        removed = sorted(path for path in previous if path not in current)
+
+        self._snapshot = current
+        self.poll_count += 1
+
+        if added or modified or removed:
+            self.change_count += len(added) + len(modified) + len(removed)
+            logger.info(f"Task file changes detected: added={len(added)}, "
+                        f"modified={len(modified)}, removed={len(removed)}")
+            try:
+                self.on_change(added, modified, removed)
+            except Exception as e:
+                logger.error(f"Task change handler failed: {str(e)}")
+
+        return added, modified, removed
+
+    def _run(self) -> None:
+        """Polling loop executed in the background thread"""
+        while not self._stop_event.wait(self.poll_interval):
+            self.poll()
+
+    def start(self) -> None:
+        """Start watching in a daemon thread (no-op if already running)"""
+        if self.is_running:
+            return
+
+        self.prime()
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="task-file-watcher", daemon=True)
+        self._thread.start()
+        logger.info(f"Task file watcher started on {self.tasks_directory} "
+                    f"(poll interval {self.poll_interval:.1f}s)")
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Stop the background thread
+
+        Args:
+            timeout: Seconds to wait for the thread to exit
+        """
+        if not self._thread:
+            return
+
+        self._stop_event.set()
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Task file watcher stopped")
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the background thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def get_stats(self) -> Dict[str, object]:
+        """Get watcher statistics"""
+        return {
+            "running": self.is_running,
+            "tasks_directory": str(self.tasks_directory),
+            "poll_interval_s": self.poll_interval,
+            "watched_files": len(self._snapshot),
+            "polls": self.poll_count,
+            "changes_detected": self.change_count
+        }
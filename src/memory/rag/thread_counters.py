@@ -0,0 +1,87 @@
+"""
+Per-Thread Counters
+
+Statistics counters for the query path. Each thread increments its own
+shard, so concurrent searches never contend on a lock or lose updates;
+readers sum the shards. Shards of threads that have exited are folded into
+a retired total, so short-lived worker threads do not grow the registry.
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+
+class ThreadLocalCounters:
+    """
+    Named numeric counters sharded per thread
+
+    ``add`` only touches the calling thread's shard and takes no lock. The
+    shard registry lock is taken once per thread (on its first add) and by
+    readers, which also retire the shards of dead threads.
+    """
+
+    def __init__(self, *names: str):
+        """
+        Args:
+            names: Counter names, all starting at zero
+        """
+        self.names = names
+        self._local = threading.local()
+        self._shards: List[Tuple[threading.Thread, Dict[str, float]]] = []
+        self._retired: Dict[str, float] = dict.fromkeys(names, 0)
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict[str, float]:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = dict.fromkeys(self.names, 0)
+            with self._shards_lock:
+                self._prune()
+                self._shards.append((threading.current_thread(), shard))
+            self._local.shard = shard
+        return shard
+
+    def _prune(self) -> None:
+        """Fold shards of exited threads into the retired totals (lock held)"""
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                for name in self.names:
+                    self._retired[name] += shard[name]
+        self._shards = live
+
+    @property
+    def shard_count(self) -> int:
+        """Number of live per-thread shards"""
+        with self._shards_lock:
+            self._prune()
+            return len(self._shards)
+
+    def add(self, name: str, amount: float = 1) -> None:
+        """Add to a counter from the calling thread"""
+        self._shard()[name] += amount
+
+    def get(self, name: str) -> float:
+        """Current total of one counter"""
+        with self._shards_lock:
+            self._prune()
+            return self._retired[name] + sum(shard[name] for _, shard in self._shards)
+
+    def totals(self) -> Dict[str, float]:
+        """Current totals of all counters"""
+        with self._shards_lock:
+            self._prune()
+            shards = [shard for _, shard in self._shards]
+            retired = dict(self._retired)
+        return {name: retired[name] + sum(shard[name] for shard in shards) for name in self.names}
+
+    def reset(self) -> None:
+        """Zero all counters (increments racing with a reset may survive it)"""
+        with self._shards_lock:
+            self._prune()
+            self._retired = dict.fromkeys(self.names, 0)
+            for _, shard in self._shards:
+                for name in self.names:
+                    shard[name] = 0
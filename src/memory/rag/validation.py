@@ -7,9 +7,12 @@ all required fields for proper system operation.
 """
 
 from typing import Dict, List, Any, Optional, Tuple
+import logging
 import yaml
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 
 class TaskValidationError(Exception):
     """Custom exception for task validation errors"""
@@ -72,18 +75,7 @@ class TaskKnowledgeValidator:
             with open(file_path, 'r', encoding='utf-8') as file:
                 task_data = yaml.safe_load(file)
             
-            if not isinstance(task_data, dict):
-                self.validation_errors.append("Task file must contain a dictionary at root level")
-                return False, self.validation_errors
-            
-            # Validate main task structure
-            self._validate_task_structure(task_data)
-            
-            # Validate steps
-            if 'steps' in task_data:
-                self._validate_steps(task_data['steps'])
-            
-            return len(self.validation_errors) == 0, self.validation_errors
+            return self.validate_file_data(task_data)
             
         except yaml.YAMLError as e:
             self.validation_errors.append(f"YAML parsing error: {str(e)}")
@@ -95,6 +87,34 @@ class TaskKnowledgeValidator:
             self.validation_errors.append(f"Unexpected error: {str(e)}")
             return False, self.validation_errors
     
+    def validate_file_data(self, task_data: Any) -> Tuple[bool, List[str]]:
+        """
+        Validate the parsed contents of a task YAML file
+        
+        Applies the checks of validate_task_file to YAML that was already
+        loaded, e.g. by the task loader's worker processes.
+        
+        Args:
+            task_data: Result of yaml.safe_load on the file contents
+            
+        Returns:
+            Tuple of (is_valid, error_messages)
+        """
+        self.validation_errors = []
+        
+        if not isinstance(task_data, dict):
+            self.validation_errors.append("Task file must contain a dictionary at root level")
+            return False, self.validation_errors
+        
+        # Validate main task structure
+        self._validate_task_structure(task_data)
+        
+        # Validate steps
+        if 'steps' in task_data:
+            self._validate_steps(task_data['steps'])
+        
+        return len(self.validation_errors) == 0, self.validation_errors
+    
     def _validate_task_structure(self, task_data: Dict[str, Any]) -> None:
         """Validate the main task structure"""
         
@@ -122,7 +142,7 @@ class TaskKnowledgeValidator:
         known_fields = set(self.REQUIRED_TASK_FIELDS.keys()) | set(self.OPTIONAL_TASK_FIELDS.keys())
         unknown_fields = set(task_data.keys()) - known_fields
         if unknown_fields:
-            print(f"Warning: Unknown fields found: {unknown_fields}")
+            logger.warning(f"Unknown fields found in task {task_data.get('task_name')}: {unknown_fields}")
     
     def _validate_steps(self, steps: List[Dict[str, Any]]) -> None:
         """Validate the steps array"""
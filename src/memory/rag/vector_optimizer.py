@@ -15,7 +15,7 @@ from pathlib import Path
 import json
 import pickle
 from dataclasses import dataclass, asdict
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor
 import threading
 try:
     from .task_loader import TaskKnowledge, TaskStep
@@ -30,6 +30,9 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Version of the on-disk embedding cache layout (content-hash keyed entries)
+CACHE_FORMAT_VERSION = 2
+
 
 @dataclass
 class VectorCacheStats:
@@ -40,6 +43,8 @@ class VectorCacheStats:
     last_updated: str
     precompute_time: float
     average_search_time: float
+    reused_embeddings: int = 0
+    reencoded_embeddings: int = 0
     
     @property
     def hit_rate(self) -> float:
@@ -59,7 +64,9 @@ class VectorOptimizer:
     def __init__(self, 
                  vector_engine: ChromaVectorSearchEngine,
                  cache_dir: str = "cache/vector_optimizer",
-                 enable_precompute: bool = True):
+                 enable_precompute: bool = True,
+                 max_io_workers: int = 4,
+                 encode_batch_size: int = 64):
         """
         Initialize the vector optimizer
         
@@ -67,16 +74,21 @@ class VectorOptimizer:
             vector_engine: ChromaDB vector search engine to optimize
             cache_dir: Directory for optimization cache files
             enable_precompute: Whether to enable precomputation
+            max_io_workers: Threads used for concurrent cache file I/O
+            encode_batch_size: Batch size passed to the encoder
         """
         self.vector_engine = vector_engine
         self.cache_dir = Path(cache_dir)
         self.enable_precompute = enable_precompute
+        self.max_io_workers = max_io_workers
+        self.encode_batch_size = encode_batch_size
         
         # Create cache directory
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         
         # Cache management
         self.embedding_cache: Dict[str, Any] = {}
+        self.embedding_keys: Dict[str, Dict[int, str]] = {}
         self.cache_metadata: Dict[str, Dict] = {}
         
         # Performance tracking
@@ -89,7 +101,10 @@ class VectorOptimizer:
             average_search_time=0.0
         )
         
-        # Thread safety
+        # Stage timings of the last precompute run
+        self.last_precompute_timings: Dict[str, Any] = {}
+        
+        # Thread safety (guards in-memory cache updates only)
         self._cache_lock = threading.RLock()
         
         logger.info(f"Vector optimizer initialized with cache dir: {cache_dir}")
@@ -112,26 +127,7 @@ class VectorOptimizer:
         start_time = time.time()
         
         try:
-            total_steps = sum(len(task.steps) for task in task_knowledge_dict.values())
-            processed_steps = 0
-            
-            with ThreadPoolExecutor(max_workers=4) as executor:
-                # Submit precomputation tasks
-                future_to_task = {}
-                
-                for task_name, task in task_knowledge_dict.items():
-                    future = executor.submit(self._precompute_task_embeddings, task_name, task)
-                    future_to_task[future] = task_name
-                
-                # Process completed tasks
-                for future in as_completed(future_to_task):
-                    task_name = future_to_task[future]
-                    try:
-                        step_count = future.result()
-                        processed_steps += step_count
-                        logger.debug(f"Precomputed embeddings for task: {task_name} ({step_count} steps)")
-                    except Exception as e:
-                        logger.error(f"Failed to precompute embeddings for task {task_name}: {str(e)}")
+            processed_steps = self._build_task_embeddings(task_knowledge_dict)
             
             # Update statistics
             precompute_time = time.time() - start_time
@@ -142,7 +138,8 @@ class VectorOptimizer:
             # Save cache metadata
             self._save_cache_metadata()
             
-            logger.info(f"Precomputation completed in {precompute_time:.2f}s for {processed_steps} embeddings")
+            logger.info(f"Precomputation completed in {precompute_time:.2f}s for {processed_steps} embeddings "
+                        f"(timings: {self.last_precompute_timings})")
             return True
             
         except Exception as e:
@@ -160,89 +157,276 @@ class VectorOptimizer:
         Returns:
             Number of steps processed
         """
-        with self._cache_lock:
-            # Check if already cached
-            cache_key = f"{task_name}_embeddings"
-            cache_file = self.cache_dir / f"{cache_key}.pkl"
-            
-            if cache_file.exists():
-                # Load from cache
-                try:
-                    with open(cache_file, 'rb') as f:
-                        cached_embeddings = pickle.load(f)
-                    
-                    self.embedding_cache[cache_key] = cached_embeddings
-                    self.cache_metadata[cache_key] = {
-                        "task_name": task_name,
-                        "step_count": len(task.steps),
-                        "cached_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "cache_file": str(cache_file)
-                    }
-                    
-                    logger.debug(f"Loaded cached embeddings for {task_name}")
-                    return len(task.steps)
-                    
-                except Exception as e:
-                    logger.warning(f"Failed to load cached embeddings for {task_name}: {str(e)}")
+        return self._build_task_embeddings({task_name: task})
+    
+    def _build_task_embeddings(self, task_knowledge_dict: Dict[str, TaskKnowledge]) -> int:
+        """
+        Build embeddings for a set of tasks in a single pipeline
+        
+        Stages:
+        1. Read every task cache file concurrently (no lock held)
+        2. Diff content keys to find new or edited steps across all tasks
+        3. Encode all changed steps in one batched encoder call
+        4. Publish results to the in-memory cache (the only locked section)
+        5. Write changed cache files concurrently
+        
+        Cached embeddings are keyed by a content hash of the step text, the
+        encoder model name and its version, so unchanged steps are reused.
+        
+        Args:
+            task_knowledge_dict: Dictionary of task knowledge objects
             
-            # Generate new embeddings
+        Returns:
+            Number of steps processed
+        """
+        timings = {}
+        stage_start = time.time()
+        task_names = list(task_knowledge_dict.keys())
+        
+        # Stage 1: concurrent cache reads
+        cached_entries = dict(zip(task_names, self._map_io(self._load_task_cache_entries, task_names)))
+        timings["cache_read_s"] = time.time() - stage_start
+        
+        # Stage 2: find stale steps across all tasks
+        stage_start = time.time()
+        plans: Dict[str, Tuple[Dict[int, Any], Dict[int, str]]] = {}
+        stale_refs: Dict[str, List[Tuple[str, int]]] = {}
+        stale_texts: Dict[str, str] = {}
+        
+        for task_name, task in task_knowledge_dict.items():
+            known_embeddings = {
+                entry["key"]: entry["embedding"] for entry in cached_entries[task_name].values()
+            }
             embeddings = {}
-            documents = []
+            embedding_keys = {}
             
             for step in task.steps:
-                # Create combined text for embedding (same as vector_search.py)
                 combined_text = self._create_step_text_for_embedding(step)
-                documents.append(combined_text)
-            
-            # Generate embeddings in batch
-            if documents:
-                batch_embeddings = self.vector_engine.model.encode(
-                    documents, 
-                    show_progress_bar=False,
-                    convert_to_numpy=True
-                )
-                
-                # Store embeddings with step IDs
-                for i, step in enumerate(task.steps):
-                    embeddings[step.step_id] = batch_embeddings[i]
-            
-            # Cache the embeddings in memory
-            self.embedding_cache[cache_key] = embeddings
-            
-            logger.debug(f"Cached {len(embeddings)} embeddings for {task_name} in memory")
-            
-            # Save to disk
-            try:
-                with open(cache_file, 'wb') as f:
-                    pickle.dump(embeddings, f)
+                content_key = self.vector_engine.compute_embedding_key(combined_text)
+                embedding_keys[step.step_id] = content_key
                 
+                if content_key in known_embeddings:
+                    embeddings[step.step_id] = known_embeddings[content_key]
+                else:
+                    # Identical texts across tasks are encoded only once
+                    stale_texts.setdefault(content_key, combined_text)
+                    stale_refs.setdefault(content_key, []).append((task_name, step.step_id))
+            
+            plans[task_name] = (embeddings, embedding_keys)
+        timings["diff_s"] = time.time() - stage_start
+        
+        # Stage 3: one batched encode for every changed step
+        stage_start = time.time()
+        if stale_texts:
+            stale_keys = list(stale_texts.keys())
+            batch_embeddings = self.vector_engine.model.encode(
+                [stale_texts[key] for key in stale_keys],
+                batch_size=self.encode_batch_size,
+                show_progress_bar=False,
+                convert_to_numpy=True
+            )
+            for i, content_key in enumerate(stale_keys):
+                for task_name, step_id in stale_refs[content_key]:
+                    plans[task_name][0][step_id] = batch_embeddings[i]
+        timings["encode_s"] = time.time() - stage_start
+        
+        reencoded = sum(len(refs) for refs in stale_refs.values())
+        total_steps = sum(len(task.steps) for task in task_knowledge_dict.values())
+        dirty_tasks = {task_name for refs in stale_refs.values() for task_name, _ in refs}
+        dirty_tasks.update(
+            task_name for task_name, (embeddings, _) in plans.items()
+            if set(cached_entries[task_name]) != set(embeddings)
+        )
+        
+        # Stage 4: publish to memory cache
+        cached_at = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._cache_lock:
+            for task_name, (embeddings, embedding_keys) in plans.items():
+                cache_key = f"{task_name}_embeddings"
+                self.embedding_cache[cache_key] = embeddings
+                self.embedding_keys[cache_key] = embedding_keys
                 self.cache_metadata[cache_key] = {
                     "task_name": task_name,
-                    "step_count": len(task.steps),
-                    "cached_at": time.strftime("%Y-%m-%d %H:%M:%S"),
-                    "cache_file": str(cache_file)
+                    "step_count": len(task_knowledge_dict[task_name].steps),
+                    "cached_at": cached_at,
+                    "cache_file": str(self.cache_dir / f"{cache_key}.pkl"),
+                    "model_name": self.vector_engine.model_name,
+                    "model_version": self.vector_engine.model_version
                 }
-                
-            except Exception as e:
-                logger.warning(f"Failed to save embeddings cache for {task_name}: {str(e)}")
+            self.stats.reused_embeddings += total_steps - reencoded
+            self.stats.reencoded_embeddings += reencoded
+        
+        # Stage 5: concurrent cache writes for changed tasks
+        stage_start = time.time()
+        self._map_io(lambda task_name: self._save_task_cache(task_name, *plans[task_name]), sorted(dirty_tasks))
+        timings["cache_write_s"] = time.time() - stage_start
+        
+        timings["reencoded_steps"] = reencoded
+        timings["reused_steps"] = total_steps - reencoded
+        self.last_precompute_timings = timings
+        
+        logger.debug(f"Built embeddings for {len(task_names)} tasks: {timings}")
+        return total_steps
+    
+    def _map_io(self, func, items: List[Any]) -> List[Any]:
+        """
+        Run an I/O-bound function over items on the optimizer's thread pool
+        
+        Args:
+            func: Function to apply to each item
+            items: Items to process
             
-            return len(task.steps)
+        Returns:
+            Results in the same order as items
+        """
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        
+        with ThreadPoolExecutor(max_workers=self.max_io_workers) as executor:
+            return list(executor.map(func, items))
+    
+    def _load_task_cache_entries(self, task_name: str) -> Dict[int, Dict[str, Any]]:
+        """
+        Load the cached entries of a task from disk
+        
+        Args:
+            task_name: Name of the task
+            
+        Returns:
+            Mapping of step ID to {"key", "embedding"}
+        """
+        cache_file = self.cache_dir / f"{task_name}_embeddings.pkl"
+        if not cache_file.exists():
+            return {}
+        return self._read_cache_file(cache_file)
+    
+    def _save_task_cache(self, 
+                         task_name: str, 
+                         embeddings: Dict[int, Any], 
+                         embedding_keys: Dict[int, str]) -> None:
+        """
+        Save the cache file of a task, logging (not raising) on failure
+        
+        Args:
+            task_name: Name of the task
+            embeddings: Mapping of step ID to embedding
+            embedding_keys: Mapping of step ID to content key
+        """
+        try:
+            self._write_cache_file(self.cache_dir / f"{task_name}_embeddings.pkl", embeddings, embedding_keys)
+        except Exception as e:
+            logger.warning(f"Failed to save embeddings cache for {task_name}: {str(e)}")
+    
+    def _read_cache_file(self, cache_file: Path) -> Dict[int, Dict[str, Any]]:
+        """
+        Read a task cache file
+        
+        Args:
+            cache_file: Path to the pickle cache file
+            
+        Returns:
+            Mapping of step ID to {"key", "embedding"}; empty if the file is
+            unreadable or uses the legacy (unkeyed) format
+        """
+        try:
+            with open(cache_file, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load cached embeddings from {cache_file}: {str(e)}")
+            return {}
+        
+        if not isinstance(payload, dict) or payload.get("format_version") != CACHE_FORMAT_VERSION:
+            # Legacy files store bare embeddings without content keys, so
+            # there is no way to tell whether they are stale
+            logger.debug(f"Ignoring legacy embedding cache file: {cache_file}")
+            return {}
+        
+        return payload.get("entries", {})
+    
+    def _write_cache_file(self, 
+                          cache_file: Path, 
+                          embeddings: Dict[int, Any], 
+                          embedding_keys: Dict[int, str]) -> None:
+        """
+        Write a task cache file in the content-keyed format
+        
+        Args:
+            cache_file: Path to the pickle cache file
+            embeddings: Mapping of step ID to embedding
+            embedding_keys: Mapping of step ID to content key
+        """
+        payload = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "model_name": self.vector_engine.model_name,
+            "model_version": self.vector_engine.model_version,
+            "entries": {
+                step_id: {"key": embedding_keys[step_id], "embedding": embedding}
+                for step_id, embedding in embeddings.items()
+            }
+        }
+        
+        with open(cache_file, 'wb') as f:
+            pickle.dump(payload, f)
     
     def _create_step_text_for_embedding(self, step: TaskStep) -> str:
         """
         Create combined text from step information for embedding generation
-        (Same logic as in vector_search.py)
-        """
-        components = [
-            step.task_description,
-            step.title,
-            " ".join(step.visual_cues),
-            " ".join(step.tools_needed),
-            " ".join(step.completion_indicators)
-        ]
-        
-        combined = " ".join(components)
-        return combined.strip()
+        
+        Delegates to the vector engine so that cache keys and ChromaDB
+        documents are always computed from the same text.
+        """
+        return self.vector_engine._create_step_text_for_embedding(step)
+    
+    def get_task_embeddings(self, task_name: str) -> Optional[Dict[int, Any]]:
+        """
+        Get all in-memory embeddings of a task
+        
+        Args:
+            task_name: Name of the task
+            
+        Returns:
+            Mapping of step ID to embedding, or None if the task is not cached
+        """
+        return self.embedding_cache.get(f"{task_name}_embeddings")
+    
+    def get_task_embedding_keys(self, task_name: str) -> Optional[Dict[int, str]]:
+        """
+        Get the content keys of a task's in-memory embeddings
+        
+        Args:
+            task_name: Name of the task
+            
+        Returns:
+            Mapping of step ID to content key, or None if the task is not cached
+        """
+        return self.embedding_keys.get(f"{task_name}_embeddings")
+    
+    def load_task_embeddings(self, 
+                             task_name: str, 
+                             task: TaskKnowledge,
+                             embeddings: Dict[int, Any], 
+                             embedding_keys: Dict[int, str]) -> None:
+        """
+        Publish externally built embeddings (e.g. from a task snapshot)
+        
+        Args:
+            task_name: Name of the task
+            task: TaskKnowledge object the embeddings belong to
+            embeddings: Mapping of step ID to embedding
+            embedding_keys: Mapping of step ID to content key
+        """
+        cache_key = f"{task_name}_embeddings"
+        with self._cache_lock:
+            self.embedding_cache[cache_key] = embeddings
+            self.embedding_keys[cache_key] = embedding_keys
+            self.cache_metadata[cache_key] = {
+                "task_name": task_name,
+                "step_count": len(task.steps),
+                "cached_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "cache_file": str(self.cache_dir / f"{cache_key}.pkl"),
+                "model_name": self.vector_engine.model_name,
+                "model_version": self.vector_engine.model_version
+            }
     
     def get_cached_embedding(self, task_name: str, step_id: int) -> Optional[Any]:
         """
@@ -268,19 +452,17 @@ class VectorOptimizer:
             # Try to load from disk cache
             cache_file = self.cache_dir / f"{cache_key}.pkl"
             if cache_file.exists():
-                try:
-                    with open(cache_file, 'rb') as f:
-                        embeddings = pickle.load(f)
+                entries = self._read_cache_file(cache_file)
+                if entries:
+                    embeddings = {sid: entry["embedding"] for sid, entry in entries.items()}
                     
                     # Store in memory cache
                     self.embedding_cache[cache_key] = embeddings
+                    self.embedding_keys[cache_key] = {sid: entry["key"] for sid, entry in entries.items()}
                     
                     if step_id in embeddings:
                         self.stats.cache_hits += 1
                         return embeddings[step_id]
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to load cached embeddings: {str(e)}")
             
             self.stats.cache_misses += 1
             return None
@@ -299,14 +481,11 @@ class VectorOptimizer:
         logger.info(f"Updating embeddings for task: {task_name}")
         
         try:
-            # Remove old cache
-            self.invalidate_task_cache(task_name)
-            
-            # Precompute new embeddings
+            # Content-keyed cache: unchanged steps are reused, edited ones re-encoded
             step_count = self._precompute_task_embeddings(task_name, task)
             
-            # Update ChromaDB as well
-            self.vector_engine.add_task_knowledge(task)
+            # Update ChromaDB as well, reusing the embeddings just built
+            self.vector_engine.add_task_knowledge(task, embeddings=self.get_task_embeddings(task_name))
             
             logger.info(f"Successfully updated embeddings for {task_name} ({step_count} steps)")
             return True
@@ -329,6 +508,8 @@ class VectorOptimizer:
             if cache_key in self.embedding_cache:
                 del self.embedding_cache[cache_key]
             
+            self.embedding_keys.pop(cache_key, None)
+            
             if cache_key in self.cache_metadata:
                 del self.cache_metadata[cache_key]
             
@@ -350,6 +531,7 @@ class VectorOptimizer:
         with self._cache_lock:
             # Clear memory cache
             self.embedding_cache.clear()
+            self.embedding_keys.clear()
             self.cache_metadata.clear()
             
             # Remove cache files
@@ -433,6 +615,7 @@ class VectorOptimizer:
             "cached_tasks": len(self.cache_metadata),
             "cache_directory": str(self.cache_dir),
             "precompute_enabled": self.enable_precompute,
+            "last_precompute_timings": self.last_precompute_timings,
             "cache_files": len(list(self.cache_dir.glob("*.pkl")))
         }
     
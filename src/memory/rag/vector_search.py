@@ -6,29 +6,33 @@ This module provides the core functionality to match VLM observations
 to task steps using ChromaDB for efficient vector storage and retrieval.
 """
 
-import chromadb
-from chromadb.config import Settings
 import numpy as np
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-from sentence_transformers import SentenceTransformer
+import asyncio
+import hashlib
 import logging
+import threading
 from pathlib import Path
 import time
 import uuid
 from .task_loader import TaskKnowledge, TaskStep
+from .lexical_index import LexicalIndex, tokenize
+from .encoders import Encoder, SentenceTransformerEncoder
+from .encode_batcher import EncodeBatcher
+from .thread_counters import ThreadLocalCounters
 
 # Import logging system
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'logging'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'app_logging'))
 try:
     from log_manager import get_log_manager
 except ImportError:
     # Fallback for different import contexts
     try:
-        from logging.log_manager import get_log_manager
+        from app_logging.log_manager import get_log_manager
     except ImportError:
         # Create a dummy log manager if all else fails
         class DummyLogManager:
@@ -59,6 +63,9 @@ class MatchResult:
     confidence_level: str  # "high", "medium", "low", "none"
     matched_cues: List[str]
     task_name: str
+    search_scope: str = "global"  # "local", "widened", "global" or "decoded" (see RAGKnowledgeBase)
+    dense_similarity: Optional[float] = None  # Vector similarity before lexical fusion
+    lexical_score: float = 0.0  # Raw BM25 score over titles, cues and tools
     
     # Additional properties for State Tracker compatibility
     @property
@@ -93,6 +100,31 @@ class MatchResult:
         return self.confidence_level == "high"
 
 
+@dataclass(frozen=True)
+class IndexSnapshot:
+    """
+    Immutable view of the engine's in-memory search tables
+    
+    Queries read whichever snapshot is current when they start; writers
+    build a modified copy and swap the engine's reference, so reads never
+    take a lock and never observe a half-applied reload.
+    
+    ChromaDB rows are content-addressed (see _make_doc_id): a changed step
+    is written as a new row next to the old one, and ``task_rows`` maps each
+    task's step IDs to the rows this snapshot serves. Rows not in the
+    snapshot's step table are skipped by queries.
+    """
+    version: int
+    task_knowledge: Dict[str, TaskKnowledge]
+    step_table: Dict[str, Tuple[str, TaskStep]]
+    lexical_index: LexicalIndex
+    task_rows: Dict[str, Dict[int, str]]
+    
+    def doc_id(self, task_name: str, step_id: int) -> Optional[str]:
+        """Row ID this snapshot serves for a task step, or None if not loaded"""
+        return self.task_rows.get(task_name, {}).get(step_id)
+
+
 class ChromaVectorSearchEngine:
     """
     High-speed semantic vector search engine using ChromaDB
@@ -107,7 +139,13 @@ class ChromaVectorSearchEngine:
     def __init__(self, 
                  model_name: str = "all-MiniLM-L6-v2",
                  persist_directory: str = "cache/chromadb",
-                 collection_name: str = "task_knowledge"):
+                 collection_name: str = "task_knowledge",
+                 lexical_weight: float = 0.3,
+                 lexical_saturation: float = 3.0,
+                 candidate_pool_size: int = 8,
+                 encoder: Optional[Encoder] = None,
+                 micro_batch_size: int = 16,
+                 micro_batch_wait_ms: float = 2.0):
         """
         Initialize the ChromaDB vector search engine
         
@@ -115,15 +153,31 @@ class ChromaVectorSearchEngine:
             model_name: Name of the sentence transformer model to use
             persist_directory: Directory to persist ChromaDB data
             collection_name: Name of the ChromaDB collection
+            lexical_weight: Share of the remaining similarity gap a strong
+                BM25 hit can close (0 disables lexical fusion)
+            lexical_saturation: BM25 score at which the lexical boost is half strength
+            candidate_pool_size: Dense and BM25 candidates each fused into the ranking
+            encoder: Optional encoder backend (see encoders.py); defaults to a
+                SentenceTransformerEncoder for model_name
+            micro_batch_size: Maximum observations encoded together by the
+                encode micro-batcher (0 or 1 encodes each call directly)
+            micro_batch_wait_ms: Time the micro-batcher waits for more
+                observations after the first one arrives
         """
-        self.model_name = model_name
+        self.lexical_weight = lexical_weight
+        self.lexical_saturation = lexical_saturation
+        self.candidate_pool_size = candidate_pool_size
         self.persist_directory = Path(persist_directory)
         self.collection_name = collection_name
         
         # Create persist directory
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
-        # Initialize ChromaDB client
+        # Initialize ChromaDB client (imported here: chromadb takes about a
+        # second to import and most importers of this module never search)
+        import chromadb
+        from chromadb.config import Settings
+        
         logger.info(f"Initializing ChromaDB with persist directory: {persist_directory}")
         self.client = chromadb.PersistentClient(
             path=str(self.persist_directory),
@@ -133,9 +187,20 @@ class ChromaVectorSearchEngine:
             )
         )
         
-        # Load the sentence transformer model
-        logger.info(f"Loading sentence transformer model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        # Load the encoder backend
+        self.model = encoder or SentenceTransformerEncoder(model_name)
+        self.model_name = self.model.name
+        self.model_version = self._resolve_model_version()
+        
+        # Concurrent observation encodes are coalesced into batched calls
+        self.encode_batcher: Optional[EncodeBatcher] = None
+        if micro_batch_size > 1:
+            self.encode_batcher = EncodeBatcher(self.model, micro_batch_size, micro_batch_wait_ms)
+        
+        # Vectors from other backends may differ in dimension, keep them apart
+        if self.model.backend != SentenceTransformerEncoder.backend:
+            collection_name = f"{collection_name}_{self.model.backend}"
+            self.collection_name = collection_name
         
         # Get or create collection
         try:
@@ -148,23 +213,104 @@ class ChromaVectorSearchEngine:
             )
             logger.info(f"Created new collection: {collection_name}")
         
-        # Storage for task knowledge
-        self.task_knowledge: Dict[str, TaskKnowledge] = {}
+        # Task table, typed step table keyed by document ID (the index only
+        # returns IDs and distances, step data is read from here) and the BM25
+        # index over titles, visual cues and tools, published together as one
+        # immutable snapshot (see IndexSnapshot)
+        self._snapshot = IndexSnapshot(0, {}, {}, LexicalIndex(), {})
         
-        # Performance tracking
-        self.search_count = 0
-        self.total_search_time = 0.0
+        # Serializes writers only; queries read self._snapshot without locking
+        self._index_lock = threading.RLock()
+        
+        # Performance tracking (per-thread shards, no lock on the query path)
+        self._counters = ThreadLocalCounters("searches", "search_time")
+    
+    @property
+    def task_knowledge(self) -> Dict[str, TaskKnowledge]:
+        """Loaded tasks by name (read-only view of the current snapshot)"""
+        return self._snapshot.task_knowledge
+    
+    @property
+    def step_table(self) -> Dict[str, Tuple[str, TaskStep]]:
+        """Step table by document ID (read-only view of the current snapshot)"""
+        return self._snapshot.step_table
+    
+    @property
+    def lexical_index(self) -> LexicalIndex:
+        """BM25 index of the current snapshot (read-only)"""
+        return self._snapshot.lexical_index
+    
+    @property
+    def search_count(self) -> int:
+        return int(self._counters.get("searches"))
     
-    def add_task_knowledge(self, task: TaskKnowledge) -> None:
+    @property
+    def total_search_time(self) -> float:
+        return self._counters.get("search_time")
+    
+    def add_task_knowledge(self, 
+                           task: TaskKnowledge, 
+                           embeddings: Optional[Dict[int, Any]] = None) -> None:
         """
         Add task knowledge and store embeddings in ChromaDB
         
+        Rows are content-addressed, so unchanged steps keep their rows and a
+        warm restart against a persisted collection performs no encoding.
+        Changed steps are written as new rows; the task's new rows are
+        published in one snapshot swap and its superseded rows are deleted
+        only afterwards, so queries never see new embeddings paired with old
+        step data (or the reverse).
+        
         Args:
             task: TaskKnowledge object to add
+            embeddings: Optional precomputed embeddings keyed by step ID (e.g.
+                from VectorOptimizer); missing steps are encoded here
         """
-        logger.info(f"Adding task knowledge to ChromaDB: {task.task_name}")
+        self.add_tasks_knowledge([task], {task.task_name: embeddings} if embeddings else None)
+    
+    def add_tasks_knowledge(self,
+                            tasks: List[TaskKnowledge],
+                            embeddings: Optional[Dict[str, Dict[int, Any]]] = None) -> None:
+        """
+        Add several tasks and publish them in a single snapshot
+        
+        Each task's rows are written as in add_task_knowledge; the in-memory
+        tables are then copied and published once for the whole batch, so a
+        full load costs one table copy instead of one per task. Superseded
+        rows are deleted after the publish.
+        
+        Args:
+            tasks: TaskKnowledge objects to add
+            embeddings: Optional precomputed embeddings keyed by task name, then step ID
+        """
+        embeddings = embeddings or {}
+        registrations = []
+        stale_rows = []
         
-        self.task_knowledge[task.task_name] = task
+        for task in tasks:
+            ids, stale_ids = self._write_task_rows(task, embeddings.get(task.task_name))
+            registrations.append((task, ids))
+            stale_rows.append((task.task_name, stale_ids))
+        
+        # Publish every task's new rows at once, then drop the rows no snapshot serves
+        self._register_tasks(registrations)
+        for task_name, stale_ids in stale_rows:
+            self._delete_rows(stale_ids, task_name)
+    
+    def _write_task_rows(self,
+                         task: TaskKnowledge,
+                         embeddings: Optional[Dict[int, Any]] = None) -> Tuple[List[str], List[str]]:
+        """
+        Write the changed steps of a task to ChromaDB without publishing them
+        
+        Args:
+            task: TaskKnowledge object to write
+            embeddings: Optional precomputed embeddings keyed by step ID
+            
+        Returns:
+            Tuple of (row ID of each step in task.steps order, superseded row IDs)
+        """
+        logger.info(f"Adding task knowledge to ChromaDB: {task.task_name}")
         
         # Prepare data for ChromaDB
         documents = []
@@ -176,40 +322,194 @@ class ChromaVectorSearchEngine:
             combined_text = self._create_step_text_for_embedding(step)
             documents.append(combined_text)
             
-            # Create metadata
+            # Create metadata (filter fields only; step data lives in step_table)
             metadata = {
                 "task_name": task.task_name,
                 "step_id": step.step_id,
                 "title": step.title,
-                "task_description": step.task_description,
-                "tools_needed": ",".join(step.tools_needed),
-                "completion_indicators": ",".join(step.completion_indicators),
-                "visual_cues": ",".join(step.visual_cues),
-                "estimated_duration": step.estimated_duration,
-                "safety_notes": ",".join(step.safety_notes)
+                "content_hash": self.compute_embedding_key(combined_text)
             }
             metadatas.append(metadata)
             
-            # Create unique ID
-            doc_id = f"{task.task_name}_step_{step.step_id}"
-            ids.append(doc_id)
+            # Content-addressed ID: a changed step gets a new row
+            ids.append(self._make_doc_id(task.task_name, step.step_id, metadata["content_hash"]))
         
-        # Generate embeddings and add to collection (optimized)
-        embeddings = self.model.encode(documents, show_progress_bar=False)
-        if hasattr(embeddings, 'tolist'):
-            embeddings = embeddings.tolist()
-        else:
-            embeddings = embeddings
-        
-        # Add to ChromaDB collection
-        self.collection.add(
-            documents=documents,
-            metadatas=metadatas,
-            embeddings=embeddings,
-            ids=ids
+        # Compare against rows already persisted for this task
+        existing = self.collection.get(where={"task_name": task.task_name}, include=[])
+        existing_ids = set(existing.get("ids", []))
+        stale_ids = [doc_id for doc_id in existing_ids if doc_id not in set(ids)]
+        
+        changed = [i for i, doc_id in enumerate(ids) if doc_id not in existing_ids]
+        
+        if not changed:
+            logger.info(f"ChromaDB already up to date for task: {task.task_name} ({len(ids)} steps), skipping add")
+            return ids, stale_ids
+        
+        # Use precomputed embeddings where available, encode the rest in one batch
+        embeddings = embeddings or {}
+        changed_embeddings = {}
+        to_encode = [i for i in changed if task.steps[i].step_id not in embeddings]
+        
+        if to_encode:
+            encoded = self.model.encode([documents[i] for i in to_encode], show_progress_bar=False)
+            for i, embedding in zip(to_encode, encoded):
+                changed_embeddings[i] = embedding
+        
+        for i in changed:
+            if i not in changed_embeddings:
+                changed_embeddings[i] = embeddings[task.steps[i].step_id]
+        
+        # Write the new row versions next to the ones queries are still using
+        self.collection.upsert(
+            documents=[documents[i] for i in changed],
+            metadatas=[metadatas[i] for i in changed],
+            embeddings=[
+                changed_embeddings[i].tolist() if hasattr(changed_embeddings[i], 'tolist') else changed_embeddings[i]
+                for i in changed
+            ],
+            ids=[ids[i] for i in changed]
+        )
+        
+        logger.info(f"Added {len(changed)} steps to ChromaDB for task: {task.task_name} "
+                    f"(encoded={len(to_encode)}, precomputed={len(changed) - len(to_encode)}, "
+                    f"unchanged={len(ids) - len(changed)})")
+        return ids, stale_ids
+    
+    @staticmethod
+    def _make_doc_id(task_name: str, step_id: int, content_hash: str) -> str:
+        """Build the ChromaDB document ID of one version of a task step"""
+        return f"{task_name}_step_{step_id}_{content_hash[:16]}"
+    
+    def _delete_rows(self, doc_ids: List[str], task_name: str) -> None:
+        """Delete superseded rows of a task (after the snapshot not serving them is published)"""
+        if doc_ids:
+            self.collection.delete(ids=doc_ids)
+            logger.info(f"Removed {len(doc_ids)} superseded rows from ChromaDB for task: {task_name}")
+    
+    def _publish(self,
+                 task_knowledge: Dict[str, TaskKnowledge],
+                 step_table: Dict[str, Tuple[str, TaskStep]],
+                 lexical_index: LexicalIndex,
+                 task_rows: Dict[str, Dict[int, str]]) -> None:
+        """Swap in a new snapshot (caller holds _index_lock)"""
+        self._snapshot = IndexSnapshot(
+            self._snapshot.version + 1, task_knowledge, step_table, lexical_index, task_rows
         )
+    
+    @staticmethod
+    def _drop_task(task_name: str,
+                   task_knowledge: Dict[str, TaskKnowledge],
+                   step_table: Dict[str, Tuple[str, TaskStep]],
+                   lexical_index: LexicalIndex,
+                   task_rows: Dict[str, Dict[int, str]]) -> bool:
+        """Remove a task from unpublished table copies; returns False if it was not loaded"""
+        if task_knowledge.pop(task_name, None) is None:
+            return False
+        for doc_id in task_rows.pop(task_name, {}).values():
+            step_table.pop(doc_id, None)
+            lexical_index.remove(doc_id)
+        return True
+    
+    def _register_tasks(self, registrations: List[Tuple[TaskKnowledge, List[str]]]) -> None:
+        """
+        Register tasks and their steps in the in-memory tables with one publish
+        
+        Args:
+            registrations: (task, row ID of each step in task.steps order) pairs;
+                each task's steps replace any previous ones
+        """
+        if not registrations:
+            return
+        
+        with self._index_lock:
+            current = self._snapshot
+            task_knowledge = dict(current.task_knowledge)
+            step_table = dict(current.step_table)
+            lexical_index = current.lexical_index.copy()
+            task_rows = dict(current.task_rows)
+            
+            for task, doc_ids in registrations:
+                self._drop_task(task.task_name, task_knowledge, step_table, lexical_index, task_rows)
+                task_knowledge[task.task_name] = task
+                task_rows[task.task_name] = {}
+                for step, doc_id in zip(task.steps, doc_ids):
+                    step_table[doc_id] = (task.task_name, step)
+                    lexical_index.add_step(doc_id, step)
+                    task_rows[task.task_name][step.step_id] = doc_id
+            
+            self._publish(task_knowledge, step_table, lexical_index, task_rows)
+    
+    def _unregister_task_steps(self, task_name: str) -> None:
+        """Drop a task's steps from the step table and lexical index"""
+        with self._index_lock:
+            current = self._snapshot
+            if task_name not in current.task_knowledge:
+                return
+            task_knowledge = dict(current.task_knowledge)
+            step_table = dict(current.step_table)
+            lexical_index = current.lexical_index.copy()
+            task_rows = dict(current.task_rows)
+            
+            self._drop_task(task_name, task_knowledge, step_table, lexical_index, task_rows)
+            self._publish(task_knowledge, step_table, lexical_index, task_rows)
+    
+    def remove_task_knowledge(self, task_name: str) -> int:
+        """
+        Remove a task's rows from ChromaDB and the in-memory tables
+        
+        Args:
+            task_name: Name of the task to remove
+            
+        Returns:
+            Number of rows deleted from the collection
+        """
+        # Unpublish first so concurrent queries skip the rows being deleted
+        self._unregister_task_steps(task_name)
+        
+        existing = self.collection.get(where={"task_name": task_name}, include=[])
+        doc_ids = existing.get("ids", [])
+        if doc_ids:
+            self.collection.delete(ids=doc_ids)
+        
+        logger.info(f"Removed task from ChromaDB: {task_name} ({len(doc_ids)} steps)")
+        return len(doc_ids)
+    
+    def _resolve_model_version(self) -> str:
+        """
+        Resolve a version string for the loaded encoder
+        
+        Combines the encoder backend, its model version and its output
+        normalization scheme, so switching backends or changing how vectors
+        are normalized invalidates cached embeddings.
         
-        logger.info(f"Added {len(documents)} steps to ChromaDB for task: {task.task_name}")
+        Returns:
+            Version identifier used as part of embedding cache keys
+        """
+        backend = getattr(self.model, "backend", "unknown")
+        version = getattr(self.model, "version", "unknown")
+        normalization = getattr(self.model, "normalization", "none")
+        return f"{backend}/{version}/{normalization}"
+    
+    def compute_embedding_key(self, text: str) -> str:
+        """
+        Compute the content hash that identifies an embedding
+        
+        The key covers the embedding text, the encoder model name and its
+        version (backend, model version and normalization, see
+        _resolve_model_version), so any change to one of them yields a
+        different key.
+        
+        Args:
+            text: Text that is (or will be) encoded
+            
+        Returns:
+            Hex digest usable as a cache key
+        """
+        digest = hashlib.sha256()
+        for part in (self.model_name, self.model_version, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\x00")
+        return digest.hexdigest()
     
     def _create_step_text_for_embedding(self, step: TaskStep) -> str:
         """
@@ -234,11 +534,67 @@ class ChromaVectorSearchEngine:
         combined = " ".join(components)
         return combined.strip()
     
+    def encode_observation(self, observation: str) -> List[float]:
+        """
+        Encode a VLM observation into a query embedding
+        
+        The result can be passed to find_best_match via query_embedding so
+        that several searches for the same observation share one encode.
+        
+        Args:
+            observation: VLM observation text
+            
+        Returns:
+            Query embedding as a list of floats
+        """
+        if self.encode_batcher:
+            query_embedding = self.encode_batcher.encode(observation)
+        else:
+            query_embedding = self.model.encode(observation, show_progress_bar=False)
+        if hasattr(query_embedding, 'tolist'):
+            return query_embedding.tolist()
+        return query_embedding
+    
+    def encode_observations(self, observations: List[str]) -> List[List[float]]:
+        """
+        Encode several observations in one batched encoder call
+        
+        Args:
+            observations: VLM observation texts
+            
+        Returns:
+            Query embedding per observation
+        """
+        embeddings = self.model.encode(list(observations), show_progress_bar=False)
+        return embeddings.tolist() if hasattr(embeddings, 'tolist') else [list(e) for e in embeddings]
+    
+    async def encode_observation_async(self, observation: str) -> List[float]:
+        """
+        Awaitable form of encode_observation
+        
+        Args:
+            observation: VLM observation text
+            
+        Returns:
+            Query embedding as a list of floats
+        """
+        if self.encode_batcher:
+            query_embedding = await self.encode_batcher.encode_async(observation)
+        else:
+            # Encoding is CPU-bound; keep it off the event loop
+            loop = asyncio.get_running_loop()
+            query_embedding = await loop.run_in_executor(
+                None, lambda: self.model.encode(observation, show_progress_bar=False)
+            )
+        return query_embedding.tolist() if hasattr(query_embedding, 'tolist') else query_embedding
+    
     def find_best_match(self, 
                        observation: str, 
                        task_name: str = None,
                        top_k: int = 1,
-                       observation_id: str = None) -> List[MatchResult]:
+                       observation_id: str = None,
+                       step_ids: Optional[List[int]] = None,
+                       query_embedding: Optional[List[float]] = None) -> List[MatchResult]:
         """
         Find the best matching task step(s) for a VLM observation using ChromaDB
         
@@ -247,12 +603,14 @@ class ChromaVectorSearchEngine:
             task_name: Optional specific task to search in
             top_k: Number of top matches to return
             observation_id: Optional observation ID for logging
+            step_ids: Optional step IDs to restrict the search to (requires task_name)
+            query_embedding: Optional precomputed observation embedding
             
         Returns:
             List of MatchResult objects sorted by similarity
         """
         start_time = time.time()
-        self.search_count += 1
+        self._counters.add("searches")
         log_manager = get_log_manager()
         
         if not observation or not observation.strip():
@@ -261,18 +619,28 @@ class ChromaVectorSearchEngine:
         
         try:
             # Log vector search start
-            logger.debug(f"Vector search starting: observation='{observation[:50]}...', task_filter={task_name}, top_k={top_k}")
+            logger.debug(f"Vector search starting: observation='{observation[:50]}...', task_filter={task_name}, "
+                         f"step_filter={step_ids}, top_k={top_k}")
             
-            # Generate embedding for the observation (optimized for single query)
+            # Generate embedding for the observation unless one was provided
             embedding_start = time.time()
-            query_embedding = self.model.encode(observation, show_progress_bar=False)
+            if query_embedding is None:
+                query_embedding = self.encode_observation(observation)
             embedding_time = time.time() - embedding_start
             
             logger.debug(f"Embedding generation completed in {embedding_time*1000:.1f}ms")
             
+            # Dense candidates are fused with BM25, so fetch a wider pool
+            n_results = max(top_k, self.candidate_pool_size) if self.lexical_weight > 0 else top_k
+            
             # Prepare query filters
             where_filter = None
-            if task_name:
+            if task_name and step_ids:
+                where_filter = {"$and": [{"task_name": task_name}, {"step_id": {"$in": list(step_ids)}}]}
+                top_k = min(top_k, len(step_ids))
+                n_results = min(n_results, len(step_ids))
+                logger.debug(f"Applying task/step filter: {task_name} steps {step_ids}")
+            elif task_name:
                 where_filter = {"task_name": task_name}
                 logger.debug(f"Applying task filter: {task_name}")
             
@@ -285,59 +653,91 @@ class ChromaVectorSearchEngine:
             search_start = time.time()
             results = self.collection.query(
                 query_embeddings=[query_emb],
-                n_results=top_k,
+                n_results=n_results,
                 where=where_filter,
-                include=["metadatas", "distances"]
+                include=["distances"]
             )
             search_time = time.time() - search_start
             
             logger.debug(f"ChromaDB query completed in {search_time*1000:.1f}ms")
             
-            # Convert results to MatchResult objects
+            # One snapshot for the whole result set; reloads swap in a new one
+            snapshot = self._snapshot
+            query_tokens = set(tokenize(observation))
+            distances = {}
+            if results["ids"] and results["ids"][0]:
+                distances = dict(zip(results["ids"][0], results["distances"][0]))
+            
+            # Union the BM25 top candidates with the dense pool, so a strong
+            # keyword hit ranked below the dense pool is still fused and ranked
+            if self.lexical_weight > 0 and query_tokens:
+                lexical_top = snapshot.lexical_index.top(
+                    query_tokens, self.candidate_pool_size,
+                    self._candidate_doc_ids(snapshot, task_name, step_ids)
+                )
+                lexical_only = [doc_id for doc_id, _ in lexical_top if doc_id not in distances]
+                if lexical_only:
+                    distances.update(self._cosine_distances(query_emb, lexical_only))
+            
+            # Convert results to MatchResult objects using the in-memory step table
             matches = []
             
-            if results["metadatas"] and results["metadatas"][0]:
-                logger.debug(f"Processing {len(results['metadatas'][0])} search results")
+            if distances:
+                logger.debug(f"Processing {len(distances)} search results")
                 
-                for i, metadata in enumerate(results["metadatas"][0]):
-                    # ChromaDB returns distances, convert to similarity (1 - distance)
-                    distance = results["distances"][0][i]
-                    similarity = max(0.0, 1.0 - distance)
+                candidate_ids = list(distances)
+                lexical_scores = snapshot.lexical_index.score(query_tokens, candidate_ids)
+                
+                for i, doc_id in enumerate(candidate_ids):
+                    entry = snapshot.step_table.get(doc_id)
+                    if entry is None:
+                        # Row of a task not loaded in this process, or a step
+                        # version written/superseded by a concurrent reload
+                        logger.debug(f"Skipping search result without step table entry: {doc_id}")
+                        continue
                     
-                    # Parse metadata back to lists
-                    tools_needed = metadata["tools_needed"].split(",") if metadata["tools_needed"] else []
-                    completion_indicators = metadata["completion_indicators"].split(",") if metadata["completion_indicators"] else []
-                    visual_cues = metadata["visual_cues"].split(",") if metadata["visual_cues"] else []
-                    safety_notes = metadata["safety_notes"].split(",") if metadata["safety_notes"] else []
+                    task_name_for_step, step = entry
+                    
+                    # ChromaDB returns distances, convert to similarity (1 - distance)
+                    distance = distances[doc_id]
+                    dense_similarity = max(0.0, 1.0 - distance)
+                    lexical_score = lexical_scores.get(doc_id, 0.0)
+                    similarity = self._fuse_scores(dense_similarity, lexical_score)
                     
                     # Find matched visual cues
-                    matched_cues = self._find_matched_cues(observation, visual_cues)
+                    matched_cues = snapshot.lexical_index.matched_cues(doc_id, query_tokens)
                     
                     match_result = MatchResult(
-                        step_id=int(metadata["step_id"]),
-                        task_description=metadata["task_description"],
-                        tools_needed=tools_needed,
-                        completion_indicators=completion_indicators,
-                        visual_cues=visual_cues,
-                        estimated_duration=metadata.get("estimated_duration", ""),
-                        safety_notes=safety_notes,
+                        step_id=step.step_id,
+                        task_description=step.task_description,
+                        tools_needed=step.tools_needed,
+                        completion_indicators=step.completion_indicators,
+                        visual_cues=step.visual_cues,
+                        estimated_duration=step.estimated_duration or "",
+                        safety_notes=step.safety_notes,
                         similarity=similarity,
                         confidence_level="",  # Will be set in __post_init__
                         matched_cues=matched_cues,
-                        task_name=metadata["task_name"]
+                        task_name=task_name_for_step,
+                        dense_similarity=dense_similarity,
+                        lexical_score=lexical_score
                     )
                     
                     matches.append(match_result)
                     
                     # Log individual match details
-                    logger.debug(f"Match {i+1}: task={metadata['task_name']}, step={metadata['step_id']}, "
-                               f"similarity={similarity:.3f}, confidence={match_result.confidence_level}")
+                    logger.debug(f"Match {i+1}: task={task_name_for_step}, step={step.step_id}, "
+                               f"similarity={similarity:.3f} (dense={dense_similarity:.3f}, "
+                               f"bm25={lexical_score:.2f}), confidence={match_result.confidence_level}")
+                
+                matches.sort(key=lambda match: match.similarity, reverse=True)
+                matches = matches[:top_k]
             else:
                 logger.debug("No search results returned from ChromaDB")
             
             # Track performance
             total_search_time = time.time() - start_time
-            self.total_search_time += total_search_time
+            self._counters.add("search_time", total_search_time)
             
             logger.debug(f"Vector search completed in {total_search_time*1000:.1f}ms, found {len(matches)} matches")
             
@@ -361,33 +761,101 @@ class ChromaVectorSearchEngine:
             
             return []
     
-    def _find_matched_cues(self, observation: str, visual_cues: List[str]) -> List[str]:
+    def find_best_match_local_first(self,
+                                    observation: str,
+                                    task_name: str,
+                                    step_ids: Optional[List[int]],
+                                    threshold: float,
+                                    top_k: int = 5,
+                                    observation_id: str = None,
+                                    query_embedding: Optional[List[float]] = None) -> Tuple[List[MatchResult], bool]:
         """
-        Find which visual cues might have contributed to the match
+        Search a task's neighbouring steps, widening to the full index if needed
+        
+        The observation is encoded once and the embedding reused for both
+        searches.
         
         Args:
             observation: VLM observation text
-            visual_cues: List of visual cues for the step
+            task_name: Task the neighbouring steps belong to
+            step_ids: Neighbouring step IDs searched first
+            threshold: Minimum local similarity to accept without widening
+            top_k: Number of top matches to return
+            observation_id: Optional observation ID for logging
+            query_embedding: Optional precomputed observation embedding
             
         Returns:
-            List of visual cues that appear to match the observation
+            Tuple of (matches, whether the search was widened to the full index)
         """
-        observation_lower = observation.lower()
-        matched = []
+        if query_embedding is None:
+            query_embedding = self.encode_observation(observation)
         
-        for cue in visual_cues:
-            if not cue:  # Skip empty cues
-                continue
-                
-            # Simple keyword matching (can be improved with more sophisticated NLP)
-            cue_words = cue.lower().replace('_', ' ').split()
+        matches = self.find_best_match(observation, task_name, top_k=top_k, observation_id=observation_id,
+                                       step_ids=step_ids, query_embedding=query_embedding)
+        if matches and matches[0].similarity >= threshold:
+            return matches, False
+        
+        matches = self.find_best_match(observation, None, top_k=top_k, observation_id=observation_id,
+                                       query_embedding=query_embedding)
+        return matches, True
+    
+    @staticmethod
+    def _candidate_doc_ids(snapshot: IndexSnapshot,
+                           task_name: Optional[str],
+                           step_ids: Optional[List[int]]) -> Optional[List[str]]:
+        """
+        Document IDs a search is restricted to, mirroring the ChromaDB filter
+        
+        Returns:
+            None for an unfiltered search, otherwise the allowed document IDs
+        """
+        if not task_name:
+            return None
+        rows = snapshot.task_rows.get(task_name, {})
+        if step_ids:
+            return [rows[step_id] for step_id in step_ids if step_id in rows]
+        return list(rows.values())
+    
+    def _cosine_distances(self, query_embedding: List[float], doc_ids: List[str]) -> Dict[str, float]:
+        """
+        Cosine distances between the query and stored rows outside the dense pool
+        
+        Args:
+            query_embedding: Observation embedding
+            doc_ids: Document IDs to score
             
-            for word in cue_words:
-                if len(word) > 3 and word in observation_lower:
-                    matched.append(cue)
-                    break
+        Returns:
+            Dictionary of doc_id -> cosine distance (same scale as ChromaDB's)
+        """
+        rows = self.collection.get(ids=doc_ids, include=["embeddings"])
+        query = np.asarray(query_embedding, dtype=np.float64)
+        query_norm = np.linalg.norm(query) or 1.0
+        distances = {}
+        for doc_id, embedding in zip(rows["ids"], rows["embeddings"]):
+            vector = np.asarray(embedding, dtype=np.float64)
+            norm = np.linalg.norm(vector) or 1.0
+            distances[doc_id] = 1.0 - float(np.dot(query, vector) / (query_norm * norm))
+        return distances
+    
+    def _fuse_scores(self, dense_similarity: float, lexical_score: float) -> float:
+        """
+        Fuse a dense similarity with a BM25 score
+        
+        The BM25 score is squashed into [0, 1) and closes at most
+        ``lexical_weight`` of the gap between the dense similarity and 1.0,
+        so fused scores stay on the dense scale used by confidence levels.
         
-        return matched
+        Args:
+            dense_similarity: Cosine similarity from the vector index
+            lexical_score: Raw BM25 score
+            
+        Returns:
+            Fused similarity in [0, 1]
+        """
+        if lexical_score <= 0 or self.lexical_weight <= 0:
+            return dense_similarity
+        lexical_norm = lexical_score / (lexical_score + self.lexical_saturation)
+        return min(1.0, dense_similarity + self.lexical_weight * lexical_norm * (1.0 - dense_similarity))
     
     def get_performance_stats(self) -> Dict[str, Any]:
         """
@@ -396,22 +864,38 @@ class ChromaVectorSearchEngine:
         Returns:
             Dictionary with performance metrics
         """
-        avg_search_time = (self.total_search_time / max(1, self.search_count)) * 1000
+        counters = self._counters.totals()
+        avg_search_time = (counters["search_time"] / max(1, counters["searches"])) * 1000
         
         # Get collection stats
         collection_count = self.collection.count()
+        snapshot = self._snapshot
         
         return {
-            "total_searches": self.search_count,
-            "total_search_time_ms": self.total_search_time * 1000,
+            "total_searches": int(counters["searches"]),
+            "total_search_time_ms": counters["search_time"] * 1000,
             "avg_search_time_ms": avg_search_time,
-            "loaded_tasks": len(self.task_knowledge),
+            "loaded_tasks": len(snapshot.task_knowledge),
             "total_documents": collection_count,
+            "index_version": snapshot.version,
             "model_name": self.model_name,
+            "encoder_backend": getattr(self.model, "backend", "unknown"),
             "collection_name": self.collection_name,
+            "lexical_index": {
+                "documents": len(snapshot.lexical_index),
+                "terms": len(snapshot.lexical_index.postings),
+                "weight": self.lexical_weight,
+                "candidate_pool_size": self.candidate_pool_size
+            },
+            "encode_batcher": self.encode_batcher.get_stats() if self.encode_batcher else None,
             "performance_target_met": avg_search_time < 10.0
         }
     
+    def close(self) -> None:
+        """Stop the encode micro-batcher (queued requests are processed first)"""
+        if self.encode_batcher is not None:
+            self.encode_batcher.close()
+    
     def clear_collection(self) -> None:
         """
         Clear all data from the ChromaDB collection
@@ -422,7 +906,8 @@ class ChromaVectorSearchEngine:
                 name=self.collection_name,
                 metadata={"hnsw:space": "cosine"}
             )
-            self.task_knowledge.clear()
+            with self._index_lock:
+                self._publish({}, {}, LexicalIndex(), {})
             logger.info("ChromaDB collection cleared")
         except Exception as e:
             logger.error(f"Error clearing collection: {str(e)}")
@@ -431,15 +916,15 @@ class ChromaVectorSearchEngine:
         """
         Reload all tasks into ChromaDB
         This can be called when task data is updated
+        
+        Rows are rewritten only where a step's content or the encoder changed,
+        and all tasks are republished in one snapshot; queries keep using the
+        previous snapshot (and its rows) until then instead of seeing an
+        emptied collection.
         """
         logger.info("Reloading all tasks into ChromaDB...")
         
-        # Clear existing data
-        self.clear_collection()
-        
-        # Re-add all tasks
-        for task_name, task in self.task_knowledge.items():
-            self.add_task_knowledge(task)
+        self.add_tasks_knowledge(list(self.task_knowledge.values()))
         
         logger.info(f"Reloaded {len(self.task_knowledge)} tasks into ChromaDB")
     
@@ -471,7 +956,7 @@ class ChromaVectorSearchEngine:
             
             # Check model loading
             if not hasattr(self.model, 'encode'):
-                health["issues"].append("Sentence transformer model not properly loaded")
+                health["issues"].append("Embedding encoder not properly loaded")
                 health["status"] = "unhealthy"
             
             if health["warnings"] and health["status"] == "healthy":
@@ -6,13 +6,12 @@ from .state_tracker import (
     get_state_tracker, 
     ConfidenceLevel, 
     ActionType, 
-    RecentObservationStatus,
     StateRecord,
     ProcessingMetrics,
     OptimizedStateRecord,
-    PendingStateCandidate,
     MemoryStats
 )
+from .session_registry import StateTrackerRegistry, get_session_registry, DEFAULT_SESSION_ID
 from .text_processor import VLMTextProcessor
 from .query_processor import QueryProcessor, QueryType, QueryResult
 
@@ -21,12 +20,13 @@ __all__ = [
     'get_state_tracker', 
     'ConfidenceLevel', 
     'ActionType', 
-    'RecentObservationStatus',
     'StateRecord',
     'ProcessingMetrics',
     'OptimizedStateRecord',
-    'PendingStateCandidate',
     'MemoryStats',
+    'StateTrackerRegistry',
+    'get_session_registry',
+    'DEFAULT_SESSION_ID',
     'VLMTextProcessor', 
     'QueryProcessor', 
     'QueryType', 
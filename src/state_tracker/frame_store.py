@@ -0,0 +1,108 @@
+"""
+Recent Frame Store
+
+Keeps the latest frames processed by a StateTracker as encoded image bytes
+so the image-aware VLM fallback can answer a query with the frame the
+tracker last saw, without re-capturing from the camera or re-running the
+model preprocessing. Frames are bounded both by count and by total bytes;
+the oldest frames are dropped first.
+"""
+
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, NamedTuple, Optional
+
+
+class StoredFrame(NamedTuple):
+    """One processed frame"""
+    image_data: bytes  # Encoded image (JPEG/PNG bytes as sent to the VLM)
+    timestamp: datetime
+    observation_id: Optional[str]
+    processed: bool  # True if already preprocessed for the active model
+
+
+class FrameStore:
+    """
+    Bounded FIFO of recent frames with running size accounting
+
+    Appends happen on the request path and reads on the query path, so the
+    deque and byte counter are guarded by a lock.
+    """
+
+    def __init__(self, max_frames: int = 3, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize an empty store
+
+        Args:
+            max_frames: Maximum number of frames kept (0 disables the store)
+            max_bytes: Maximum total size of the kept frames
+        """
+        self.max_frames = max(0, max_frames)
+        self.max_bytes = max_bytes
+        self._frames: Deque[StoredFrame] = deque()
+        self._lock = threading.Lock()
+
+        self.total_bytes = 0
+        self.stored_count = 0
+        self.evicted_count = 0
+        self.rejected_count = 0
+
+    def add(self, image_data: bytes, observation_id: Optional[str] = None, processed: bool = True) -> bool:
+        """
+        Store a frame, evicting the oldest frames to stay within the bounds
+
+        Args:
+            image_data: Encoded image bytes
+            observation_id: Optional observation the frame belongs to
+            processed: Whether the frame is already preprocessed for the model
+
+        Returns:
+            True if the frame was stored (False if empty, disabled or over max_bytes)
+        """
+        size = len(image_data) if image_data else 0
+        if size == 0 or self.max_frames == 0 or size > self.max_bytes:
+            if size:
+                self.rejected_count += 1
+            return False
+
+        frame = StoredFrame(bytes(image_data), datetime.now(), observation_id, processed)
+        with self._lock:
+            self._frames.append(frame)
+            self.total_bytes += size
+            self.stored_count += 1
+            while len(self._frames) > self.max_frames or self.total_bytes > self.max_bytes:
+                self.total_bytes -= len(self._frames.popleft().image_data)
+                self.evicted_count += 1
+        return True
+
+    def latest(self) -> Optional[StoredFrame]:
+        """Most recently stored frame, or None if the store is empty"""
+        with self._lock:
+            return self._frames[-1] if self._frames else None
+
+    def clear(self) -> None:
+        """Drop every stored frame"""
+        with self._lock:
+            self._frames.clear()
+            self.total_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._frames)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Frame counts, byte usage and limits"""
+        with self._lock:
+            frames = len(self._frames)
+            total_bytes = self.total_bytes
+            latest = self._frames[-1].timestamp.isoformat() if self._frames else None
+        return {
+            'frames': frames,
+            'total_bytes': total_bytes,
+            'max_frames': self.max_frames,
+            'max_bytes': self.max_bytes,
+            'stored_frames': self.stored_count,
+            'evicted_frames': self.evicted_count,
+            'rejected_frames': self.rejected_count,
+            'latest_timestamp': latest
+        }
@@ -0,0 +1,190 @@
+"""
+Running Metrics Aggregation
+
+Bounded window of ProcessingMetrics that keeps its summary statistics up to
+date on every append and eviction: counts, sums, sliding min/max,
+per-action/level/scope counters and EWMAs. Summary endpoints read these
+aggregates instead of re-scanning the window on every call.
+"""
+
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Tuple
+
+
+def _increment(counts: Dict[str, int], key: str, amount: int) -> None:
+    value = counts.get(key, 0) + amount
+    if value:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+class SlidingExtreme:
+    """
+    Minimum or maximum of a FIFO window in amortized O(1)
+
+    Keeps a monotonic deque of (sequence, value) pairs; values that can no
+    longer become the extreme are dropped on push.
+    """
+
+    def __init__(self, maximum: bool):
+        """
+        Args:
+            maximum: Track the maximum (True) or the minimum (False)
+        """
+        self.maximum = maximum
+        self._candidates: Deque[Tuple[int, float]] = deque()
+
+    def push(self, sequence: int, value: float) -> None:
+        """Add the value appended to the window as item `sequence`"""
+        candidates = self._candidates
+        if self.maximum:
+            while candidates and candidates[-1][1] <= value:
+                candidates.pop()
+        else:
+            while candidates and candidates[-1][1] >= value:
+                candidates.pop()
+        candidates.append((sequence, value))
+
+    def expire(self, sequence: int) -> None:
+        """Forget item `sequence`, which was evicted from the window"""
+        if self._candidates and self._candidates[0][0] == sequence:
+            self._candidates.popleft()
+
+    @property
+    def value(self) -> float:
+        """Current extreme (0.0 for an empty window)"""
+        return self._candidates[0][1] if self._candidates else 0.0
+
+    def clear(self) -> None:
+        self._candidates.clear()
+
+
+class MetricsWindow:
+    """
+    Bounded window of ProcessingMetrics with constant-time summaries
+
+    Behaves like a deque(maxlen=max_size) for appending and iteration.
+    Window statistics (averages, min/max, distributions) cover the records
+    currently held; EWMAs and lifetime_processed cover every appended record.
+    """
+
+    def __init__(self, max_size: int = 100, ewma_alpha: float = 0.1):
+        """
+        Initialize an empty window
+
+        Args:
+            max_size: Maximum number of metrics records kept
+            ewma_alpha: Weight of the newest record in the EWMAs
+        """
+        self.max_size = max(1, max_size)
+        self.ewma_alpha = ewma_alpha
+        self._records: Deque[Any] = deque()
+        self.clear()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._records)
+
+    def __getitem__(self, index: int) -> Any:
+        return self._records[index]
+
+    def clear(self) -> None:
+        """Remove every record and reset all aggregates"""
+        self._records.clear()
+        self._first_sequence = 0  # Sequence number of the oldest record
+        self.lifetime_processed = 0
+
+        self.confidence_sum = 0.0
+        self.processing_time_sum = 0.0
+        self._max_confidence = SlidingExtreme(maximum=True)
+        self._min_confidence = SlidingExtreme(maximum=False)
+        self._max_processing_time = SlidingExtreme(maximum=True)
+        self._min_processing_time = SlidingExtreme(maximum=False)
+
+        self.action_counts: Dict[str, int] = {}
+        self.confidence_level_counts: Dict[str, int] = {}
+        self.search_scope_counts: Dict[str, int] = {}
+
+        self.ewma_confidence = 0.0
+        self.ewma_processing_time_ms = 0.0
+
+    def append(self, metrics: Any) -> None:
+        """
+        Add a ProcessingMetrics record, evicting the oldest when full
+
+        Args:
+            metrics: ProcessingMetrics record
+        """
+        if len(self._records) == self.max_size:
+            self._evict_oldest()
+
+        sequence = self.lifetime_processed
+        confidence = metrics.confidence_score
+        processing_time = metrics.processing_time_ms
+
+        self._records.append(metrics)
+        self.lifetime_processed += 1
+
+        self.confidence_sum += confidence
+        self.processing_time_sum += processing_time
+        self._max_confidence.push(sequence, confidence)
+        self._min_confidence.push(sequence, confidence)
+        self._max_processing_time.push(sequence, processing_time)
+        self._min_processing_time.push(sequence, processing_time)
+        self._count(metrics, 1)
+
+        if self.lifetime_processed == 1:
+            self.ewma_confidence = confidence
+            self.ewma_processing_time_ms = processing_time
+        else:
+            alpha = self.ewma_alpha
+            self.ewma_confidence += alpha * (confidence - self.ewma_confidence)
+            self.ewma_processing_time_ms += alpha * (processing_time - self.ewma_processing_time_ms)
+
+    def _evict_oldest(self) -> None:
+        metrics = self._records.popleft()
+        sequence = self._first_sequence
+        self._first_sequence += 1
+
+        self.confidence_sum -= metrics.confidence_score
+        self.processing_time_sum -= metrics.processing_time_ms
+        for extreme in (self._max_confidence, self._min_confidence,
+                        self._max_processing_time, self._min_processing_time):
+            extreme.expire(sequence)
+        self._count(metrics, -1)
+
+    def _count(self, metrics: Any, amount: int) -> None:
+        _increment(self.action_counts, metrics.action_taken.value, amount)
+        _increment(self.confidence_level_counts, metrics.confidence_level.value, amount)
+        if metrics.search_scope:
+            _increment(self.search_scope_counts, metrics.search_scope, amount)
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Get the window summary without scanning the records
+
+        Returns:
+            Dictionary of window averages, extremes, distributions and EWMAs
+        """
+        count = len(self._records)
+        if count == 0:
+            return {'total_processed': 0}
+
+        return {
+            'total_processed': count,
+            'avg_confidence': self.confidence_sum / count,
+            'max_confidence': self._max_confidence.value,
+            'min_confidence': self._min_confidence.value,
+            'avg_processing_time_ms': self.processing_time_sum / count,
+            'max_processing_time_ms': self._max_processing_time.value,
+            'min_processing_time_ms': self._min_processing_time.value,
+            'action_distribution': dict(self.action_counts),
+            'confidence_level_distribution': dict(self.confidence_level_counts),
+            'search_scope_distribution': dict(self.search_scope_counts),
+            'ewma_confidence': self.ewma_confidence,
+            'ewma_processing_time_ms': self.ewma_processing_time_ms,
+            'lifetime_processed': self.lifetime_processed
+        }
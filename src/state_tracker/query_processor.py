@@ -5,6 +5,10 @@ This module handles intelligent parsing and routing of user queries
 for the instant response whiteboard mechanism.
 """
 
+import asyncio
+import concurrent.futures
+import json
+import os
 import re
 import time
 from typing import Dict, Any, Optional, List
@@ -40,6 +44,38 @@ class QueryResult:
     confidence: float
     raw_query: str
 
+# Query types checked by the classifier, more specific first
+CLASSIFY_PRIORITY = [
+    QueryType.CURRENT_STEP,
+    QueryType.NEXT_STEP,
+    QueryType.REQUIRED_TOOLS,
+    QueryType.COMPLETION_STATUS,  # Move completion_status before help
+    QueryType.PROGRESS_OVERVIEW,
+    QueryType.HELP
+]
+
+# Phrases marking clearly non-task-related queries
+NON_TASK_INDICATORS = [
+    'meaning of life', 'joke', 'weather', 'tokyo', 'quantum physics',
+    'perfect cup of coffee', 'programming', 'artificial intelligence',
+    'philosophy', 'consciousness', 'news', 'current events'
+]
+
+# General questions that should not be classified as HELP
+GENERAL_QUESTION_PATTERNS = [
+    'what is', 'tell me about', 'explain', 'how do i make',
+    'what\'s the weather', 'meaning of'
+]
+
+def _load_debug_logging_flag() -> bool:
+    """Read logging.debug_enabled from state_tracker_config.json"""
+    config_path = os.path.join(os.path.dirname(__file__), '..', 'config', 'state_tracker_config.json')
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return bool(json.load(f).get('logging', {}).get('debug_enabled', False))
+    except Exception:
+        return False
+
 class QueryProcessor:
     """
     Intelligent query processor for instant response system.
@@ -80,6 +116,9 @@ class QueryProcessor:
         # Log final initialization status
         print(f"VLM Fallback Status: Enhanced={bool(self.enhanced_vlm_fallback)}, Standard={bool(self.vlm_fallback)}")
         
+        # Upper bound for one VLM fallback attempt
+        self.fallback_timeout_seconds = 30.0
+        
         # Define keyword patterns for each query type (English only)
         self.query_patterns = {
             QueryType.CURRENT_STEP: [
@@ -107,65 +146,88 @@ class QueryProcessor:
                 r'explain|describe|tell.*me.*about|show.*me.*how|assist|support'
             ]
         }
+        
+        # Per-pattern classification logging is only done in debug mode
+        self.debug_pattern_logging = _load_debug_logging_flag()
+        self.compile_patterns()
+    
+    def compile_patterns(self):
+        """
+        Compile query_patterns into one classifier regex
+        
+        All patterns become alternatives of a single lookahead, ordered by
+        priority and preceded by the non-task phrases. Scanning the query
+        once reports, at each position, the highest-priority pattern that
+        starts there, so the lowest index seen over the scan is the pattern
+        the old one-search-per-pattern loop would have picked. Called
+        automatically when query_patterns changes.
+        """
+        checks = [
+            (query_type, pattern)
+            for query_type in CLASSIFY_PRIORITY
+            for pattern in self.query_patterns.get(query_type, [])
+        ]
+        
+        alternatives = ['(?P<non_task>' + '|'.join(re.escape(p) for p in NON_TASK_INDICATORS) + ')']
+        alternatives.extend(f'(?P<p{index}>{pattern})' for index, (_, pattern) in enumerate(checks))
+        
+        self._pattern_checks = checks
+        self._classifier = re.compile('(?=' + '|'.join(alternatives) + ')')
+        # Group number -> check index (-1 for non-task phrases)
+        self._group_checks = {self._classifier.groupindex['non_task']: -1}
+        self._group_checks.update(
+            (self._classifier.groupindex[f'p{index}'], index) for index in range(len(checks))
+        )
+        self._compiled_key = self._pattern_key()
+    
+    def _pattern_key(self):
+        return tuple((query_type, tuple(patterns)) for query_type, patterns in self.query_patterns.items())
     
     def _classify_query(self, query: str, query_id: str = None, log_manager = None) -> QueryType:
         """Classify user query based on keyword patterns with improved accuracy"""
         query_lower = query.lower().strip()
+        log = bool(query_id and log_manager)
         
         # 記錄分類開始
-        if query_id and log_manager:
+        if log:
             log_manager.log_query_classify_start(query_id, query)
         
-        # Define priority order for query types (more specific first)
-        priority_order = [
-            QueryType.CURRENT_STEP,
-            QueryType.NEXT_STEP,
-            QueryType.REQUIRED_TOOLS,
-            QueryType.COMPLETION_STATUS,  # Move completion_status before help
-            QueryType.PROGRESS_OVERVIEW,
-            QueryType.HELP
-        ]
+        if self._compiled_key != self._pattern_key():
+            self.compile_patterns()
         
-        # First check for clearly non-task-related queries
-        non_task_indicators = [
-            'meaning of life', 'joke', 'weather', 'tokyo', 'quantum physics',
-            'perfect cup of coffee', 'programming', 'artificial intelligence',
-            'philosophy', 'consciousness', 'news', 'current events'
-        ]
+        # Single scan: lowest check index matched anywhere in the query
+        best = len(self._pattern_checks)
+        for found in self._classifier.finditer(query_lower):
+            best = min(best, self._group_checks[found.lastindex])
+            if best <= 0:
+                break
         
-        if any(indicator in query_lower for indicator in non_task_indicators):
-            if query_id and log_manager:
+        # First check for clearly non-task-related queries
+        if best == -1:
+            if log:
                 log_manager.log_query_classify_result(query_id, QueryType.UNKNOWN.value, 0.1)
             return QueryType.UNKNOWN
         
-        # Check each query type in priority order
-        for query_type in priority_order:
-            patterns = self.query_patterns.get(query_type, [])
-            for pattern in patterns:
-                # 記錄模式檢查過程
-                if query_id and log_manager:
-                    log_manager.log_query_pattern_check(query_id, pattern, query_type.value)
-                
-                if re.search(pattern, query_lower):
-                    # Additional validation for HELP classification
-                    if query_type == QueryType.HELP:
-                        # Don't classify general questions as HELP if they're not task-related
-                        general_question_patterns = [
-                            'what is', 'tell me about', 'explain', 'how do i make',
-                            'what\'s the weather', 'meaning of'
-                        ]
-                        if any(gp in query_lower for gp in general_question_patterns):
-                            continue  # Skip this match, continue checking
-                    
-                    # 記錄模式匹配成功
-                    if query_id and log_manager:
+        # 記錄模式檢查過程（僅除錯模式）
+        if log and self.debug_pattern_logging:
+            for query_type, pattern in self._pattern_checks[:best + 1]:
+                log_manager.log_query_pattern_check(query_id, pattern, query_type.value)
+        
+        if best < len(self._pattern_checks):
+            query_type, pattern = self._pattern_checks[best]
+            # Don't classify general questions as HELP if they're not task-related
+            # (HELP is checked last, so nothing else can match instead)
+            if query_type != QueryType.HELP or not any(gp in query_lower for gp in GENERAL_QUESTION_PATTERNS):
+                # 記錄模式匹配成功
+                if log:
+                    if self.debug_pattern_logging:
                         log_manager.log_query_pattern_match(query_id, query_type.value, pattern)
-                        # 記錄分類最終結果
-                        log_manager.log_query_classify_result(query_id, query_type.value, 0.9)
-                    return query_type
+                    # 記錄分類最終結果
+                    log_manager.log_query_classify_result(query_id, query_type.value, 0.9)
+                return query_type
         
         # 記錄分類結果（未找到匹配）
-        if query_id and log_manager:
+        if log:
             log_manager.log_query_classify_result(query_id, QueryType.UNKNOWN.value, 0.3)
         
         return QueryType.UNKNOWN
@@ -249,6 +311,18 @@ class QueryProcessor:
             # Fallback response in case of any error
             return f"Sorry, I encountered an error while processing your query. You are currently on step {step_index} of task '{task_id}'."
     
+    def build_responses(self, state_data: Optional[Dict[str, Any]]) -> Dict[QueryType, str]:
+        """
+        Render the template response of every query type for one state
+        
+        Args:
+            state_data: Current state data from State Tracker
+            
+        Returns:
+            Dictionary of QueryType -> response text
+        """
+        return {query_type: self._generate_response(query_type, state_data) for query_type in QueryType}
+    
     def _get_response_type(self, query_type: QueryType, state_data: Optional[Dict[str, Any]]) -> str:
         """Determine response type for logging"""
         if not state_data:
@@ -270,170 +344,245 @@ class QueryProcessor:
             return "unknown_response"
     
     def process_query(self, query: str, current_state: Optional[Dict[str, Any]], 
-                     query_id: str = None, log_manager = None, state_tracker = None) -> QueryResult:
+                     query_id: str = None, log_manager = None, state_tracker = None,
+                     responses: Optional[Dict[QueryType, str]] = None) -> QueryResult:
         """
         Enhanced query processing with recent observation awareness.
         
+        Synchronous entry point. Code running inside an event loop should
+        await process_query_async instead: from a running loop this method
+        has to run the VLM fallback on a helper thread and block until it
+        finishes.
+        
         Args:
             query: User's natural language query
             current_state: Current state data from State Tracker
             query_id: Optional query ID for logging
             log_manager: Optional log manager for detailed logging
             state_tracker: Optional state tracker instance for recent observation check
+            responses: Optional prebuilt template responses for current_state
+                (see build_responses)
             
         Returns:
             QueryResult with response and metadata
         """
         try:
             start_time = time.time()
+            query_type, confidence, should_use_fallback = self._prepare_query(
+                query, current_state, query_id, log_manager, state_tracker
+            )
             
-            # 記錄處理開始
-            if query_id and log_manager:
-                state_keys = list(current_state.keys()) if current_state else []
-                log_manager.log_query_process_start(query_id, query, state_keys)
-            
-            # Classify query with detailed logging
-            query_type = self._classify_query(query, query_id, log_manager)
-            
-            # 記錄狀態查找
-            if query_id and log_manager:
-                state_found = bool(current_state)
-                state_info = {
-                    'has_task_id': 'task_id' in (current_state or {}),
-                    'has_step_index': 'step_index' in (current_state or {}),
-                    'state_keys': list((current_state or {}).keys())
-                }
-                log_manager.log_query_state_lookup(query_id, state_found, state_info)
-            
-            # Calculate confidence based on query complexity and state availability
-            confidence = self._calculate_confidence(query_type, current_state, query)
+            if should_use_fallback:
+                fallback = self._run_vlm_fallbacks(query, query_type, confidence, start_time,
+                                                   query_id, log_manager, state_tracker)
+                try:
+                    asyncio.get_running_loop()
+                except RuntimeError:
+                    fallback_result = asyncio.run(fallback)
+                else:
+                    # Called synchronously from inside an event loop: the loop
+                    # thread is blocked either way, run the coroutine elsewhere
+                    print("Warning: process_query called from a running event loop, use process_query_async")
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
+                        fallback_result = executor.submit(asyncio.run, fallback).result()
+                if fallback_result:
+                    return fallback_result
+            
+            return self._template_result(query, query_type, confidence, current_state, start_time, query_id, log_manager,
+                                         responses)
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    async def process_query_async(self, query: str, current_state: Optional[Dict[str, Any]], 
+                                  query_id: str = None, log_manager = None, state_tracker = None,
+                                  responses: Optional[Dict[QueryType, str]] = None) -> QueryResult:
+        """
+        Asynchronous form of process_query for use inside an event loop
+        
+        VLM fallback requests are awaited directly, so the loop keeps serving
+        other frames and queries while a fallback is in flight.
+        
+        Args:
+            query: User's natural language query
+            current_state: Current state data from State Tracker
+            query_id: Optional query ID for logging
+            log_manager: Optional log manager for detailed logging
+            state_tracker: Optional state tracker instance for recent observation check
+            responses: Optional prebuilt template responses for current_state
+                (see build_responses)
             
-            # Enhanced fallback decision with recent observation awareness
-            should_use_fallback = self._should_use_vlm_fallback(query_type, current_state, confidence, state_tracker)
+        Returns:
+            QueryResult with response and metadata
+        """
+        try:
+            start_time = time.time()
+            query_type, confidence, should_use_fallback = self._prepare_query(
+                query, current_state, query_id, log_manager, state_tracker
+            )
             
-            # Debug logging
-            print(f"DEBUG: Query='{query}', Type={query_type}, Confidence={confidence}, Should_fallback={should_use_fallback}, Enhanced_VLM_available={bool(self.enhanced_vlm_fallback)}, VLM_available={bool(self.vlm_fallback)}")
+            if should_use_fallback:
+                fallback_result = await self._run_vlm_fallbacks(query, query_type, confidence, start_time,
+                                                                query_id, log_manager, state_tracker)
+                if fallback_result:
+                    return fallback_result
             
-            # Priority: Use Enhanced VLM Fallback (with image support)
-            if should_use_fallback and self.enhanced_vlm_fallback:
-                try:
-                    # Simplified VLM Fallback: Direct query to VLM
-                    print(f"DEBUG: Using Enhanced VLM Fallback for query: '{query}' (Type: {query_type}, Confidence: {confidence})")
-                    
-                    # Get current image and send query directly to VLM
-                    current_image = None
-                    if state_tracker:
-                        current_image = state_tracker.get_last_processed_image()
-                    
-                    # Direct VLM query - let VLM handle all analysis
-                    # Use asyncio to run the async method
-                    import asyncio
-                    try:
-                        # Try to get existing event loop
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # If loop is running, create a task
-                            import concurrent.futures
-                            with concurrent.futures.ThreadPoolExecutor() as executor:
-                                future = executor.submit(asyncio.run, self.simple_enhanced_vlm_fallback(query, current_image))
-                                fallback_result = future.result(timeout=30)
-                        else:
-                            # If no loop is running, use asyncio.run
-                            fallback_result = asyncio.run(self.simple_enhanced_vlm_fallback(query, current_image))
-                    except RuntimeError:
-                        # If there's no event loop, create one
-                        fallback_result = asyncio.run(self.simple_enhanced_vlm_fallback(query, current_image))
+            return self._template_result(query, query_type, confidence, current_state, start_time, query_id, log_manager,
+                                         responses)
+        except Exception as e:
+            return self._error_result(query, e)
+    
+    def _prepare_query(self, query: str, current_state: Optional[Dict[str, Any]],
+                       query_id: str = None, log_manager = None, state_tracker = None):
+        """
+        Classify a query and decide whether it needs the VLM fallback
+        
+        Returns:
+            Tuple of (query_type, confidence, should_use_fallback)
+        """
+        # 記錄處理開始
+        if query_id and log_manager:
+            state_keys = list(current_state.keys()) if current_state else []
+            log_manager.log_query_process_start(query_id, query, state_keys)
+        
+        # Classify query with detailed logging
+        query_type = self._classify_query(query, query_id, log_manager)
+        
+        # 記錄狀態查找
+        if query_id and log_manager:
+            state_found = bool(current_state)
+            state_info = {
+                'has_task_id': 'task_id' in (current_state or {}),
+                'has_step_index': 'step_index' in (current_state or {}),
+                'state_keys': list((current_state or {}).keys())
+            }
+            log_manager.log_query_state_lookup(query_id, state_found, state_info)
+        
+        # Calculate confidence based on query complexity and state availability
+        confidence = self._calculate_confidence(query_type, current_state, query)
+        
+        # Enhanced fallback decision with recent observation awareness
+        should_use_fallback = self._should_use_vlm_fallback(query_type, current_state, confidence, state_tracker)
+        
+        # Debug logging
+        print(f"DEBUG: Query='{query}', Type={query_type}, Confidence={confidence}, Should_fallback={should_use_fallback}, Enhanced_VLM_available={bool(self.enhanced_vlm_fallback)}, VLM_available={bool(self.vlm_fallback)}")
+        
+        return query_type, confidence, should_use_fallback
+    
+    async def _run_vlm_fallbacks(self, query: str, query_type: QueryType, confidence: float, start_time: float,
+                                 query_id: str = None, log_manager = None, state_tracker = None) -> Optional[QueryResult]:
+        """
+        Try the enhanced (image) fallback, then the standard (text) fallback
+        
+        Each attempt is bounded by fallback_timeout_seconds.
+        
+        Returns:
+            QueryResult from the first fallback that answers, or None
+        """
+        # Priority: Use Enhanced VLM Fallback (with image support)
+        if self.enhanced_vlm_fallback:
+            try:
+                # Simplified VLM Fallback: Direct query to VLM
+                print(f"DEBUG: Using Enhanced VLM Fallback for query: '{query}' (Type: {query_type}, Confidence: {confidence})")
+                
+                # Send this session's last processed frame with the query
+                current_frame = None
+                if state_tracker:
+                    current_frame = state_tracker.get_last_processed_frame()
+                current_image = current_frame.image_data if current_frame else None
+                
+                # Direct VLM query - let VLM handle all analysis
+                fallback_result = await asyncio.wait_for(
+                    self.simple_enhanced_vlm_fallback(query, current_image, current_frame),
+                    self.fallback_timeout_seconds
+                )
+                
+                if fallback_result:
+                    # Calculate processing time
+                    processing_time = (time.time() - start_time) * 1000
                     
-                    if fallback_result:
-                        # Calculate processing time
-                        processing_time = (time.time() - start_time) * 1000
-                        
-                        # Log processing completion
-                        if query_id and log_manager:
-                            log_manager.log_query_process_complete(query_id, processing_time)
-                        
-                        return QueryResult(
-                            query_type=query_type,  # Use calculated query_type
-                            response_text=fallback_result["response_text"],
-                            processing_time_ms=processing_time,
-                            confidence=fallback_result.get("confidence", confidence),  # Use VLM confidence or calculated confidence
-                            raw_query=query
-                        )
-                except Exception as e:
-                    # If Enhanced VLM fallback fails, continue with standard fallback
-                    print(f"Enhanced VLM fallback failed: {e}")
-            
-            # Fallback to standard VLM Fallback (text-only)
-            if should_use_fallback and self.vlm_fallback:
-                try:
-                    # Simplified VLM Fallback: Direct query to VLM
-                    print(f"DEBUG: Using Standard VLM Fallback for query: '{query}' (Type: {query_type}, Confidence: {confidence})")
+                    # Log processing completion
+                    if query_id and log_manager:
+                        log_manager.log_query_process_complete(query_id, processing_time)
                     
-                    # Direct VLM query - let VLM handle all analysis
-                    # Use asyncio to run the async method
-                    import asyncio
-                    try:
-                        # Try to get existing event loop
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # If loop is running, create a task
-                            import concurrent.futures
-                            with concurrent.futures.ThreadPoolExecutor() as executor:
-                                future = executor.submit(asyncio.run, self.simple_vlm_fallback(query))
-                                fallback_result = future.result(timeout=30)
-                        else:
-                            # If no loop is running, use asyncio.run
-                            fallback_result = asyncio.run(self.simple_vlm_fallback(query))
-                    except RuntimeError:
-                        # If there's no event loop, create one
-                        fallback_result = asyncio.run(self.simple_vlm_fallback(query))
+                    return QueryResult(
+                        query_type=query_type,  # Use calculated query_type
+                        response_text=fallback_result["response_text"],
+                        processing_time_ms=processing_time,
+                        confidence=fallback_result.get("confidence", confidence),  # Use VLM confidence or calculated confidence
+                        raw_query=query
+                    )
+            except Exception as e:
+                # If Enhanced VLM fallback fails, continue with standard fallback
+                print(f"Enhanced VLM fallback failed: {e!r}")
+        
+        # Fallback to standard VLM Fallback (text-only)
+        if self.vlm_fallback:
+            try:
+                # Simplified VLM Fallback: Direct query to VLM
+                print(f"DEBUG: Using Standard VLM Fallback for query: '{query}' (Type: {query_type}, Confidence: {confidence})")
+                
+                # Direct VLM query - let VLM handle all analysis
+                fallback_result = await asyncio.wait_for(
+                    self.simple_vlm_fallback(query), self.fallback_timeout_seconds
+                )
+                
+                if fallback_result:
+                    # Calculate processing time
+                    processing_time = (time.time() - start_time) * 1000
                     
-                    if fallback_result:
-                        # Calculate processing time
-                        processing_time = (time.time() - start_time) * 1000
-                        
-                        return QueryResult(
-                            query_type=query_type,  # Use calculated query_type
-                            response_text=fallback_result["response_text"],
-                            processing_time_ms=processing_time,
-                            confidence=fallback_result.get("confidence", confidence),  # Use VLM confidence or calculated confidence
-                            raw_query=query
-                        )
-                except Exception as e:
-                    # If VLM fallback fails, continue with template response
-                    print(f"VLM fallback failed: {e}")
-            
-            # Generate template response
+                    return QueryResult(
+                        query_type=query_type,  # Use calculated query_type
+                        response_text=fallback_result["response_text"],
+                        processing_time_ms=processing_time,
+                        confidence=fallback_result.get("confidence", confidence),  # Use VLM confidence or calculated confidence
+                        raw_query=query
+                    )
+            except Exception as e:
+                # If VLM fallback fails, continue with template response
+                print(f"VLM fallback failed: {e!r}")
+        
+        return None
+    
+    def _template_result(self, query: str, query_type: QueryType, confidence: float,
+                         current_state: Optional[Dict[str, Any]], start_time: float,
+                         query_id: str = None, log_manager = None,
+                         responses: Optional[Dict[QueryType, str]] = None) -> QueryResult:
+        """Build the template-based response for a classified query"""
+        # Look up the prebuilt response, or generate the template response
+        if responses and query_type in responses:
+            response_text = responses[query_type]
+        else:
             response_text = self._generate_response(query_type, current_state)
-            
-            # 記錄回應生成
-            if query_id and log_manager:
-                response_type = self._get_response_type(query_type, current_state)
-                log_manager.log_query_response_generate(query_id, response_type, len(response_text))
-            
-            # Calculate processing time
-            processing_time = (time.time() - start_time) * 1000
-            
-            # 記錄處理完成
-            if query_id and log_manager:
-                log_manager.log_query_process_complete(query_id, processing_time)
-            
-            return QueryResult(
-                query_type=query_type,
-                response_text=response_text,
-                processing_time_ms=processing_time,
-                confidence=confidence,
-                raw_query=query
-            )
-        except Exception as e:
-            # Return a fallback response in case of any error
-            return QueryResult(
-                query_type=QueryType.UNKNOWN,
-                response_text=f"Sorry, I encountered an error processing your query: {str(e)}",
-                processing_time_ms=0.0,
-                confidence=0.0,
-                raw_query=query
-            )
+        
+        # 記錄回應生成
+        if query_id and log_manager:
+            response_type = self._get_response_type(query_type, current_state)
+            log_manager.log_query_response_generate(query_id, response_type, len(response_text))
+        
+        # Calculate processing time
+        processing_time = (time.time() - start_time) * 1000
+        
+        # 記錄處理完成
+        if query_id and log_manager:
+            log_manager.log_query_process_complete(query_id, processing_time)
+        
+        return QueryResult(
+            query_type=query_type,
+            response_text=response_text,
+            processing_time_ms=processing_time,
+            confidence=confidence,
+            raw_query=query
+        )
+    
+    def _error_result(self, query: str, error: Exception) -> QueryResult:
+        """Return a fallback response in case of any error"""
+        return QueryResult(
+            query_type=QueryType.UNKNOWN,
+            response_text=f"Sorry, I encountered an error processing your query: {str(error)}",
+            processing_time_ms=0.0,
+            confidence=0.0,
+            raw_query=query
+        )
     
     def _get_step_details(self, state_data: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
         """
@@ -544,13 +693,15 @@ class QueryProcessor:
             print(f"Warning: Error checking recent observation status: {e}")
             return False  # Default to existing behavior on error
 
-    async def simple_enhanced_vlm_fallback(self, query: str, current_image: bytes = None):
+    async def simple_enhanced_vlm_fallback(self, query: str, current_image: bytes = None, current_frame=None):
         """
         Simplified Enhanced VLM Fallback - Direct query to VLM
         
         Args:
             query: User query
             current_image: Current image data (optional)
+            current_frame: StoredFrame of the querying session (optional); sent
+                as the image instead of looking up the default session's frame
             
         Returns:
             VLM response or None if failed
@@ -560,7 +711,7 @@ class QueryProcessor:
             if current_image:
                 # Use image-based fallback
                 result = await self.enhanced_vlm_fallback.process_query_with_image_fallback(
-                    query, {"image": current_image}
+                    query, {"image": current_image}, current_frame=current_frame
                 )
             else:
                 # Use text-only fallback
@@ -0,0 +1,313 @@
+"""
+Session-Scoped State Trackers
+
+Keeps one StateTracker per session or camera so concurrent streams do not
+overwrite each other's task state. All trackers share a single
+RAGKnowledgeBase (encoder, vector index and task watcher) and a single
+QueryProcessor; only the per-session sliding window and metrics are
+duplicated. Idle sessions are evicted by LRU order and idle TTL so memory
+stays bounded as the number of sessions grows.
+
+Evicted trackers are closed on a background thread: closing flushes the
+session's journal, which must not stall get() on the event loop thread.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+from .state_journal import StateJournal
+from .state_tracker import StateTracker, create_knowledge_base, load_tracker_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+def load_session_config(config_path: Optional[str] = None, section: str = "sessions") -> Dict[str, Any]:
+    """
+    Load a section of the state tracker configuration
+
+    Args:
+        config_path: Optional path (defaults to src/config/state_tracker_config.json)
+        section: Top-level section name ("sessions" or "persistence")
+
+    Returns:
+        Section settings, empty if the file or section is missing or invalid
+    """
+    return load_tracker_config(config_path).get(section, {})
+
+
+class StateTrackerRegistry:
+    """
+    LRU/TTL-bounded map of session ID -> StateTracker
+
+    The default session is created on first use like any other, but is never
+    evicted so single-stream clients keep their state.
+    """
+
+    def __init__(self,
+                 max_sessions: int = 32,
+                 idle_ttl_seconds: float = 1800.0,
+                 kb_factory: Callable[[], Any] = create_knowledge_base,
+                 query_processor_factory: Optional[Callable[[], Any]] = None,
+                 tracker_factory: Callable[..., StateTracker] = StateTracker,
+                 persistence: Optional[Dict[str, Any]] = None):
+        """
+        Initialize an empty registry (the shared knowledge base is created lazily)
+
+        Args:
+            max_sessions: Maximum number of live trackers, default included
+            idle_ttl_seconds: Trackers unused for longer are evicted (<= 0 disables)
+            kb_factory: Creates the shared, initialized knowledge base
+            query_processor_factory: Creates the shared QueryProcessor
+            tracker_factory: Creates a tracker from (rag_kb, query_processor, session_id, journal)
+            persistence: "persistence" config section; when enabled each
+                session gets a StateJournal and is restored from it
+        """
+        self.max_sessions = max(1, max_sessions)
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self._kb_factory = kb_factory
+        self._query_processor_factory = query_processor_factory
+        self._tracker_factory = tracker_factory
+        self.persistence = persistence or {}
+
+        self.rag_kb = None
+        self.query_processor = None
+
+        # session_id -> (tracker, last access time); most recently used last
+        self._sessions: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # session_id -> thread closing an evicted tracker of that session
+        self._closing: Dict[str, threading.Thread] = {}
+
+        self.created_count = 0
+        self.evicted_count = 0
+
+    def _ensure_shared(self):
+        """Create the shared knowledge base and query processor once"""
+        if self.rag_kb is None:
+            self.rag_kb = self._kb_factory()
+        if self.query_processor is None:
+            if self._query_processor_factory is None:
+                from .query_processor import QueryProcessor
+                self._query_processor_factory = QueryProcessor
+            self.query_processor = self._query_processor_factory()
+
+    def get(self, session_id: Optional[str] = None) -> StateTracker:
+        """
+        Get the tracker of a session, creating it if needed
+
+        Args:
+            session_id: Session or camera ID; None or empty selects the default session
+
+        Returns:
+            StateTracker bound to the session
+        """
+        session_id = str(session_id) if session_id else DEFAULT_SESSION_ID
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is not None:
+                entry[1] = now
+                self._sessions.move_to_end(session_id)
+                return entry[0]
+
+            self._ensure_shared()
+            self._evict_idle_locked(now)
+            self._wait_for_close_locked(session_id)
+            tracker = self._tracker_factory(
+                rag_kb=self.rag_kb,
+                query_processor=self.query_processor,
+                session_id=session_id,
+                journal=self._create_journal(session_id)
+            )
+            self._sessions[session_id] = [tracker, now]
+            self.created_count += 1
+            self._evict_lru_locked()
+
+        logger.info(f"Created state tracker for session {session_id} ({len(self)} active)")
+        return tracker
+
+    def _create_journal(self, session_id: str) -> Optional[StateJournal]:
+        """Open the journal of a session if persistence is enabled"""
+        if not self.persistence.get("enabled"):
+            return None
+        directory = Path(self.persistence.get("directory", "cache/state_journal"))
+        if not directory.is_absolute():
+            directory = PROJECT_ROOT / directory
+        try:
+            return StateJournal(
+                str(directory),
+                session_id=session_id,
+                snapshot_every=self.persistence.get("snapshot_every", 500),
+                flush_interval_ms=self.persistence.get("flush_interval_ms", 200.0)
+            )
+        except Exception as e:
+            logger.error(f"Failed to open state journal for session {session_id}: {str(e)}")
+            return None
+
+    @staticmethod
+    def _close(tracker) -> None:
+        close = getattr(tracker, "close", None)
+        if close is not None:
+            close()
+
+    def _retire_locked(self, session_id: str, tracker) -> None:
+        """Close an evicted tracker on a background thread (lock held)"""
+        self._closing = {sid: thread for sid, thread in self._closing.items() if thread.is_alive()}
+        closer = threading.Thread(target=self._close, args=(tracker,),
+                                  name=f"close-session-{session_id}", daemon=True)
+        self._closing[session_id] = closer
+        closer.start()
+
+    def _wait_for_close_locked(self, session_id: str) -> None:
+        """
+        Wait until an evicted tracker of the session has been closed
+
+        Only blocks when an evicted session comes back while its journal is
+        still flushing; the new tracker must restore from the complete files.
+        """
+        closer = self._closing.pop(session_id, None)
+        if closer is not None:
+            closer.join()
+
+    def peek(self, session_id: Optional[str] = None) -> Optional[StateTracker]:
+        """
+        Get the tracker of a session without creating it or refreshing its LRU position
+
+        Args:
+            session_id: Session or camera ID; None selects the default session
+
+        Returns:
+            StateTracker or None if the session has no tracker
+        """
+        session_id = str(session_id) if session_id else DEFAULT_SESSION_ID
+        with self._lock:
+            entry = self._sessions.get(session_id)
+        return entry[0] if entry is not None else None
+
+    def remove(self, session_id: str) -> bool:
+        """
+        Drop the tracker of a session
+
+        Args:
+            session_id: Session or camera ID
+
+        Returns:
+            True if a tracker was removed
+        """
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+        removed = entry is not None
+        if removed:
+            self._close(entry[0])
+            logger.info(f"Removed state tracker for session {session_id}")
+        return removed
+
+    def evict_idle(self) -> int:
+        """
+        Evict sessions idle for longer than the TTL
+
+        Returns:
+            Number of evicted sessions
+        """
+        with self._lock:
+            return self._evict_idle_locked(time.monotonic())
+
+    def _evict_idle_locked(self, now: float) -> int:
+        if self.idle_ttl_seconds <= 0:
+            return 0
+
+        expired = [
+            session_id for session_id, (_, last_access) in self._sessions.items()
+            if session_id != DEFAULT_SESSION_ID and now - last_access > self.idle_ttl_seconds
+        ]
+        for session_id in expired:
+            self._retire_locked(session_id, self._sessions.pop(session_id)[0])
+            logger.info(f"Evicted idle state tracker for session {session_id}")
+        self.evicted_count += len(expired)
+        return len(expired)
+
+    def _evict_lru_locked(self) -> None:
+        # Oldest first; the default session is skipped rather than evicted
+        for session_id in list(self._sessions):
+            if len(self._sessions) <= self.max_sessions:
+                break
+            if session_id == DEFAULT_SESSION_ID:
+                continue
+            self._retire_locked(session_id, self._sessions.pop(session_id)[0])
+            self.evicted_count += 1
+            logger.info(f"Evicted least recently used state tracker for session {session_id}")
+
+    def close(self) -> None:
+        """Close every tracker (flushing their journals), then shut down the shared knowledge base"""
+        with self._lock:
+            trackers = [tracker for tracker, _ in self._sessions.values()]
+            self._sessions.clear()
+            closers = list(self._closing.values())
+            self._closing.clear()
+            rag_kb, self.rag_kb = self.rag_kb, None
+        for tracker in trackers:
+            self._close(tracker)
+        for closer in closers:
+            closer.join()
+
+        shutdown = getattr(rag_kb, "shutdown", None)
+        if shutdown is not None:
+            shutdown()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics
+
+        Returns:
+            Dictionary with session counts, limits and per-session idle times
+        """
+        now = time.monotonic()
+        with self._lock:
+            sessions = {
+                session_id: round(now - last_access, 1)
+                for session_id, (_, last_access) in self._sessions.items()
+            }
+        return {
+            'active_sessions': len(sessions),
+            'max_sessions': self.max_sessions,
+            'idle_ttl_seconds': self.idle_ttl_seconds,
+            'created_sessions': self.created_count,
+            'evicted_sessions': self.evicted_count,
+            'idle_seconds': sessions
+        }
+
+
+# Global registry instance
+_registry_instance: Optional[StateTrackerRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry() -> StateTrackerRegistry:
+    """Get or create the global state tracker registry"""
+    global _registry_instance
+    if _registry_instance is None:
+        with _registry_lock:
+            if _registry_instance is None:
+                config = load_session_config()
+                _registry_instance = StateTrackerRegistry(
+                    max_sessions=config.get("max_sessions", 32),
+                    idle_ttl_seconds=config.get("idle_ttl_seconds", 1800.0),
+                    persistence=load_session_config(section="persistence")
+                )
+    return _registry_instance
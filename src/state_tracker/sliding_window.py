@@ -0,0 +1,136 @@
+"""
+Ring-Buffer Sliding Window
+
+Fixed-capacity circular buffer for the State Tracker's recent records.
+Appending overwrites the oldest slot instead of slicing a list, and the
+memory footprint of the window is kept as a running total, so both insert
+and eviction are O(1) regardless of the window size. Task, step and
+confidence-level distributions are maintained the same way.
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class SlidingWindow:
+    """
+    Circular buffer of records ordered oldest to newest
+
+    Records must provide get_memory_size(), task_id, step_index and
+    confidence; memory_bytes and the distribution counters are maintained
+    incrementally as records enter and leave the window.
+    """
+
+    __slots__ = ("capacity", "memory_bytes", "high_threshold", "medium_threshold",
+                 "task_counts", "step_counts", "confidence_levels",
+                 "_slots", "_head", "_size")
+
+    def __init__(self, capacity: int, high_threshold: float = 0.70, medium_threshold: float = 0.40):
+        """
+        Initialize an empty window
+
+        Args:
+            capacity: Maximum number of records kept
+            high_threshold: Minimum confidence counted as "high"
+            medium_threshold: Minimum confidence counted as "medium"
+        """
+        self.capacity = max(1, capacity)
+        self.high_threshold = high_threshold
+        self.medium_threshold = medium_threshold
+        self.clear()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        slots, capacity, head = self._slots, self.capacity, self._head
+        for offset in range(self._size):
+            yield slots[(head + offset) % capacity]
+
+    def __getitem__(self, index: int) -> Any:
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("sliding window index out of range")
+        return self._slots[(self._head + index) % self.capacity]
+
+    def append(self, record: Any) -> Optional[Any]:
+        """
+        Add a record, overwriting the oldest one when the window is full
+
+        Args:
+            record: Record to add
+
+        Returns:
+            The evicted record, or None if the window had room
+        """
+        evicted = None
+        if self._size == self.capacity:
+            evicted = self._slots[self._head]
+            self._account(evicted, -1)
+            self._slots[self._head] = record
+            self._head = (self._head + 1) % self.capacity
+        else:
+            self._slots[(self._head + self._size) % self.capacity] = record
+            self._size += 1
+        self._account(record, 1)
+        return evicted
+
+    def popleft(self, count: int = 1) -> int:
+        """
+        Remove the oldest records
+
+        Args:
+            count: Number of records to remove
+
+        Returns:
+            Number of records actually removed
+        """
+        count = min(count, self._size)
+        for _ in range(count):
+            self._account(self._slots[self._head], -1)
+            self._slots[self._head] = None
+            self._head = (self._head + 1) % self.capacity
+            self._size -= 1
+        return count
+
+    def recent(self, count: int) -> List[Any]:
+        """
+        Get the newest records without copying the whole window
+
+        Args:
+            count: Maximum number of records
+
+        Returns:
+            Up to count newest records, oldest first
+        """
+        count = min(count, self._size)
+        return [self[index] for index in range(self._size - count, self._size)]
+
+    def _confidence_level(self, confidence: float) -> str:
+        if confidence >= self.high_threshold:
+            return 'high'
+        if confidence >= self.medium_threshold:
+            return 'medium'
+        return 'low'
+
+    def _account(self, record: Any, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a record from the running aggregates"""
+        self.memory_bytes += sign * record.get_memory_size()
+        for counts, key in ((self.task_counts, record.task_id),
+                            (self.step_counts, f"{record.task_id}:{record.step_index}"),
+                            (self.confidence_levels, self._confidence_level(record.confidence))):
+            value = counts.get(key, 0) + sign
+            if value or counts is self.confidence_levels:
+                counts[key] = value
+            else:
+                del counts[key]
+
+    def clear(self) -> None:
+        """Remove every record"""
+        self._slots: List[Any] = [None] * self.capacity
+        self._head = 0  # Slot of the oldest record
+        self._size = 0
+        self.memory_bytes = 0
+        self.task_counts: Dict[str, int] = {}
+        self.step_counts: Dict[str, int] = {}
+        self.confidence_levels: Dict[str, int] = {'high': 0, 'medium': 0, 'low': 0}
@@ -0,0 +1,258 @@
+"""
+State Tracker Journal
+
+Event-sourced persistence for a StateTracker session. State transitions are
+appended to a binary event log and a compact snapshot of the full tracker
+state is written periodically, after which the log is truncated. On startup
+the tracker restores the snapshot and replays the events written after it.
+
+Callers only enqueue events; a background writer thread batches them to
+disk, so recording never blocks process_vlm_response on file I/O.
+
+Log record format: <uint32 payload length><uint32 crc32><payload>, where the
+payload is compact UTF-8 JSON [type, data]. A torn or corrupt tail record
+(e.g. after a crash mid-write) ends replay at the last intact record.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import re
+import struct
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_FORMAT_VERSION = 1
+
+_RECORD_HEADER = struct.Struct("<II")
+
+# Queue item telling the writer to write a snapshot and truncate the log
+_SNAPSHOT = "__snapshot__"
+
+
+def _encode_record(event_type: str, data: Dict[str, Any]) -> bytes:
+    payload = json.dumps([event_type, data], separators=(",", ":"), default=str).encode("utf-8")
+    return _RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def read_events(log_path: Path) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Read the intact records of an event log
+
+    Args:
+        log_path: Event log file
+
+    Returns:
+        List of (event_type, data) in write order; empty if the log is missing
+    """
+    try:
+        blob = log_path.read_bytes()
+    except FileNotFoundError:
+        return []
+
+    events = []
+    offset = 0
+    while offset + _RECORD_HEADER.size <= len(blob):
+        length, checksum = _RECORD_HEADER.unpack_from(blob, offset)
+        start = offset + _RECORD_HEADER.size
+        payload = blob[start:start + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            logger.warning(f"Event log {log_path} has a corrupt record at byte {offset}, ignoring the rest")
+            break
+        event_type, data = json.loads(payload.decode("utf-8"))
+        events.append((event_type, data))
+        offset = start + length
+    return events
+
+
+class StateJournal:
+    """
+    Append-only event log plus periodic snapshots for one session
+
+    Each StateTracker owns its own journal; the log and snapshot files are
+    only touched by the journal's writer thread.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 session_id: str = "default",
+                 snapshot_every: int = 500,
+                 flush_interval_ms: float = 200.0):
+        """
+        Open (or create) the journal of a session and start its writer
+
+        Args:
+            directory: Directory holding the journals of all sessions
+            session_id: Session the journal belongs to
+            snapshot_every: Events between snapshots
+            flush_interval_ms: Maximum delay before queued events reach the file
+        """
+        # Readable prefix plus a hash of the raw ID, so IDs that sanitize to
+        # the same prefix (e.g. "cam/1" and "cam_1") get separate files
+        digest = hashlib.sha1(session_id.encode("utf-8")).hexdigest()[:8]
+        safe_id = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', session_id) or 'default'}-{digest}"
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.directory / f"{safe_id}.events"
+        self.snapshot_path = self.directory / f"{safe_id}.snapshot.json"
+
+        self.snapshot_every = max(1, snapshot_every)
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.events_since_snapshot = len(read_events(self.log_path))
+
+        self.written_events = 0
+        self.written_snapshots = 0
+        self.write_errors = 0
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._run, name=f"state-journal-{safe_id}", daemon=True)
+        self._writer.start()
+
+    def load(self) -> Tuple[Optional[Dict[str, Any]], List[Tuple[str, Dict[str, Any]]]]:
+        """
+        Read the latest snapshot and the events recorded after it
+
+        Returns:
+            (snapshot state or None, list of (event_type, data))
+        """
+        snapshot = None
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("format_version") == JOURNAL_FORMAT_VERSION:
+                snapshot = stored.get("state")
+            else:
+                logger.warning(f"Ignoring snapshot {self.snapshot_path} with format {stored.get('format_version')}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to read snapshot {self.snapshot_path}: {str(e)}")
+
+        return snapshot, read_events(self.log_path)
+
+    def record(self, event_type: str, data: Dict[str, Any]) -> None:
+        """
+        Queue an event for the background writer
+
+        Args:
+            event_type: Event name (e.g. "update", "clear", "metrics")
+            data: JSON-serializable event payload
+        """
+        if self._closed:
+            return
+        self.events_since_snapshot += 1
+        self._queue.put((event_type, data))
+
+    @property
+    def snapshot_due(self) -> bool:
+        """True once snapshot_every events were recorded since the last snapshot"""
+        return self.events_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state: Dict[str, Any]) -> None:
+        """
+        Queue a snapshot of the full tracker state
+
+        Events recorded before this call are covered by the snapshot and are
+        dropped from the log once it is written.
+
+        Args:
+            state: JSON-serializable tracker state
+        """
+        if self._closed:
+            return
+        self.events_since_snapshot = 0
+        self._queue.put((_SNAPSHOT, state))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every queued event and snapshot has been written"""
+        if self._closed:
+            return
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Write pending events and stop the writer thread"""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(None)
+        self._writer.join(timeout=5.0)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Journal counters and pending queue size"""
+        return {
+            'log_path': str(self.log_path),
+            'written_events': self.written_events,
+            'written_snapshots': self.written_snapshots,
+            'write_errors': self.write_errors,
+            'events_since_snapshot': self.events_since_snapshot,
+            'pending': self._queue.qsize()
+        }
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            batch = [item]
+            # Batch whatever else arrived within the flush interval
+            try:
+                while True:
+                    batch.append(self._queue.get(timeout=self.flush_interval if len(batch) == 1 else 0))
+            except queue.Empty:
+                pass
+
+            buffer = bytearray()
+            for item in batch:
+                if item is None:
+                    stopping = True
+                    continue
+                event_type, data = item
+                if event_type is None:
+                    self._append(buffer)
+                    buffer = bytearray()
+                    data.set()
+                elif event_type == _SNAPSHOT:
+                    # Pending events are covered by the snapshot
+                    if self._write_snapshot(data):
+                        buffer = bytearray()
+                else:
+                    buffer += _encode_record(event_type, data)
+                    self.written_events += 1
+            self._append(buffer)
+
+    def _append(self, buffer: bytes) -> None:
+        if not buffer:
+            return
+        try:
+            with open(self.log_path, "ab") as f:
+                f.write(buffer)
+                f.flush()
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Failed to append to event log {self.log_path}: {str(e)}")
+
+    def _write_snapshot(self, state: Dict[str, Any]) -> bool:
+        tmp_path = self.snapshot_path.with_suffix(".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"format_version": JOURNAL_FORMAT_VERSION, "state": state}, f,
+                          separators=(",", ":"), default=str)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.snapshot_path)
+            # The snapshot now covers every logged event
+            open(self.log_path, "wb").close()
+            self.written_snapshots += 1
+            return True
+        except Exception as e:
+            self.write_errors += 1
+            logger.error(f"Failed to write snapshot {self.snapshot_path}: {str(e)}")
+            return False
@@ -11,10 +11,14 @@ E: Store structured results
 F: Update current state
 """
 
+import json
 import logging
 import re
+import threading
 import time
-from typing import Optional, Dict, Any, List
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, List, Deque, NamedTuple
 from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
@@ -24,17 +28,19 @@ import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 from memory.rag.knowledge_base import RAGKnowledgeBase
+from memory.rag.encoders import load_rag_config
+from .sliding_window import SlidingWindow
+from .metrics_aggregator import MetricsWindow
+from .step_decoder import StepDecoder
+from .frame_store import FrameStore, StoredFrame
 
 # Import logging system
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'logging'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'app_logging'))
 try:
     from log_manager import get_log_manager
 except ImportError:
     # Fallback for different import contexts
-    import sys
-    import os
-    sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'logging'))
-    from log_manager import get_log_manager
+    from app_logging.log_manager import get_log_manager
 
 logger = logging.getLogger(__name__)
 
@@ -60,9 +66,20 @@ class StateRecord:
     task_id: Optional[str]
     step_index: Optional[int]
 
+class ReplayDecision(NamedTuple):
+    """Decision for one observation of an offline replay (see StateTracker.replay)"""
+    action: str  # ActionType value
+    task_id: Optional[str]
+    step_index: Optional[int]
+    confidence: float
+    state_updated: bool
+    search_scope: Optional[str]
+
 @dataclass
 class OptimizedStateRecord:
     """Memory-optimized state record for sliding window"""
+    __slots__ = ("timestamp", "confidence", "task_id", "step_index")
+    
     timestamp: datetime
     confidence: float
     task_id: str
@@ -94,6 +111,90 @@ class ProcessingMetrics:
     matched_task: Optional[str]
     matched_step: Optional[int]
     consecutive_low_count: int
+    search_scope: Optional[str] = None  # RAG search scope: "local", "widened", "global", "decoded" or "skipped"
+
+TRACKER_CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config', 'state_tracker_config.json')
+
+# Loggers quieted during a replay: the tracker and RAG module loggers and
+# the LogManager channels
+REPLAY_QUIET_LOGGER_PREFIXES = ("state_tracker.", "memory.rag.", "ai_assistant_")
+
+
+class _ThreadLogFilter(logging.Filter):
+    """Drops records below ERROR emitted by one thread"""
+    
+    def __init__(self, thread_id: int):
+        super().__init__()
+        self.thread_id = thread_id
+    
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.ERROR or record.thread != self.thread_id
+
+
+@contextmanager
+def _logging_suspended():
+    """Quiet the tracker and RAG loggers on the calling thread for the duration of a replay"""
+    log_filter = _ThreadLogFilter(threading.get_ident())
+    quieted = [
+        existing for name, existing in list(logging.root.manager.loggerDict.items())
+        if isinstance(existing, logging.Logger) and name.startswith(REPLAY_QUIET_LOGGER_PREFIXES)
+    ]
+    for quiet_logger in quieted:
+        quiet_logger.addFilter(log_filter)
+    try:
+        yield
+    finally:
+        for quiet_logger in quieted:
+            quiet_logger.removeFilter(log_filter)
+
+
+def load_tracker_config(config_path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load the state tracker configuration file
+    
+    Args:
+        config_path: Optional path (defaults to src/config/state_tracker_config.json)
+        
+    Returns:
+        Configuration dictionary, empty if the file is missing or invalid
+    """
+    path = config_path or TRACKER_CONFIG_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Failed to load state tracker config {path}: {str(e)}")
+        return {}
+
+def create_knowledge_base(task_hot_reload: Optional[bool] = None) -> RAGKnowledgeBase:
+    """
+    Create and initialize the knowledge base used by state trackers
+    
+    Args:
+        task_hot_reload: Watch the task directory and hot-reload edited files
+            (defaults to the "task_hot_reload" section of rag_config.json)
+        
+    Returns:
+        Initialized RAGKnowledgeBase
+    """
+    rag_config = load_rag_config()
+    
+    # Share one encoder/index across backend workers when an embedding service is configured
+    service_config = rag_config.get("embedding_service", {})
+    rag_kb = RAGKnowledgeBase(
+        embedding_service_url=service_config.get("url") if service_config.get("enabled") else None
+    )
+    rag_kb.initialize(precompute_embeddings=True, snapshot_path=rag_kb.snapshot_path)
+    
+    # Hot-reload edited task files without restarting the backend
+    hot_reload_config = rag_config.get("task_hot_reload", {})
+    if task_hot_reload is None:
+        task_hot_reload = hot_reload_config.get("enabled", True)
+    if task_hot_reload:
+        rag_kb.start_task_watcher(poll_interval=hot_reload_config.get("poll_interval", 2.0))
+    return rag_kb
 
 class StateTracker:
     """
@@ -102,23 +203,50 @@ class StateTracker:
     Implements multi-tier confidence thresholds and conservative update strategies.
     """
     
-    def __init__(self):
-        """Initialize State Tracker with sliding window memory management"""
-        self.rag_kb = RAGKnowledgeBase()
-        self.rag_kb.initialize(precompute_embeddings=True)
+    def __init__(self,
+                 rag_kb: Optional[RAGKnowledgeBase] = None,
+                 query_processor=None,
+                 session_id: str = "default",
+                 journal=None):
+        """
+        Initialize State Tracker with sliding window memory management
+        
+        Args:
+            rag_kb: Optional shared, initialized knowledge base; one is
+                created (see create_knowledge_base) when omitted
+            query_processor: Optional shared QueryProcessor
+            session_id: Session/camera this tracker follows
+            journal: Optional StateJournal; state is restored from it and
+                every transition is recorded to it
+        """
+        self.session_id = session_id
+        self.rag_kb = rag_kb or create_knowledge_base()
+        
         self.current_state: Optional[StateRecord] = None
         
+        # Bumped on every current_state change; the state dict and the
+        # instant-query responses are cached per version (see _set_current_state)
+        self.state_version = 0
+        self._state_view_version = -1
+        self._state_view: Optional[Dict[str, Any]] = None
+        self._responses_version = -1
+        self._responses: Optional[Dict[Any, str]] = None
+        
         # Multi-tier confidence thresholds
         self.high_confidence_threshold = 0.70
         self.medium_confidence_threshold = 0.40
         
         # Legacy state tracking (for compatibility)
-        self.state_history: List[StateRecord] = []
         self.max_history_size = 10
+        self.state_history: Deque[StateRecord] = deque(maxlen=self.max_history_size)
         
-        # Optimized sliding window
-        self.sliding_window: List[OptimizedStateRecord] = []
+        # Optimized sliding window (ring buffer with running memory accounting)
         self.max_window_size = 30
+        self.sliding_window = SlidingWindow(
+            self.max_window_size,
+            high_threshold=self.high_confidence_threshold,
+            medium_threshold=self.medium_confidence_threshold
+        )
         self.memory_limit_bytes = 1024 * 1024  # 1MB limit
         
         # Memory management stats
@@ -130,17 +258,42 @@ class StateTracker:
         self.consecutive_low_count = 0
         self.max_consecutive_low = 10
         
-        # Metrics tracking
-        self.processing_metrics: List[ProcessingMetrics] = []
+        # Locality-first RAG search: score neighbouring steps of the current
+        # task first, widen to the full index below this similarity
+        self.locality_search_enabled = True
+        self.locality_threshold = 0.60
+        
+        # Whether searches count towards the knowledge base's search_stats
+        # (off for replays so offline sweeps do not skew the live statistics)
+        self.record_search_stats = True
+        
+        # Opt-in temporal decoding: HMM filter over the current task's steps
+        # (see StepDecoder); may skip RAG search while the posterior is sharp
+        decoder_config = dict(load_tracker_config().get("step_decoder", {}))
+        self.step_decoder_enabled = decoder_config.pop("enabled", False)
+        self.step_decoder: Optional[StepDecoder] = StepDecoder(**decoder_config) if self.step_decoder_enabled else None
+        
+        # Recent processed frames for the image-aware VLM fallback
+        self.frame_store = FrameStore(**load_tracker_config().get("frame_store", {}))
+        
+        # Metrics tracking (summaries are maintained incrementally on append)
         self.max_metrics_size = 100
+        self.processing_metrics = MetricsWindow(self.max_metrics_size)
         
         # Query processor for instant response
-        from .query_processor import QueryProcessor
-        self.query_processor = QueryProcessor()
+        if query_processor is None:
+            from .query_processor import QueryProcessor
+            query_processor = QueryProcessor()
+        self.query_processor = query_processor
         
         # Initialize logging system
         self.log_manager = get_log_manager()
         
+        # Event-sourced persistence: recover the session after a restart
+        self.journal = journal
+        if self.journal is not None:
+            self._restore_from_journal()
+        
         logger.info("Enhanced State Tracker initialized with sliding window memory management and instant response")
     
     def clean_vlm_text(self, vlm_text: str) -> str:
@@ -215,25 +368,28 @@ class StateTracker:
                 logger.info(f"Cleared state details: {cleared_state_info}")
             
             # 清空當前狀態 - 這是關鍵！
-            self.current_state = None
+            self._set_current_state(None)
             
             # 重置計數器
             self.consecutive_low_count = 0
+            self._journal_event("clear", {})
             
             logger.info("State cleared due to consecutive low confidence observations - VLM Fallback will be triggered on next query")
     
     def _add_to_sliding_window(self, state_record: StateRecord):
         """Add optimized record to sliding window with memory management"""
-        # Create optimized record (no VLM text, minimal data)
+        # Create optimized record (no VLM text, minimal data); task IDs repeat,
+        # so interning keeps one string per task across all records
         optimized_record = OptimizedStateRecord(
             timestamp=state_record.timestamp,
             confidence=state_record.confidence,
-            task_id=state_record.task_id,
+            task_id=sys.intern(state_record.task_id),
             step_index=state_record.step_index
         )
         
-        # Add to sliding window
-        self.sliding_window.append(optimized_record)
+        # Add to sliding window; a full ring buffer overwrites its oldest record
+        if self.sliding_window.append(optimized_record) is not None:
+            self.cleanup_count += 1
         
         # Check if cleanup is needed
         self._cleanup_sliding_window()
@@ -245,25 +401,19 @@ class StateTracker:
     
     def _cleanup_sliding_window(self):
         """Automatic cleanup of oldest records"""
-        # Size-based cleanup
-        if len(self.sliding_window) > self.max_window_size:
-            removed_count = len(self.sliding_window) - self.max_window_size
-            self.sliding_window = self.sliding_window[-self.max_window_size:]
-            self.cleanup_count += removed_count
-            logger.info(f"Cleaned up {removed_count} old records from sliding window")
+        # Size-based cleanup is done by the ring buffer on append
         
         # Memory-based cleanup (if needed)
         current_memory = self._calculate_memory_usage()
         if current_memory > self.memory_limit_bytes:
             # Remove 20% of oldest records
-            remove_count = max(1, len(self.sliding_window) // 5)
-            self.sliding_window = self.sliding_window[remove_count:]
+            remove_count = self.sliding_window.popleft(max(1, len(self.sliding_window) // 5))
             self.cleanup_count += remove_count
             logger.warning(f"Memory limit exceeded, cleaned up {remove_count} records")
     
     def _calculate_memory_usage(self) -> int:
         """Calculate current memory usage of sliding window"""
-        return sum(record.get_memory_size() for record in self.sliding_window)
+        return self.sliding_window.memory_bytes
     
     def _check_state_consistency(self, new_task_id: str, new_step_index: int) -> bool:
         """Check state consistency based on sliding window history"""
@@ -271,7 +421,7 @@ class StateTracker:
             return True  # No history to check against
         
         # Get recent records from same task
-        recent_records = [r for r in self.sliding_window[-5:] if r.task_id == new_task_id]
+        recent_records = [r for r in self.sliding_window.recent(5) if r.task_id == new_task_id]
         
         if not recent_records:
             return True  # Different task, no consistency check needed
@@ -288,14 +438,64 @@ class StateTracker:
         
         return True
     
+    def _get_locality_hint(self):
+        """Get (task_id, step_index) to seed locality-first RAG search, or (None, None)"""
+        if not self.locality_search_enabled or not self.current_state:
+            return None, None
+        return self.current_state.task_id, self.current_state.step_index
+    
+    def _get_step_decoder(self) -> StepDecoder:
+        """Get the step decoder, re-seeding it when the current task changed"""
+        decoder = self.step_decoder
+        if decoder.task_name != self.current_state.task_id or not decoder.active:
+            decoder.reset(
+                self.current_state.task_id,
+                self.rag_kb.get_step_ids(self.current_state.task_id),
+                start_step=self.current_state.step_index
+            )
+        return decoder
+    
+    def _decode_step(self, cleaned_text: str, observation_id: Optional[str],
+                     query_embedding: Optional[List[float]] = None):
+        """
+        Score all steps of the current task and decode the most probable one
+        
+        Returns:
+            MatchResult of the decoded step, or None when the observation does
+            not fit the current task well enough (full RAG search is used then)
+        """
+        step_matches = self.rag_kb.score_task_steps(cleaned_text, self.current_state.task_id, observation_id,
+                                                    query_embedding=query_embedding,
+                                                    record_stats=self.record_search_stats)
+        if not step_matches or step_matches[0].similarity < self.locality_threshold:
+            return None
+        
+        step_id, probability = self.step_decoder.update({m.step_id: m.similarity for m in step_matches})
+        logger.info(f"Step decoder: MAP step {step_id} (posterior={probability:.3f}, "
+                    f"best single-frame step {step_matches[0].step_id})")
+        return next((m for m in step_matches if m.step_id == step_id), step_matches[0])
+    
+    def _record_skipped_frame(self, vlm_text: str, start_time: float, observation_id: Optional[str]) -> bool:
+        """Record a frame decoded without RAG search; the state is kept"""
+        _, probability = self.step_decoder.map_estimate()
+        processing_time = (time.time() - start_time) * 1000
+        self._record_metrics(vlm_text, probability, processing_time, self._determine_confidence_level(probability),
+                             ActionType.OBSERVE, self.current_state.task_id, self.current_state.step_index,
+                             search_scope="skipped")
+        logger.info(f"Step decoder: posterior concentrated on step {self.current_state.step_index} "
+                    f"({probability:.3f}), RAG search skipped [observation_id={observation_id}]")
+        return False
+    
     def _record_vlm_failure(self, reason: str):
         """Record VLM failure without occupying window space"""
         self.failure_count += 1
+        self._journal_event("failure", {})
         logger.info(f"VLM failure recorded: {reason} (total failures: {self.failure_count})")
     
     def _record_metrics(self, vlm_text: str, confidence: float, processing_time: float, 
                        confidence_level: ConfidenceLevel, action: ActionType,
-                       matched_task: Optional[str], matched_step: Optional[int]):
+                       matched_task: Optional[str], matched_step: Optional[int],
+                       search_scope: Optional[str] = None):
         """Record quantifiable metrics"""
         metrics = ProcessingMetrics(
             timestamp=datetime.now(),
@@ -306,12 +506,141 @@ class StateTracker:
             action_taken=action,
             matched_task=matched_task,
             matched_step=matched_step,
-            consecutive_low_count=self.consecutive_low_count
+            consecutive_low_count=self.consecutive_low_count,
+            search_scope=search_scope
         )
         
         self.processing_metrics.append(metrics)
-        if len(self.processing_metrics) > self.max_metrics_size:
-            self.processing_metrics.pop(0)
+        if self.journal is not None:
+            self._journal_event("metrics", self._metrics_to_dict(metrics))
+    
+    def _journal_event(self, event_type: str, data: Dict[str, Any]):
+        """Queue a state transition for the journal (no-op without one)"""
+        if self.journal is None:
+            return
+        self.journal.record(event_type, data)
+        if self.journal.snapshot_due:
+            self.journal.snapshot(self._export_state())
+    
+    @staticmethod
+    def _state_record_to_dict(record: StateRecord) -> Dict[str, Any]:
+        return {
+            'timestamp': record.timestamp.isoformat(),
+            'vlm_text': record.vlm_text,
+            'matched_step': record.matched_step,
+            'confidence': record.confidence,
+            'task_id': record.task_id,
+            'step_index': record.step_index
+        }
+    
+    @staticmethod
+    def _state_record_from_dict(data: Dict[str, Any]) -> StateRecord:
+        return StateRecord(
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            vlm_text=data['vlm_text'],
+            matched_step=data['matched_step'],
+            confidence=data['confidence'],
+            task_id=data['task_id'],
+            step_index=data['step_index']
+        )
+    
+    @staticmethod
+    def _metrics_to_dict(metrics: ProcessingMetrics) -> Dict[str, Any]:
+        return {
+            'timestamp': metrics.timestamp.isoformat(),
+            'vlm_input': metrics.vlm_input,
+            'confidence_score': metrics.confidence_score,
+            'processing_time_ms': metrics.processing_time_ms,
+            'confidence_level': metrics.confidence_level.value,
+            'action_taken': metrics.action_taken.value,
+            'matched_task': metrics.matched_task,
+            'matched_step': metrics.matched_step,
+            'consecutive_low_count': metrics.consecutive_low_count,
+            'search_scope': metrics.search_scope
+        }
+    
+    @staticmethod
+    def _metrics_from_dict(data: Dict[str, Any]) -> ProcessingMetrics:
+        return ProcessingMetrics(
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            vlm_input=data['vlm_input'],
+            confidence_score=data['confidence_score'],
+            processing_time_ms=data['processing_time_ms'],
+            confidence_level=ConfidenceLevel(data['confidence_level']),
+            action_taken=ActionType(data['action_taken']),
+            matched_task=data['matched_task'],
+            matched_step=data['matched_step'],
+            consecutive_low_count=data['consecutive_low_count'],
+            search_scope=data.get('search_scope')
+        )
+    
+    def _export_state(self) -> Dict[str, Any]:
+        """Full tracker state as plain data for a journal snapshot"""
+        return {
+            'current_state': self._state_record_to_dict(self.current_state) if self.current_state else None,
+            'state_history': [self._state_record_to_dict(r) for r in self.state_history],
+            'sliding_window': [
+                [r.timestamp.isoformat(), r.confidence, r.task_id, r.step_index]
+                for r in self.sliding_window
+            ],
+            'processing_metrics': [self._metrics_to_dict(m) for m in self.processing_metrics],
+            'counters': {
+                'consecutive_low_count': self.consecutive_low_count,
+                'failure_count': self.failure_count,
+                'cleanup_count': self.cleanup_count,
+                'max_size_reached': self.max_size_reached
+            }
+        }
+    
+    def _restore_from_journal(self):
+        """Rebuild tracker state from the journal's snapshot and event log"""
+        try:
+            snapshot, events = self.journal.load()
+            if snapshot:
+                if snapshot.get('current_state'):
+                    self._set_current_state(self._state_record_from_dict(snapshot['current_state']))
+                for data in snapshot.get('state_history', []):
+                    self.state_history.append(self._state_record_from_dict(data))
+                for timestamp, confidence, task_id, step_index in snapshot.get('sliding_window', []):
+                    self.sliding_window.append(OptimizedStateRecord(
+                        timestamp=datetime.fromisoformat(timestamp),
+                        confidence=confidence,
+                        task_id=sys.intern(task_id),
+                        step_index=step_index
+                    ))
+                for data in snapshot.get('processing_metrics', []):
+                    self.processing_metrics.append(self._metrics_from_dict(data))
+                for name, value in snapshot.get('counters', {}).items():
+                    setattr(self, name, value)
+            
+            for event_type, data in events:
+                if event_type == "update":
+                    record = self._state_record_from_dict(data)
+                    self._set_current_state(record)
+                    self.state_history.append(record)
+                    self._add_to_sliding_window(record)
+                    self.consecutive_low_count = 0
+                elif event_type == "clear":
+                    self._set_current_state(None)
+                    self.consecutive_low_count = 0
+                elif event_type == "failure":
+                    self.failure_count += 1
+                elif event_type == "metrics":
+                    metrics = self._metrics_from_dict(data)
+                    self.processing_metrics.append(metrics)
+                    self.consecutive_low_count = metrics.consecutive_low_count
+            
+            if snapshot or events:
+                logger.info(f"Restored session {self.session_id} from journal "
+                            f"(snapshot: {bool(snapshot)}, events: {len(events)}, "
+                            f"current step: {self.current_state.step_index if self.current_state else None})")
+        except Exception as e:
+            logger.error(f"Failed to restore session {self.session_id} from journal: {str(e)}")
+    
+    def close(self):
+        """Flush and close the journal of this tracker"""
+        if self.journal is not None:
+            self.journal.close()
     
     def _get_previous_state_summary(self) -> Dict[str, Any]:
         """Get summary of previous state for comparison logging"""
@@ -334,19 +663,26 @@ class StateTracker:
             "timestamp": state_record.timestamp.isoformat()
         }
     
-    async def process_vlm_response(self, vlm_text: str, observation_id: str = None) -> bool:
+    async def process_vlm_response(self, vlm_text: str, observation_id: str = None,
+                                   image_data: Optional[bytes] = None, image_processed: bool = True) -> bool:
         """
         Enhanced VLM response processing with intelligent matching and fault tolerance.
         
         Args:
             vlm_text: Raw VLM text output from /v1/chat/completions
             observation_id: Optional observation ID for logging
+            image_data: Optional encoded frame the VLM text describes; kept in
+                the frame store for the image-aware VLM fallback
+            image_processed: Whether image_data is already preprocessed for the model
             
         Returns:
             True if state was updated, False otherwise
         """
         start_time = time.time()
         
+        if image_data:
+            self.frame_store.add(image_data, observation_id, processed=image_processed)
+        
         try:
             # Step 1: Clean VLM text
             cleaned_text = self.clean_vlm_text(vlm_text)
@@ -368,8 +704,26 @@ class StateTracker:
                 
                 return False
             
-            # Step 2: Match with RAG knowledge base (with observation_id for logging)
-            match_result = self.rag_kb.find_matching_step(cleaned_text, observation_id=observation_id)
+            # Step 2a: Temporal decoding within the current task (opt-in)
+            match_result = None
+            if self.step_decoder is not None and self.current_state:
+                decoder = self._get_step_decoder()
+                if decoder.try_skip():
+                    return self._record_skipped_frame(vlm_text, start_time, observation_id)
+                match_result = self._decode_step(cleaned_text, observation_id)
+            
+            # Step 2b: Match with RAG knowledge base (with observation_id for logging),
+            # searching neighbouring steps of the current task first
+            if match_result is None:
+                current_task, current_step = self._get_locality_hint()
+                match_result = self.rag_kb.find_matching_step(
+                    cleaned_text,
+                    observation_id=observation_id,
+                    current_task=current_task,
+                    current_step=current_step,
+                    locality_threshold=self.locality_threshold,
+                    record_stats=self.record_search_stats
+                )
             
             if not match_result:
                 self._record_vlm_failure("No RAG match found")
@@ -395,109 +749,51 @@ class StateTracker:
             logger.info(f"RAG matched step title: '{match_result.step_title}'")
             logger.info(f"RAG matched step description: '{match_result.step_description[:200]}...'")
             
-            # Step 3: Determine confidence level and action
+            # Capture previous state for comparison logging
+            previous_state = self._get_previous_state_summary()
+            
+            # Steps 3-4: Determine confidence level and take action
             confidence = match_result.similarity
-            confidence_level = self._determine_confidence_level(confidence)
-            should_update = self._should_update_state(confidence, confidence_level)
+            action_taken, confidence_level, state_record, reason = self._apply_match(match_result, cleaned_text)
+            state_updated = state_record is not None
             
             # Log confidence analysis
+            should_update = reason in ("updated", "consistency_check_failed")
             logger.info(f"Confidence analysis: score={confidence:.3f}, level={confidence_level.value}, should_update={should_update}")
             
-            # Step 4: Take action based on confidence level
-            action_taken = ActionType.IGNORE
-            state_updated = False
-            decision_reason = ""
-            state_update_id = None
-            
-            # Capture previous state for comparison logging
-            previous_state = self._get_previous_state_summary()
+            # Generate state update ID for logging
+            state_update_id = self.log_manager.generate_state_update_id()
             
-            if should_update:
-                # Generate state update ID for logging
-                state_update_id = self.log_manager.generate_state_update_id()
+            if reason == "updated":
+                decision_reason = f"High confidence match ({confidence:.3f}) - state updated to step {match_result.step_id}"
                 
-                # Check state consistency before update
-                consistency_ok = self._check_state_consistency(match_result.task_name, match_result.step_id)
+                # Log state update with before/after comparison
+                new_state = self._get_new_state_summary(state_record)
+                self.log_manager.log_state_tracker(
+                    observation_id=observation_id or "unknown",
+                    state_update_id=state_update_id,
+                    confidence=confidence,
+                    action=action_taken.value,
+                    state=new_state
+                )
                 
-                if consistency_ok:
-                    # Create and update state record
-                    # Include properties in matched_step dictionary
-                    matched_step_dict = {
-                        'step_id': match_result.step_id,
-                        'task_description': match_result.task_description,
-                        'tools_needed': match_result.tools_needed,
-                        'completion_indicators': match_result.completion_indicators,
-                        'visual_cues': match_result.visual_cues,
-                        'estimated_duration': match_result.estimated_duration,
-                        'safety_notes': match_result.safety_notes,
-                        'similarity': match_result.similarity,
-                        'confidence_level': match_result.confidence_level,
-                        'matched_cues': match_result.matched_cues,
-                        'task_name': match_result.task_name,
-                        'step_title': match_result.step_title,  # Include the property
-                        'step_description': match_result.step_description  # Include the property
-                    }
-                    
-                    state_record = StateRecord(
-                        timestamp=datetime.now(),
-                        vlm_text=cleaned_text,
-                        matched_step=matched_step_dict,
-                        confidence=confidence,
-                        task_id=match_result.task_name,
-                        step_index=match_result.step_id
-                    )
-                    
-                    # Get new state summary for logging
-                    new_state = self._get_new_state_summary(state_record)
-                    
-                    # Update current state
-                    self.current_state = state_record
-                    
-                    # Add to legacy history (for compatibility)
-                    self.state_history.append(state_record)
-                    if len(self.state_history) > self.max_history_size:
-                        self.state_history.pop(0)
-                    
-                    # Add to optimized sliding window
-                    self._add_to_sliding_window(state_record)
-                    
-                    action_taken = ActionType.UPDATE
-                    state_updated = True
-                    self.consecutive_low_count = 0  # Reset on successful update
-                    decision_reason = f"High confidence match ({confidence:.3f}) - state updated to step {match_result.step_id}"
-                    
-                    # Log state update with before/after comparison
-                    self.log_manager.log_state_tracker(
-                        observation_id=observation_id or "unknown",
-                        state_update_id=state_update_id,
-                        confidence=confidence,
-                        action=action_taken.value,
-                        state=new_state
-                    )
-                    
-                    # Log state comparison for detailed tracking
-                    logger.info(f"State comparison - Previous: {previous_state}, New: {new_state}")
-                    logger.info(f"State updated: task={state_record.task_id}, step={state_record.step_index}, confidence={confidence:.2f}, level={confidence_level.value}")
-                else:
-                    # Consistency check failed
-                    action_taken = ActionType.OBSERVE
-                    decision_reason = f"Consistency check failed - observing instead of updating"
-                    
-                    # Log failed consistency check
-                    self.log_manager.log_state_tracker(
-                        observation_id=observation_id or "unknown",
-                        state_update_id=state_update_id,
-                        confidence=confidence,
-                        action=action_taken.value,
-                        state={"reason": "consistency_check_failed", "previous_state": previous_state}
-                    )
-                    
-                    logger.warning(f"State consistency check failed - observing instead of updating")
+                # Log state comparison for detailed tracking
+                logger.info(f"State comparison - Previous: {previous_state}, New: {new_state}")
+                logger.info(f"State updated: task={state_record.task_id}, step={state_record.step_index}, confidence={confidence:.2f}, level={confidence_level.value}")
+            elif reason == "consistency_check_failed":
+                decision_reason = f"Consistency check failed - observing instead of updating"
                 
-            elif confidence_level == ConfidenceLevel.MEDIUM:
-                # Generate state update ID for medium confidence logging
-                state_update_id = self.log_manager.generate_state_update_id()
-                action_taken = ActionType.OBSERVE
+                # Log failed consistency check
+                self.log_manager.log_state_tracker(
+                    observation_id=observation_id or "unknown",
+                    state_update_id=state_update_id,
+                    confidence=confidence,
+                    action=action_taken.value,
+                    state={"reason": "consistency_check_failed", "previous_state": previous_state}
+                )
+                
+                logger.warning(f"State consistency check failed - observing instead of updating")
+            elif reason == "medium_confidence":
                 decision_reason = f"Medium confidence ({confidence:.3f}) - observing without update"
                 
                 # Log medium confidence decision
@@ -510,12 +806,7 @@ class StateTracker:
                 )
                 
                 logger.info(f"Medium confidence ({confidence:.2f}) - observing without update")
-                
             else:
-                # Low confidence
-                state_update_id = self.log_manager.generate_state_update_id()
-                action_taken = ActionType.IGNORE
-                self.consecutive_low_count += 1
                 decision_reason = f"Low confidence ({confidence:.3f}) - ignoring (consecutive: {self.consecutive_low_count})"
                 
                 # Log low confidence decision
@@ -539,7 +830,7 @@ class StateTracker:
             processing_time = (time.time() - start_time) * 1000
             self._record_metrics(
                 cleaned_text, confidence, processing_time, confidence_level, action_taken,
-                match_result.task_name, match_result.step_id
+                match_result.task_name, match_result.step_id, match_result.search_scope
             )
             
             return state_updated
@@ -562,24 +853,225 @@ class StateTracker:
             
             return False
     
+    def _apply_match(self, match_result, cleaned_text: str):
+        """
+        Apply the conservative update strategy to a RAG match
+        
+        Updates the current state, history, sliding window and low-confidence
+        counter. Logging is left to the caller, which also calls
+        _handle_consecutive_low_matches for low-confidence matches.
+        
+        Args:
+            match_result: MatchResult of the observation
+            cleaned_text: Cleaned VLM text
+            
+        Returns:
+            Tuple of (action_taken, confidence_level, state_record, reason):
+            state_record is the new state on UPDATE and None otherwise, reason
+            is "updated", "consistency_check_failed", "medium_confidence" or
+            "low_confidence"
+        """
+        confidence = match_result.similarity
+        confidence_level = self._determine_confidence_level(confidence)
+        
+        if self._should_update_state(confidence, confidence_level):
+            # Check state consistency before update
+            if not self._check_state_consistency(match_result.task_name, match_result.step_id):
+                return ActionType.OBSERVE, confidence_level, None, "consistency_check_failed"
+            
+            # Create and update state record
+            # Include properties in matched_step dictionary
+            matched_step_dict = {
+                'step_id': match_result.step_id,
+                'task_description': match_result.task_description,
+                'tools_needed': match_result.tools_needed,
+                'completion_indicators': match_result.completion_indicators,
+                'visual_cues': match_result.visual_cues,
+                'estimated_duration': match_result.estimated_duration,
+                'safety_notes': match_result.safety_notes,
+                'similarity': match_result.similarity,
+                'confidence_level': match_result.confidence_level,
+                'matched_cues': match_result.matched_cues,
+                'task_name': match_result.task_name,
+                'step_title': match_result.step_title,  # Include the property
+                'step_description': match_result.step_description  # Include the property
+            }
+            
+            state_record = StateRecord(
+                timestamp=datetime.now(),
+                vlm_text=cleaned_text,
+                matched_step=matched_step_dict,
+                confidence=confidence,
+                task_id=match_result.task_name,
+                step_index=match_result.step_id
+            )
+            
+            # Update current state
+            self._set_current_state(state_record)
+            
+            # Add to legacy history (for compatibility)
+            self.state_history.append(state_record)
+            
+            # Add to optimized sliding window
+            self._add_to_sliding_window(state_record)
+            
+            self.consecutive_low_count = 0  # Reset on successful update
+            if self.step_decoder is not None and match_result.search_scope != "decoded":
+                # Position came from an undecoded search; re-seed on the next frame
+                self.step_decoder.clear()
+            if self.journal is not None:
+                self._journal_event("update", self._state_record_to_dict(state_record))
+            return ActionType.UPDATE, confidence_level, state_record, "updated"
+        
+        if confidence_level == ConfidenceLevel.MEDIUM:
+            return ActionType.OBSERVE, confidence_level, None, "medium_confidence"
+        
+        # Low confidence: no update
+        self.consecutive_low_count += 1
+        return ActionType.IGNORE, confidence_level, None, "low_confidence"
+    
+    def encode_replay(self, observations: List[str]) -> List[Optional[List[float]]]:
+        """
+        Clean and encode recorded VLM outputs in one batch for replay
+        
+        The result can be passed to replay() repeatedly, so a threshold sweep
+        encodes the transcript only once.
+        
+        Args:
+            observations: Recorded VLM texts
+            
+        Returns:
+            Embedding per observation (None where the text is empty after cleaning)
+        """
+        with _logging_suspended():
+            cleaned = [self.clean_vlm_text(text) for text in observations]
+            texts = [text for text in cleaned if text]
+            embeddings = iter(self.rag_kb.encode_observations(texts) if texts else [])
+            return [next(embeddings) if text else None for text in cleaned]
+    
+    def replay(self,
+               observations: List[str],
+               high_confidence_threshold: Optional[float] = None,
+               medium_confidence_threshold: Optional[float] = None,
+               query_embeddings: Optional[List[Optional[List[float]]]] = None) -> List[ReplayDecision]:
+        """
+        Replay recorded VLM outputs offline through the state update logic
+        
+        Runs the same matching and decision logic as process_vlm_response on
+        a scratch tracker sharing this tracker's knowledge base, so the live
+        session is untouched. Observations are encoded in one batch, and
+        metrics and the journal are off for the run. Tracker and RAG logging
+        below ERROR is dropped on the replaying thread only, and the searches
+        are not counted in the knowledge base's search statistics.
+        
+        Args:
+            observations: Recorded VLM texts in arrival order
+            high_confidence_threshold: Optional override of the HIGH threshold
+            medium_confidence_threshold: Optional override of the MEDIUM threshold
+            query_embeddings: Optional output of encode_replay for the same observations
+            
+        Returns:
+            One ReplayDecision per observation
+        """
+        if query_embeddings is None:
+            query_embeddings = self.encode_replay(observations)
+        
+        with _logging_suspended():
+            replayer = StateTracker(rag_kb=self.rag_kb, query_processor=self.query_processor,
+                                    session_id=f"{self.session_id}-replay")
+            replayer.high_confidence_threshold = self.high_confidence_threshold if high_confidence_threshold is None else high_confidence_threshold
+            replayer.medium_confidence_threshold = self.medium_confidence_threshold if medium_confidence_threshold is None else medium_confidence_threshold
+            replayer.max_consecutive_low = self.max_consecutive_low
+            replayer.locality_search_enabled = self.locality_search_enabled
+            replayer.locality_threshold = self.locality_threshold
+            replayer.record_search_stats = False
+            if self.step_decoder is None:
+                replayer.step_decoder = None
+            
+            return [replayer._replay_observation(text, embedding)
+                    for text, embedding in zip(observations, query_embeddings)]
+    
+    def _replay_observation(self, vlm_text: str, query_embedding: Optional[List[float]]) -> ReplayDecision:
+        """process_vlm_response without logging or metrics, using a precomputed embedding"""
+        cleaned_text = self.clean_vlm_text(vlm_text)
+        if not cleaned_text:
+            self.failure_count += 1
+            return ReplayDecision(ActionType.IGNORE.value, None, None, 0.0, False, None)
+        
+        match_result = None
+        if self.step_decoder is not None and self.current_state:
+            decoder = self._get_step_decoder()
+            if decoder.try_skip():
+                _, probability = decoder.map_estimate()
+                return ReplayDecision(ActionType.OBSERVE.value, self.current_state.task_id,
+                                      self.current_state.step_index, probability, False, "skipped")
+            match_result = self._decode_step(cleaned_text, None, query_embedding)
+        
+        if match_result is None:
+            current_task, current_step = self._get_locality_hint()
+            match_result = self.rag_kb.find_matching_step(
+                cleaned_text,
+                current_task=current_task,
+                current_step=current_step,
+                locality_threshold=self.locality_threshold,
+                query_embedding=query_embedding,
+                record_stats=self.record_search_stats
+            )
+        
+        if not match_result:
+            self.failure_count += 1
+            return ReplayDecision(ActionType.IGNORE.value, None, None, 0.0, False, None)
+        
+        action_taken, _, state_record, reason = self._apply_match(match_result, cleaned_text)
+        if reason == "low_confidence":
+            self._handle_consecutive_low_matches()
+        return ReplayDecision(action_taken.value, match_result.task_name, match_result.step_id,
+                              match_result.similarity, state_record is not None, match_result.search_scope)
+    
+    def _set_current_state(self, state_record: Optional[StateRecord]):
+        """Replace the current state and invalidate the per-version caches"""
+        self.current_state = state_record
+        self.state_version += 1
+    
     def get_current_state(self) -> Optional[Dict[str, Any]]:
         """
         Get current state information.
         
+        The dictionary is built once per state version and shared by all
+        callers until the next update, so it must not be modified.
+        
         Returns:
             Current state as dictionary or None if no state
         """
         if not self.current_state:
             return None
         
-        return {
-            'timestamp': self.current_state.timestamp.isoformat(),
-            'task_id': self.current_state.task_id,
-            'step_index': self.current_state.step_index,
-            'confidence': self.current_state.confidence,
-            'matched_step': self.current_state.matched_step,
-            'vlm_text': self.current_state.vlm_text
-        }
+        if self._state_view_version != self.state_version:
+            self._state_view = {
+                'timestamp': self.current_state.timestamp.isoformat(),
+                'task_id': self.current_state.task_id,
+                'step_index': self.current_state.step_index,
+                'confidence': self.current_state.confidence,
+                'matched_step': self.current_state.matched_step,
+                'vlm_text': self.current_state.vlm_text
+            }
+            self._state_view_version = self.state_version
+        return self._state_view
+    
+    def get_cached_responses(self) -> Dict[Any, str]:
+        """
+        Get the template response of every query type for the current state
+        
+        Responses are rendered on the first query after a state change and
+        reused until the next one, so template answers are a dictionary lookup.
+        
+        Returns:
+            Dictionary of QueryType -> response text
+        """
+        if self._responses_version != self.state_version:
+            self._responses = self.query_processor.build_responses(self.get_current_state())
+            self._responses_version = self.state_version
+        return self._responses
     
     def get_processing_metrics(self) -> List[Dict[str, Any]]:
         """Get quantifiable processing metrics"""
@@ -593,38 +1085,40 @@ class StateTracker:
                 'action_taken': m.action_taken.value,
                 'matched_task': m.matched_task,
                 'matched_step': m.matched_step,
-                'consecutive_low_count': m.consecutive_low_count
+                'consecutive_low_count': m.consecutive_low_count,
+                'search_scope': m.search_scope
             }
             for m in self.processing_metrics
         ]
     
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get summary statistics of processing metrics"""
-        if not self.processing_metrics:
-            return {'total_processed': 0}
+        summary = self.processing_metrics.summary()
+        if summary['total_processed'] == 0:
+            return summary
         
-        confidence_scores = [m.confidence_score for m in self.processing_metrics]
-        processing_times = [m.processing_time_ms for m in self.processing_metrics]
+        summary['locality_search_enabled'] = self.locality_search_enabled
+        summary['consecutive_low_count'] = self.consecutive_low_count
+        return summary
+    
+    def get_last_processed_frame(self) -> Optional[StoredFrame]:
+        """
+        Get the most recent frame passed to process_vlm_response
         
-        # Count actions
-        action_counts = {}
-        confidence_level_counts = {}
-        for m in self.processing_metrics:
-            action_counts[m.action_taken.value] = action_counts.get(m.action_taken.value, 0) + 1
-            confidence_level_counts[m.confidence_level.value] = confidence_level_counts.get(m.confidence_level.value, 0) + 1
+        Returns:
+            StoredFrame with image bytes and metadata, or None if no frame is stored
+        """
+        return self.frame_store.latest()
+    
+    def get_last_processed_image(self) -> Optional[bytes]:
+        """
+        Get the encoded bytes of the most recent processed frame
         
-        return {
-            'total_processed': len(self.processing_metrics),
-            'avg_confidence': sum(confidence_scores) / len(confidence_scores),
-            'max_confidence': max(confidence_scores),
-            'min_confidence': min(confidence_scores),
-            'avg_processing_time_ms': sum(processing_times) / len(processing_times),
-            'max_processing_time_ms': max(processing_times),
-            'min_processing_time_ms': min(processing_times),
-            'action_distribution': action_counts,
-            'confidence_level_distribution': confidence_level_counts,
-            'consecutive_low_count': self.consecutive_low_count
-        }
+        Returns:
+            Image bytes or None if no frame is stored
+        """
+        frame = self.frame_store.latest()
+        return frame.image_data if frame else None
     
     def get_memory_stats(self) -> MemoryStats:
         """Get detailed memory usage statistics"""
@@ -657,31 +1151,11 @@ class StateTracker:
         if not self.sliding_window:
             return {'pattern_analysis': 'No data available'}
         
-        # Task distribution
-        task_counts = {}
-        step_counts = {}
-        confidence_levels = {'high': 0, 'medium': 0, 'low': 0}
-        
-        for record in self.sliding_window:
-            # Count tasks
-            task_counts[record.task_id] = task_counts.get(record.task_id, 0) + 1
-            
-            # Count steps
-            step_key = f"{record.task_id}:{record.step_index}"
-            step_counts[step_key] = step_counts.get(step_key, 0) + 1
-            
-            # Count confidence levels
-            if record.confidence >= self.high_confidence_threshold:
-                confidence_levels['high'] += 1
-            elif record.confidence >= self.medium_confidence_threshold:
-                confidence_levels['medium'] += 1
-            else:
-                confidence_levels['low'] += 1
-        
+        window = self.sliding_window
         return {
-            'task_distribution': task_counts,
-            'step_distribution': step_counts,
-            'confidence_distribution': confidence_levels,
+            'task_distribution': dict(window.task_counts),
+            'step_distribution': dict(window.step_counts),
+            'confidence_distribution': dict(window.confidence_levels),
             'total_records': len(self.sliding_window),
             'time_span_minutes': (
                 (self.sliding_window[-1].timestamp - self.sliding_window[0].timestamp).total_seconds() / 60
@@ -715,7 +1189,8 @@ class StateTracker:
                 'avg_record_size_bytes': memory_stats.avg_record_size,
                 'memory_limit_mb': self.memory_limit_bytes / (1024 * 1024),
                 'failure_count': self.failure_count
-            }
+            },
+            'frame_store': self.frame_store.get_stats()
         }
     
     def process_instant_query(self, query: str, query_id: str = None, request_id: str = None):
@@ -725,6 +1200,9 @@ class StateTracker:
         This implements the instant response loop:
         G: User query -> H: State Tracker direct response -> I: Return state info
         
+        Async callers should use process_instant_query_async so a VLM
+        fallback does not block their event loop.
+        
         Args:
             query: User's natural language query
             query_id: Optional query ID for logging
@@ -733,49 +1211,91 @@ class StateTracker:
         Returns:
             QueryResult with formatted response
         """
-        from .query_processor import QueryResult
-        
         try:
-            # Generate IDs if not provided
-            if not query_id:
-                query_id = self.log_manager.generate_query_id()
-            if not request_id:
-                request_id = self.log_manager.generate_request_id()
-            
-            # Get current state (fast memory read)
-            current_state = self.get_current_state()
-            
-            # Log query processing start
-            start_time = time.time()
+            query_id, current_state, start_time = self._begin_instant_query(query_id, request_id)
             
             # Process query with query processor
-            result = self.query_processor.process_query(query, current_state, query_id, self.log_manager)
+            result = self.query_processor.process_query(query, current_state, query_id, self.log_manager,
+                                                        state_tracker=self,
+                                                        responses=self.get_cached_responses())
             
-            # Calculate processing time
-            processing_time_ms = (time.time() - start_time) * 1000
-            
-            # Log query processing details
-            self.log_manager.log_query_classify(query_id, result.query_type.value, result.confidence)
-            self.log_manager.log_query_process(query_id, current_state or {})
-            self.log_manager.log_query_response(query_id, result.response_text, processing_time_ms)
+            return self._finish_instant_query(query, query_id, current_state, start_time, result)
+        except Exception as e:
+            return self._instant_query_error(query, e)
+    
+    async def process_instant_query_async(self, query: str, query_id: str = None, request_id: str = None):
+        """
+        Asynchronous form of process_instant_query
+        
+        Template answers complete without yielding; VLM fallback requests
+        are awaited, so the event loop keeps running while they are in flight.
+        
+        Args:
+            query: User's natural language query
+            query_id: Optional query ID for logging
+            request_id: Optional request ID for logging
             
-            logger.info(f"Instant query processed: '{query}' -> {result.query_type.value} in {processing_time_ms:.1f}ms")
+        Returns:
+            QueryResult with formatted response
+        """
+        try:
+            query_id, current_state, start_time = self._begin_instant_query(query_id, request_id)
             
-            return result
+            # Process query with query processor
+            result = await self.query_processor.process_query_async(query, current_state, query_id, self.log_manager,
+                                                                    state_tracker=self,
+                                                                    responses=self.get_cached_responses())
             
+            return self._finish_instant_query(query, query_id, current_state, start_time, result)
         except Exception as e:
-            logger.error(f"Error processing instant query '{query}': {e}")
-            
-            # Return a fallback response
-            fallback_response = f"Sorry, I encountered an error processing your query. You are currently on step {self.current_state.step_index if self.current_state else 'unknown'} of task '{self.current_state.task_id if self.current_state else 'unknown'}'."
-            
-            return QueryResult(
-                query_type=QueryType.UNKNOWN,
-                response_text=fallback_response,
-                processing_time_ms=0.0,
-                confidence=0.0,
-                raw_query=query
-            )
+            return self._instant_query_error(query, e)
+    
+    def _begin_instant_query(self, query_id: Optional[str], request_id: Optional[str]):
+        """Assign IDs and read the current state for an instant query"""
+        # Generate IDs if not provided
+        if not query_id:
+            query_id = self.log_manager.generate_query_id()
+        if not request_id:
+            request_id = self.log_manager.generate_request_id()
+        
+        # Get current state (fast memory read)
+        current_state = self.get_current_state()
+        
+        # Log query processing start
+        start_time = time.time()
+        return query_id, current_state, start_time
+    
+    def _finish_instant_query(self, query: str, query_id: str, current_state: Optional[Dict[str, Any]],
+                              start_time: float, result):
+        """Log a processed instant query and return its result"""
+        # Calculate processing time
+        processing_time_ms = (time.time() - start_time) * 1000
+        
+        # Log query processing details
+        self.log_manager.log_query_classify(query_id, result.query_type.value, result.confidence)
+        self.log_manager.log_query_process(query_id, current_state or {})
+        self.log_manager.log_query_response(query_id, result.response_text, processing_time_ms)
+        
+        logger.info(f"Instant query processed: '{query}' -> {result.query_type.value} in {processing_time_ms:.1f}ms")
+        
+        return result
+    
+    def _instant_query_error(self, query: str, error: Exception):
+        """Build the fallback response for a failed instant query"""
+        from .query_processor import QueryResult, QueryType
+        
+        logger.error(f"Error processing instant query '{query}': {error}")
+        
+        # Return a fallback response
+        fallback_response = f"Sorry, I encountered an error processing your query. You are currently on step {self.current_state.step_index if self.current_state else 'unknown'} of task '{self.current_state.task_id if self.current_state else 'unknown'}'."
+        
+        return QueryResult(
+            query_type=QueryType.UNKNOWN,
+            response_text=fallback_response,
+            processing_time_ms=0.0,
+            confidence=0.0,
+            raw_query=query
+        )
     
     def get_query_capabilities(self) -> Dict[str, Any]:
         """Get information about query processing capabilities"""
@@ -786,12 +1306,15 @@ class StateTracker:
             'current_state_available': self.current_state is not None
         }
 
-# Global state tracker instance
-_state_tracker_instance: Optional[StateTracker] = None
-
-def get_state_tracker() -> StateTracker:
-    """Get or create global state tracker instance"""
-    global _state_tracker_instance
-    if _state_tracker_instance is None:
-        _state_tracker_instance = StateTracker()
-    return _state_tracker_instance
\ No newline at end of file
+def get_state_tracker(session_id: Optional[str] = None) -> StateTracker:
+    """
+    Get or create the state tracker of a session
+    
+    Args:
+        session_id: Session or camera ID; None selects the default session
+        
+    Returns:
+        StateTracker for the session (all sessions share one knowledge base)
+    """
+    from .session_registry import get_session_registry
+    return get_session_registry().get(session_id)
\ No newline at end of file
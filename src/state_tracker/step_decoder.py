@@ -0,0 +1,184 @@
+"""
+Temporal Step Decoder
+
+Online HMM forward filter over the steps of the current task. Hidden states
+are the task's steps in order; transitions favour staying on a step or
+advancing to the next one, and emissions come from the RAG similarities of
+the observation to every step. Each observation updates the posterior in
+O(steps) because the transition matrix is banded.
+
+The decoder smooths out single-frame flapping between neighbouring steps,
+and when the posterior is already sharply concentrated it lets the tracker
+skip the RAG search for a frame (the posterior is only propagated through
+the transition model, which lowers its peak until a search is due again).
+"""
+
+import math
+from typing import Dict, List, Optional, Tuple
+
+
+class StepDecoder:
+    """
+    Forward-filtered posterior over the steps of one task
+
+    Transition offsets: stay (0), advance (+1), skip ahead (+2), step back (-1).
+    Probability mass of offsets that leave the task is kept on the current step.
+    """
+
+    def __init__(self,
+                 stay_probability: float = 0.6,
+                 advance_probability: float = 0.3,
+                 skip_ahead_probability: float = 0.05,
+                 back_probability: float = 0.05,
+                 temperature: float = 0.05,
+                 skip_threshold: float = 0.9,
+                 max_skipped_frames: int = 2):
+        """
+        Initialize a decoder with no active task
+
+        Args:
+            stay_probability: P(remain on the same step between frames)
+            advance_probability: P(move to the next step)
+            skip_ahead_probability: P(jump two steps ahead)
+            back_probability: P(return to the previous step)
+            temperature: Similarity scale of the emission model; lower values
+                trust single frames more
+            skip_threshold: Posterior peak above which a RAG search may be skipped
+            max_skipped_frames: Maximum consecutive frames decoded without search
+        """
+        total = stay_probability + advance_probability + skip_ahead_probability + back_probability
+        self.transitions = (
+            (0, stay_probability / total),
+            (1, advance_probability / total),
+            (2, skip_ahead_probability / total),
+            (-1, back_probability / total),
+        )
+        self.temperature = temperature
+        self.skip_threshold = skip_threshold
+        self.max_skipped_frames = max_skipped_frames
+
+        self.task_name: Optional[str] = None
+        self.step_ids: List[int] = []
+        self.posterior: List[float] = []
+        self.skipped_frames = 0
+
+        self.decoded_count = 0
+        self.skipped_count = 0
+
+    def reset(self, task_name: str, step_ids: List[int], start_step: Optional[int] = None,
+              start_probability: float = 0.8) -> None:
+        """
+        Start decoding a task
+
+        Args:
+            task_name: Task whose steps are decoded
+            step_ids: Step IDs in task order
+            start_step: Step the user is known to be on, if any
+            start_probability: Posterior mass put on start_step
+        """
+        self.task_name = task_name
+        self.step_ids = list(step_ids)
+        self.skipped_frames = 0
+        count = len(self.step_ids)
+        if count == 0:
+            self.posterior = []
+            return
+
+        if start_step in self.step_ids and count > 1:
+            rest = (1.0 - start_probability) / (count - 1)
+            self.posterior = [start_probability if step_id == start_step else rest for step_id in self.step_ids]
+        else:
+            self.posterior = [1.0 / count] * count
+
+    def clear(self) -> None:
+        """Drop the active task (the next observation re-seeds the decoder)"""
+        self.task_name = None
+        self.step_ids = []
+        self.posterior = []
+        self.skipped_frames = 0
+
+    @property
+    def active(self) -> bool:
+        return bool(self.posterior)
+
+    def map_estimate(self) -> Tuple[Optional[int], float]:
+        """
+        Most probable step under the current posterior
+
+        Returns:
+            (step_id, posterior probability), or (None, 0.0) without a task
+        """
+        if not self.posterior:
+            return None, 0.0
+        index = max(range(len(self.posterior)), key=self.posterior.__getitem__)
+        return self.step_ids[index], self.posterior[index]
+
+    def predict(self) -> None:
+        """Propagate the posterior one frame through the transition model"""
+        count = len(self.posterior)
+        predicted = [0.0] * count
+        for index, mass in enumerate(self.posterior):
+            if mass == 0.0:
+                continue
+            for offset, probability in self.transitions:
+                target = index + offset
+                if not 0 <= target < count:
+                    target = index
+                predicted[target] += mass * probability
+        self.posterior = predicted
+
+    def try_skip(self) -> bool:
+        """
+        Decode the next frame without a RAG search if the posterior allows it
+
+        Returns:
+            True if the frame was skipped (the posterior was only propagated)
+        """
+        if not self.posterior or self.skipped_frames >= self.max_skipped_frames:
+            return False
+        if self.map_estimate()[1] < self.skip_threshold:
+            return False
+
+        self.predict()
+        self.skipped_frames += 1
+        self.skipped_count += 1
+        return True
+
+    def update(self, similarities: Dict[int, float]) -> Tuple[Optional[int], float]:
+        """
+        Fold one observation into the posterior
+
+        Args:
+            similarities: step_id -> RAG similarity of the observation; steps
+                without a score get the lowest given similarity
+
+        Returns:
+            (MAP step_id, posterior probability) after the update
+        """
+        if not self.posterior or not similarities:
+            return self.map_estimate()
+
+        self.predict()
+        floor = min(similarities.values())
+        peak = max(similarities.values())
+        updated = [
+            mass * math.exp((similarities.get(step_id, floor) - peak) / self.temperature)
+            for step_id, mass in zip(self.step_ids, self.posterior)
+        ]
+        total = sum(updated)
+        if total > 0.0:
+            self.posterior = [mass / total for mass in updated]
+        self.skipped_frames = 0
+        self.decoded_count += 1
+        return self.map_estimate()
+
+    def get_stats(self) -> Dict[str, object]:
+        """Decoder counters and current estimate"""
+        step_id, probability = self.map_estimate()
+        return {
+            'task_name': self.task_name,
+            'map_step': step_id,
+            'map_probability': probability,
+            'decoded_frames': self.decoded_count,
+            'skipped_frames': self.skipped_count
+        }
@@ -28,10 +28,14 @@ class EnhancedVLMFallbackProcessor(VLMFallbackProcessor):
             config=self.config
         )
     
-    async def process_query_with_image_fallback(self, query: str, state_data: Optional[Dict]) -> Dict:
+    async def process_query_with_image_fallback(self, query: str, state_data: Optional[Dict],
+                                                current_frame=None) -> Dict:
         """
         Process query with image-aware VLM Fallback support.
         Maintains the same interface as process_query_with_fallback.
+        
+        current_frame is the querying session's last processed StoredFrame;
+        when given it is used instead of the default session's frame.
         """
         start_time = time.time()
         self.total_queries += 1
@@ -42,7 +46,7 @@ class EnhancedVLMFallbackProcessor(VLMFallbackProcessor):
             
             if should_use_fallback and self.enable_image_fallback:
                 # Use Enhanced VLM Fallback (with image support)
-                result = await self._execute_enhanced_vlm_fallback(query, state_data)
+                result = await self._execute_enhanced_vlm_fallback(query, state_data, current_frame)
                 self.fallback_queries += 1
             elif should_use_fallback:
                 # Use traditional VLM Fallback (text-only)
@@ -67,7 +71,8 @@ class EnhancedVLMFallbackProcessor(VLMFallbackProcessor):
             
             return self._format_unified_response(self._create_error_result(e, processing_time))
     
-    async def _execute_enhanced_vlm_fallback(self, query: str, state_data: Optional[Dict]) -> FallbackResult:
+    async def _execute_enhanced_vlm_fallback(self, query: str, state_data: Optional[Dict],
+                                             current_frame=None) -> FallbackResult:
         """
         Execute VLM Fallback with image support.
         Automatically captures current image and sends it to VLM.
@@ -76,7 +81,7 @@ class EnhancedVLMFallbackProcessor(VLMFallbackProcessor):
             logger.debug(f"Executing enhanced VLM fallback for query: '{query[:50]}...'")
             
             # Get current image
-            image_data = await self.image_capture_manager.get_current_image()
+            image_data = await self.image_capture_manager.get_current_image(current_frame=current_frame)
             
             if image_data:
                 # Execute VLM Fallback with image
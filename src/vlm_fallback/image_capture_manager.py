@@ -24,19 +24,26 @@ class ImageCaptureManager:
         self.last_captured_image = None
         self.image_cache = {}
 
-    async def get_current_image(self, model_type: str = None) -> Optional[Dict]:
+    async def get_current_image(self, model_type: str = None, current_frame=None,
+                                session_id: str = None) -> Optional[Dict]:
         """
         Priority order: camera > state tracker > cache
         Returns dict: {image_data, format, size, processed, timestamp}
+        
+        current_frame is the querying session's StoredFrame when the caller
+        already has it; otherwise the frame is looked up from the tracker of
+        session_id (None selects the default session).
         """
         # 1. Camera
         current_image = await self._capture_from_camera()
         if current_image:
             return self._process_for_fallback(current_image, model_type)
-        # 2. State tracker
-        last_image = await self._get_last_processed_image()
-        if last_image:
-            return self._process_for_fallback(last_image, model_type)
+        # 2. State tracker (frames it stores were usually preprocessed already)
+        last_frame = current_frame or await self._get_last_processed_frame(session_id)
+        if last_frame:
+            if last_frame.processed:
+                return self._encode_for_fallback(last_frame.image_data, True)
+            return self._process_for_fallback(last_frame.image_data, model_type)
         # 3. Cache
         cached_image = self._get_cached_image()
         if cached_image:
@@ -53,8 +60,8 @@ class ImageCaptureManager:
             logger.warning(f"Camera capture failed: {e}")
             return None
 
-    async def _get_last_processed_image(self) -> Optional[bytes]:
-        """Get last processed image from state tracker (if available)"""
+    async def _get_last_processed_frame(self, session_id: str = None):
+        """Get last processed frame (a StoredFrame) from a session's state tracker (if available)"""
         try:
             # Use relative imports
             import sys
@@ -62,9 +69,9 @@ class ImageCaptureManager:
             sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
             from state_tracker.state_tracker import get_state_tracker
             
-            state_tracker = get_state_tracker()
-            if hasattr(state_tracker, 'get_last_processed_image'):
-                return state_tracker.get_last_processed_image()
+            state_tracker = get_state_tracker(session_id)
+            if hasattr(state_tracker, 'get_last_processed_frame'):
+                return state_tracker.get_last_processed_frame()
             return None
         except Exception as e:
             logger.warning(f"Last image retrieval failed: {e}")
@@ -97,26 +104,24 @@ class ImageCaptureManager:
                 config={},
                 return_format='bytes'
             )
-            base64_image = base64.b64encode(processed_image).decode('utf-8')
-            return {
-                "image_data": base64_image,
-                "format": "jpeg",
-                "size": len(processed_image),
-                "processed": True,
-                "timestamp": datetime.now()
-            }
+            return self._encode_for_fallback(processed_image, True)
         except Exception as e:
             logger.error(f"Image processing failed: {e}")
             # If image processing fails, return raw base64
             try:
-                base64_image = base64.b64encode(image_data).decode('utf-8')
-                return {
-                    "image_data": base64_image,
-                    "format": "jpeg",
-                    "size": len(image_data),
-                    "processed": False,
-                    "timestamp": datetime.now()
-                }
+                return self._encode_for_fallback(image_data, False)
             except Exception as fallback_error:
                 logger.error(f"Fallback image processing also failed: {fallback_error}")
-                return None
\ No newline at end of file
+                return None
+
+    def _encode_for_fallback(self, image_data: bytes, processed: bool) -> Dict:
+        """
+        Base64-encode image bytes into the fallback image dict
+        """
+        return {
+            "image_data": base64.b64encode(image_data).decode('utf-8'),
+            "format": "jpeg",
+            "size": len(image_data),
+            "processed": processed,
+            "timestamp": datetime.now()
+        }
\ No newline at end of file
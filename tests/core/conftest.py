@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the core tests
+
+FakeKnowledgeBase answers find_matching_step with a real MatchResult, so
+the tracker tests exercise the same fields and properties (step_title,
+step_description, confidence_level) as a live knowledge base.
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.vector_search import MatchResult
+
+
+def make_match(step_id: int, similarity: float = 0.9, task_name: str = "coffee_brewing") -> MatchResult:
+    """MatchResult for a step titled "Step <id>" (confidence level follows the similarity)"""
+    return MatchResult(
+        step_id=step_id,
+        task_description=f"Step {step_id}. Do part {step_id}",
+        tools_needed=["kettle"],
+        completion_indicators=[],
+        visual_cues=[],
+        estimated_duration="1 minute",
+        safety_notes=[],
+        similarity=similarity,
+        confidence_level="",
+        matched_cues=[],
+        task_name=task_name
+    )
+
+
+class FakeKnowledgeBase:
+    """Returns a high-confidence match for the step number at the end of the observation"""
+
+    def find_matching_step(self, text, **kwargs):
+        return make_match(int(text.split()[-1]))
+
+
+@pytest.fixture
+def fake_knowledge_base():
+    return FakeKnowledgeBase()
@@ -0,0 +1,81 @@
+"""
+Recent Frame Store Tests
+
+Checks FrameStore and its use by StateTracker and ImageCaptureManager:
+1. The oldest frames are evicted past max_frames and max_bytes; oversize frames are rejected
+2. Frames passed to process_vlm_response are returned by get_last_processed_image
+3. An instant query on a non-default session sends that session's processed
+   frame to the image fallback without looking up the default session or
+   preprocessing the frame again
+"""
+
+import asyncio
+import base64
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import state_tracker.state_tracker as state_tracker_module
+from state_tracker.frame_store import FrameStore
+from state_tracker.query_processor import QueryProcessor
+from state_tracker.state_tracker import StateTracker
+from vlm_fallback.enhanced_fallback_processor import EnhancedVLMFallbackProcessor
+
+
+def test_store_is_bounded_by_count_and_bytes():
+    store = FrameStore(max_frames=2, max_bytes=10)
+
+    assert store.add(b"aaaa")
+    assert store.add(b"bbbb")
+    assert store.add(b"cccc")
+    assert len(store) == 2 and store.total_bytes == 8
+    assert store.latest().image_data == b"cccc"
+
+    assert store.add(b"ddddddd")
+    assert [len(store), store.total_bytes] == [1, 7]
+    assert not store.add(b"x" * 11)
+    assert store.get_stats()["evicted_frames"] == 3
+    assert store.get_stats()["rejected_frames"] == 1
+
+
+def test_tracker_keeps_last_processed_frame(fake_knowledge_base):
+    tracker = StateTracker(rag_kb=fake_knowledge_base, query_processor=object())
+    assert tracker.get_last_processed_image() is None
+
+    asyncio.run(tracker.process_vlm_response("grinding beans step 1", "obs-1", image_data=b"frame-1"))
+    asyncio.run(tracker.process_vlm_response("pouring water step 2", "obs-2", image_data=b"frame-2"))
+
+    assert tracker.get_last_processed_image() == b"frame-2"
+    assert tracker.get_last_processed_frame().observation_id == "obs-2"
+    assert tracker.get_state_summary()["frame_store"]["total_bytes"] == len(b"frame-1") + len(b"frame-2")
+
+
+def test_session_frame_reaches_image_fallback(monkeypatch, fake_knowledge_base):
+    processor = QueryProcessor()
+    processor.enhanced_vlm_fallback = EnhancedVLMFallbackProcessor()
+    processor._should_use_vlm_fallback = lambda *args, **kwargs: True
+    fallback = processor.enhanced_vlm_fallback
+    fallback.decision_engine.should_use_vlm_fallback = lambda query, state_data: True
+    sent_images = []
+
+    async def answer_with_image(query, image):
+        sent_images.append(image)
+        return "The kettle is on the stove"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("default session frame looked up or frame preprocessed again")
+
+    monkeypatch.setattr(fallback.prompt_manager, "execute_fallback_with_image", answer_with_image)
+    monkeypatch.setattr(fallback.image_capture_manager, "_process_for_fallback", fail)
+    monkeypatch.setattr(state_tracker_module, "get_state_tracker", fail)
+
+    tracker = StateTracker(rag_kb=fake_knowledge_base, query_processor=processor, session_id="cam2")
+    asyncio.run(tracker.process_vlm_response("pouring water step 2", image_data=b"cam2-jpeg"))
+    result = asyncio.run(tracker.process_instant_query_async("what is on the stove?"))
+
+    assert result.response_text == "The kettle is on the stove"
+    assert len(sent_images) == 1
+    assert base64.b64decode(sent_images[0]["image_data"]) == b"cam2-jpeg"
+    assert sent_images[0]["processed"] and sent_images[0]["size"] == len(b"cam2-jpeg")
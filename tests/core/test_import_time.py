@@ -0,0 +1,57 @@
+"""
+Import Time Budget Test
+
+Imports state_tracker in a fresh interpreter and checks that:
+1. The import finishes within IMPORT_BUDGET_SECONDS
+2. chromadb, sentence_transformers and torch are not imported until a
+   knowledge base is constructed
+
+The budget can be raised on slow machines with STATE_TRACKER_IMPORT_BUDGET.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+SRC_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+IMPORT_BUDGET_SECONDS = float(os.environ.get("STATE_TRACKER_IMPORT_BUDGET", "1.5"))
+HEAVY_MODULES = ["chromadb", "sentence_transformers", "torch"]
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import state_tracker
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "loaded": [name for name in %r if name in sys.modules]}))
+""" % (HEAVY_MODULES,)
+
+
+def measure_import():
+    """Best of three cold imports (filesystem caches make the first run noisy)"""
+    runs = []
+    for _ in range(3):
+        output = subprocess.run(
+            [sys.executable, "-c", PROBE], cwd=SRC_DIR, capture_output=True, text=True, check=True
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    return min(runs, key=lambda run: run["seconds"])
+
+
+class TestStateTrackerImportTime:
+    """Startup cost of importing state tracking"""
+
+    def test_import_within_budget_without_heavy_modules(self):
+        result = measure_import()
+
+        assert result["loaded"] == [], f"heavy modules imported eagerly: {result['loaded']}"
+        assert result["seconds"] < IMPORT_BUDGET_SECONDS, (
+            f"import state_tracker took {result['seconds']:.2f}s (budget {IMPORT_BUDGET_SECONDS:.2f}s)"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
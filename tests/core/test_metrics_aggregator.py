@@ -0,0 +1,104 @@
+"""
+Running Metrics Aggregation Tests
+
+Checks that incrementally maintained summaries match a full recomputation:
+1. MetricsWindow averages, min/max and distributions after many evictions
+2. EWMA follows the configured smoothing over every appended record
+3. SlidingWindow task/step/confidence distributions after evictions
+"""
+
+import os
+import random
+import sys
+from datetime import datetime
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.metrics_aggregator import MetricsWindow
+from state_tracker.sliding_window import SlidingWindow
+from state_tracker.state_tracker import (
+    ActionType, ConfidenceLevel, OptimizedStateRecord, ProcessingMetrics
+)
+
+
+def make_metrics(rng):
+    return ProcessingMetrics(
+        timestamp=datetime.now(),
+        vlm_input="",
+        confidence_score=rng.random(),
+        processing_time_ms=rng.uniform(1.0, 50.0),
+        confidence_level=rng.choice(list(ConfidenceLevel)),
+        action_taken=rng.choice(list(ActionType)),
+        matched_task=None,
+        matched_step=None,
+        consecutive_low_count=0,
+        search_scope=rng.choice(["local", "widened", "global", None])
+    )
+
+
+def count(values):
+    counts = {}
+    for value in values:
+        counts[value] = counts.get(value, 0) + 1
+    return counts
+
+
+def test_window_summary_matches_recomputation():
+    rng = random.Random(7)
+    window = MetricsWindow(max_size=20)
+    for _ in range(137):
+        window.append(make_metrics(rng))
+
+    records = list(window)
+    confidences = [m.confidence_score for m in records]
+    times = [m.processing_time_ms for m in records]
+    summary = window.summary()
+
+    assert summary['total_processed'] == 20
+    assert summary['lifetime_processed'] == 137
+    assert abs(summary['avg_confidence'] - sum(confidences) / 20) < 1e-9
+    assert summary['max_confidence'] == max(confidences)
+    assert summary['min_confidence'] == min(confidences)
+    assert abs(summary['avg_processing_time_ms'] - sum(times) / 20) < 1e-9
+    assert summary['max_processing_time_ms'] == max(times)
+    assert summary['min_processing_time_ms'] == min(times)
+    assert summary['action_distribution'] == count(m.action_taken.value for m in records)
+    assert summary['confidence_level_distribution'] == count(m.confidence_level.value for m in records)
+    assert summary['search_scope_distribution'] == count(m.search_scope for m in records if m.search_scope)
+
+
+def test_ewma_covers_every_record():
+    rng = random.Random(3)
+    window = MetricsWindow(max_size=5, ewma_alpha=0.5)
+    appended = [make_metrics(rng) for _ in range(12)]
+    for metrics in appended:
+        window.append(metrics)
+
+    expected = appended[0].confidence_score
+    for metrics in appended[1:]:
+        expected += 0.5 * (metrics.confidence_score - expected)
+
+    assert abs(window.summary()['ewma_confidence'] - expected) < 1e-9
+
+
+def test_sliding_window_distributions():
+    rng = random.Random(11)
+    window = SlidingWindow(10, high_threshold=0.7, medium_threshold=0.4)
+    for _ in range(45):
+        window.append(OptimizedStateRecord(
+            timestamp=datetime.now(),
+            confidence=rng.random(),
+            task_id=rng.choice(["coffee", "tea"]),
+            step_index=rng.randint(1, 3)
+        ))
+    window.popleft(3)
+
+    records = list(window)
+    levels = {'high': 0, 'medium': 0, 'low': 0}
+    for r in records:
+        levels['high' if r.confidence >= 0.7 else 'medium' if r.confidence >= 0.4 else 'low'] += 1
+
+    assert window.task_counts == count(r.task_id for r in records)
+    assert window.step_counts == count(f"{r.task_id}:{r.step_index}" for r in records)
+    assert window.confidence_levels == levels
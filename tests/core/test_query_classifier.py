@@ -0,0 +1,89 @@
+"""
+Query Classifier Tests
+
+Checks the precompiled QueryProcessor classifier:
+1. It classifies like sequential re.search over the patterns in priority order
+2. Per-pattern checks are only logged in debug mode
+3. Classification stays well under 1 ms per query
+"""
+
+import os
+import re
+import sys
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.query_processor import (
+    CLASSIFY_PRIORITY, GENERAL_QUESTION_PATTERNS, NON_TASK_INDICATORS, QueryProcessor, QueryType
+)
+
+QUERIES = [
+    "Where am I?", "what step is this", "What's next?", "what do I do after this",
+    "What tools do I need?", "which equipment is required", "how much is done",
+    "am I finished", "give me an overview", "show progress please", "help",
+    "how do I hold the grinder", "explain this step", "What is the meaning of life?",
+    "tell me a joke", "what's the weather in Tokyo", "how do i make coffee",
+    "what is a portafilter", "then what", "overall summary", "", "xyz",
+    "current\nstep", "what\nnext", "I need support", "remaining steps left",
+]
+
+
+def sequential_classify(processor, query):
+    """Classification with one re.search per pattern, as before compilation"""
+    query_lower = query.lower().strip()
+    if any(indicator in query_lower for indicator in NON_TASK_INDICATORS):
+        return QueryType.UNKNOWN
+    for query_type in CLASSIFY_PRIORITY:
+        for pattern in processor.query_patterns.get(query_type, []):
+            if re.search(pattern, query_lower):
+                if query_type == QueryType.HELP and any(gp in query_lower for gp in GENERAL_QUESTION_PATTERNS):
+                    continue
+                return query_type
+    return QueryType.UNKNOWN
+
+
+class RecordingLogManager:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append(name)
+
+
+def test_matches_sequential_search():
+    processor = QueryProcessor()
+    for query in QUERIES:
+        assert processor._classify_query(query) == sequential_classify(processor, query), query
+
+    # Edited patterns are picked up without an explicit recompile
+    processor.query_patterns[QueryType.HELP] = [r'stuck']
+    assert processor._classify_query("I am stuck") == QueryType.HELP
+
+
+def test_pattern_checks_logged_only_in_debug_mode():
+    processor = QueryProcessor()
+    log_manager = RecordingLogManager()
+
+    processor.debug_pattern_logging = False
+    processor._classify_query("show progress please", "q1", log_manager)
+    assert "log_query_pattern_check" not in log_manager.calls
+    assert log_manager.calls[-1] == "log_query_classify_result"
+
+    processor.debug_pattern_logging = True
+    processor._classify_query("show progress please", "q2", log_manager)
+    assert "log_query_pattern_check" in log_manager.calls
+    assert "log_query_pattern_match" in log_manager.calls
+
+
+def test_classification_is_sub_millisecond():
+    processor = QueryProcessor()
+    rounds = 50
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for query in QUERIES:
+            processor._classify_query(query)
+    per_query_ms = (time.perf_counter() - start) * 1000 / (rounds * len(QUERIES))
+
+    assert per_query_ms < 1.0
@@ -0,0 +1,81 @@
+"""
+Async Query Processing Tests
+
+Checks QueryProcessor.process_query_async with a stub VLM fallback:
+1. The event loop keeps running other work while a fallback is awaited
+2. A fallback exceeding fallback_timeout_seconds falls back to the template answer
+3. The synchronous process_query still works outside an event loop
+"""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.query_processor import QueryProcessor, QueryType
+
+
+class StubFallback:
+    """Standard fallback stand-in that answers after a delay"""
+
+    def __init__(self, delay):
+        self.delay = delay
+
+    async def process_query_with_fallback(self, query, state_data):
+        await asyncio.sleep(self.delay)
+        return {"response_text": f"VLM answer to {query}", "confidence": 0.9}
+
+
+def make_processor(delay):
+    processor = QueryProcessor()
+    processor.enhanced_vlm_fallback = None
+    processor.vlm_fallback = StubFallback(delay)
+    return processor
+
+
+class TestProcessQueryAsync:
+    """Fallback handling inside an event loop"""
+
+    def test_loop_keeps_running_during_fallback(self):
+        processor = make_processor(delay=0.3)
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(asyncio.get_running_loop().time())
+                await asyncio.sleep(0.02)
+
+        async def run():
+            result, _ = await asyncio.gather(processor.process_query_async("what is this?", None), ticker())
+            return result
+
+        result = asyncio.run(run())
+
+        assert result.response_text == "VLM answer to what is this?"
+        assert result.confidence == 0.9
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.3
+
+    def test_timeout_falls_back_to_template(self):
+        processor = make_processor(delay=5.0)
+        processor.fallback_timeout_seconds = 0.05
+
+        result = asyncio.run(processor.process_query_async("what is this?", None))
+
+        assert result.response_text != "VLM answer to what is this?"
+        assert result.query_type in QueryType
+        assert result.processing_time_ms < 1000
+
+    def test_sync_process_query_without_loop(self):
+        processor = make_processor(delay=0.01)
+
+        result = processor.process_query("what is this?", None)
+
+        assert result.response_text == "VLM answer to what is this?"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,82 @@
+"""
+Instant Response Cache Tests
+
+Checks the per-state-version response cache of StateTracker:
+1. Repeated instant queries reuse one state dict and render the templates once
+2. A state update invalidates the cache and later answers describe the new step
+3. Cached answers match the uncached template responses
+"""
+
+import asyncio
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.query_processor import QueryProcessor, QueryType
+from state_tracker.state_tracker import StateTracker
+
+
+class CountingQueryProcessor(QueryProcessor):
+    """QueryProcessor counting how often the response table is rendered"""
+
+    def __init__(self):
+        super().__init__()
+        self.build_count = 0
+
+    def build_responses(self, state_data):
+        self.build_count += 1
+        return super().build_responses(state_data)
+
+
+class NullLogManager:
+    """Log manager stand-in accepting every logging call"""
+
+    def __getattr__(self, name):
+        if name.startswith("generate_"):
+            return lambda: name
+        return lambda *args, **kwargs: None
+
+
+def make_tracker(knowledge_base):
+    processor = CountingQueryProcessor()
+    tracker = StateTracker(rag_kb=knowledge_base, query_processor=processor)
+    tracker.log_manager = NullLogManager()
+    asyncio.run(tracker.process_vlm_response("pouring water step 1"))
+    return tracker, processor
+
+
+def test_repeated_queries_render_once(fake_knowledge_base):
+    tracker, processor = make_tracker(fake_knowledge_base)
+
+    assert tracker.get_current_state() is tracker.get_current_state()
+    for _ in range(5):
+        result = tracker.process_instant_query("What step am I on?")
+        assert "Step 1" in result.response_text
+
+    assert processor.build_count == 1
+
+
+def test_update_invalidates_cache(fake_knowledge_base):
+    tracker, processor = make_tracker(fake_knowledge_base)
+    tracker.process_instant_query("What step am I on?")
+    previous_state = tracker.get_current_state()
+
+    asyncio.run(tracker.process_vlm_response("pouring water step 2"))
+    result = tracker.process_instant_query("What step am I on?")
+
+    assert tracker.get_current_state() is not previous_state
+    assert "Step 2" in result.response_text
+    assert processor.build_count == 2
+
+
+def test_cached_responses_match_templates(fake_knowledge_base):
+    tracker, processor = make_tracker(fake_knowledge_base)
+    state = tracker.get_current_state()
+
+    responses = tracker.get_cached_responses()
+
+    assert set(responses) == set(QueryType)
+    for query_type in QueryType:
+        assert responses[query_type] == processor._generate_response(query_type, state)
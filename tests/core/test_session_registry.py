@@ -0,0 +1,123 @@
+"""
+Session-Scoped State Tracker Tests
+
+Checks StateTrackerRegistry with a fake knowledge base:
+1. Sessions get separate trackers that share one knowledge base and query processor
+2. The least recently used session is evicted past max_sessions (default is pinned)
+3. Sessions idle past the TTL are evicted
+4. Evicted trackers are closed off the caller's thread; a returning session
+   waits for its previous tracker to finish closing
+"""
+
+import os
+import sys
+import threading
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.session_registry import StateTrackerRegistry, DEFAULT_SESSION_ID
+
+
+class FakeTracker:
+    """StateTracker stand-in recording its constructor arguments"""
+
+    def __init__(self, rag_kb, query_processor, session_id, journal=None):
+        self.rag_kb = rag_kb
+        self.query_processor = query_processor
+        self.session_id = session_id
+
+
+def make_registry(**kwargs):
+    kb_created = []
+
+    def kb_factory():
+        kb_created.append(object())
+        return kb_created[-1]
+
+    registry = StateTrackerRegistry(
+        kb_factory=kb_factory,
+        query_processor_factory=object,
+        tracker_factory=FakeTracker,
+        **kwargs
+    )
+    return registry, kb_created
+
+
+def test_sessions_share_knowledge_base():
+    registry, kb_created = make_registry()
+
+    cam_a = registry.get("cam-a")
+    cam_b = registry.get("cam-b")
+    default = registry.get(None)
+
+    assert len({id(cam_a), id(cam_b), id(default)}) == 3
+    assert registry.get("cam-a") is cam_a
+    assert default.session_id == DEFAULT_SESSION_ID
+    assert len(kb_created) == 1
+    assert cam_a.rag_kb is cam_b.rag_kb is default.rag_kb
+    assert cam_a.query_processor is cam_b.query_processor
+
+
+def test_lru_eviction_keeps_default_session():
+    registry, _ = make_registry(max_sessions=3)
+
+    default = registry.get()
+    registry.get("cam-a")
+    registry.get("cam-b")
+    registry.get("cam-a")  # cam-b is now least recently used after default
+    registry.get("cam-c")
+
+    assert len(registry) == 3
+    assert "cam-b" not in registry
+    assert "cam-a" in registry and "cam-c" in registry
+    assert registry.get() is default
+    assert registry.get_stats()["evicted_sessions"] == 1
+
+
+def test_idle_sessions_expire(monkeypatch):
+    registry, _ = make_registry(idle_ttl_seconds=60)
+    clock = [1000.0]
+    monkeypatch.setattr("state_tracker.session_registry.time.monotonic", lambda: clock[0])
+
+    registry.get()
+    registry.get("cam-a")
+    clock[0] += 30
+    registry.get("cam-b")
+    clock[0] += 45
+
+    assert registry.evict_idle() == 1
+    assert "cam-a" not in registry
+    assert "cam-b" in registry and DEFAULT_SESSION_ID in registry
+
+
+class SlowClosingTracker(FakeTracker):
+    """Tracker whose close blocks until released, like a journal flush"""
+
+    release = threading.Event()
+    closed = []
+
+    def close(self):
+        self.release.wait(5)
+        self.closed.append(self.session_id)
+
+
+def test_eviction_does_not_wait_for_close():
+    SlowClosingTracker.release.clear()
+    SlowClosingTracker.closed.clear()
+    registry = StateTrackerRegistry(kb_factory=object, query_processor_factory=object,
+                                    tracker_factory=SlowClosingTracker, max_sessions=2)
+    registry.get()
+    registry.get("cam-a")
+
+    start = time.perf_counter()
+    registry.get("cam-b")
+    assert time.perf_counter() - start < 1.0
+    assert "cam-a" not in registry and SlowClosingTracker.closed == []
+
+    threading.Timer(0.1, SlowClosingTracker.release.set).start()
+    registry.get("cam-a")
+    assert "cam-a" in SlowClosingTracker.closed
+
+    registry.close()
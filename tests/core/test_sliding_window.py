@@ -0,0 +1,65 @@
+"""
+Ring-Buffer Sliding Window Tests
+
+Checks SlidingWindow and its use in StateTracker:
+1. Appending past capacity evicts the oldest record and keeps order
+2. The running memory total matches a full recomputation after evictions
+3. StateTracker keeps at most max_window_size records with interned task IDs
+"""
+
+import os
+import sys
+from datetime import datetime
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.sliding_window import SlidingWindow
+from state_tracker.state_tracker import StateTracker, StateRecord, OptimizedStateRecord
+
+
+def make_record(index, task_id="coffee_brewing"):
+    return OptimizedStateRecord(
+        timestamp=datetime.now(),
+        confidence=0.8,
+        task_id=task_id,
+        step_index=index
+    )
+
+
+def test_append_evicts_oldest_in_order():
+    window = SlidingWindow(3)
+
+    evicted = [window.append(make_record(i)) for i in range(5)]
+
+    assert [r.step_index for r in window] == [2, 3, 4]
+    assert [r.step_index if r else None for r in evicted] == [None, None, None, 0, 1]
+    assert window[0].step_index == 2 and window[-1].step_index == 4
+    assert [r.step_index for r in window.recent(2)] == [3, 4]
+
+
+def test_running_memory_total():
+    window = SlidingWindow(4)
+    for i in range(7):
+        window.append(make_record(i, task_id="task_" + "x" * i))
+    window.popleft(2)
+
+    assert len(window) == 2
+    assert window.memory_bytes == sum(r.get_memory_size() for r in window)
+
+
+def test_state_tracker_window_is_bounded():
+    tracker = StateTracker(rag_kb=object(), query_processor=object())
+
+    for i in range(tracker.max_window_size + 10):
+        task_id = "".join(["coffee", "_brewing"])  # Fresh string each time
+        tracker._add_to_sliding_window(StateRecord(
+            timestamp=datetime.now(), vlm_text="", matched_step=None,
+            confidence=0.8, task_id=task_id, step_index=i % 5
+        ))
+
+    records = list(tracker.sliding_window)
+    assert len(records) == tracker.max_window_size
+    assert tracker.cleanup_count == 10
+    assert all(r.task_id is records[0].task_id for r in records)
+    assert tracker.get_memory_stats().memory_usage_bytes == sum(r.get_memory_size() for r in records)
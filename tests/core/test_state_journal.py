@@ -0,0 +1,79 @@
+"""
+State Journal Tests
+
+Checks event-sourced persistence of StateTracker sessions:
+1. A torn tail record is ignored and earlier records are replayed
+2. A snapshot truncates the log; later events are replayed on top of it
+3. A new tracker on the same journal resumes the previous tracker's step
+4. Session IDs that sanitize to the same name get separate files
+"""
+
+import asyncio
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.state_journal import StateJournal, read_events
+from state_tracker.state_tracker import StateTracker
+
+
+def test_torn_tail_is_ignored(tmp_path):
+    journal = StateJournal(str(tmp_path), session_id="cam/1", flush_interval_ms=1)
+    for index in range(3):
+        journal.record("failure", {"index": index})
+    journal.close()
+
+    with open(journal.log_path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00garbage")
+
+    assert [data["index"] for _, data in read_events(journal.log_path)] == [0, 1, 2]
+    assert journal.log_path.name.startswith("cam_1-")
+
+
+def test_snapshot_truncates_log(tmp_path):
+    journal = StateJournal(str(tmp_path), snapshot_every=2, flush_interval_ms=1)
+    journal.record("failure", {})
+    journal.record("failure", {})
+    assert journal.snapshot_due
+    journal.snapshot({"counters": {"failure_count": 2}})
+    journal.record("clear", {})
+    journal.close()
+
+    snapshot, events = StateJournal(str(tmp_path)).load()
+    assert snapshot == {"counters": {"failure_count": 2}}
+    assert events == [("clear", {})]
+
+
+def test_tracker_resumes_from_journal(tmp_path, fake_knowledge_base):
+    journal = StateJournal(str(tmp_path), snapshot_every=3, flush_interval_ms=1)
+    tracker = StateTracker(rag_kb=fake_knowledge_base, query_processor=object(), journal=journal)
+    for step in (1, 2, 3):
+        assert asyncio.run(tracker.process_vlm_response(f"pouring water step {step}"))
+    tracker.close()
+
+    restored = StateTracker(rag_kb=fake_knowledge_base, query_processor=object(),
+                            journal=StateJournal(str(tmp_path)))
+    restored.close()
+
+    assert restored.current_state.task_id == "coffee_brewing"
+    assert restored.current_state.step_index == 3
+    assert [r.step_index for r in restored.sliding_window] == [1, 2, 3]
+    assert len(restored.processing_metrics) == 3
+
+
+def test_colliding_session_ids_get_separate_files(tmp_path):
+    slash = StateJournal(str(tmp_path), session_id="cam/1", flush_interval_ms=1)
+    underscore = StateJournal(str(tmp_path), session_id="cam_1", flush_interval_ms=1)
+    slash.record("failure", {"session": "cam/1"})
+    underscore.record("failure", {"session": "cam_1"})
+    slash.close()
+    underscore.close()
+
+    assert slash.log_path != underscore.log_path
+    assert slash.snapshot_path != underscore.snapshot_path
+    assert read_events(slash.log_path) == [("failure", {"session": "cam/1"})]
+    reopened = StateJournal(str(tmp_path), session_id="cam_1")
+    assert reopened.load()[1] == [("failure", {"session": "cam_1"})]
+    reopened.close()
@@ -0,0 +1,125 @@
+"""
+State Tracker Replay Tests
+
+Checks StateTracker.replay over a recorded transcript with a fake knowledge base:
+1. Observations are encoded in one batch and the live session state is untouched
+2. Replay decisions match the actions of process_vlm_response
+3. Threshold overrides change the decisions without re-encoding the transcript
+4. Replay quiets only its own thread's tracker logs and is not counted in
+   the knowledge base's search statistics
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from state_tracker.state_tracker import StateTracker
+
+
+class FakeKnowledgeBase:
+    """Matches "... step <id> <similarity>" observations and counts encoder calls"""
+
+    def __init__(self):
+        self.encode_calls = 0
+        self.embeddings_seen = []
+        self.record_stats_seen = []
+
+    def encode_observations(self, observations):
+        self.encode_calls += 1
+        return [[float(len(text))] for text in observations]
+
+    def find_matching_step(self, text, query_embedding=None, record_stats=True, **kwargs):
+        self.embeddings_seen.append(query_embedding)
+        self.record_stats_seen.append(record_stats)
+        *_, step_id, similarity = text.split()
+        return SimpleNamespace(
+            task_name="coffee_brewing", step_id=int(step_id), similarity=float(similarity),
+            step_title=f"Step {step_id}", step_description="", task_description="",
+            tools_needed=[], completion_indicators=[], visual_cues=[],
+            estimated_duration="", safety_notes=[], confidence_level="",
+            matched_cues=[], search_scope="global"
+        )
+
+
+TRANSCRIPT = [
+    "grinding beans step 1 0.90",
+    "",
+    "pouring water step 2 0.50",
+    "pouring water step 2 0.20",
+    "pouring water step 2 0.85",
+    "serving step 9 0.95",
+]
+
+
+def test_replay_batches_encoding_and_keeps_live_state():
+    kb = FakeKnowledgeBase()
+    tracker = StateTracker(rag_kb=kb, query_processor=object())
+
+    decisions = tracker.replay(TRANSCRIPT)
+
+    assert len(decisions) == len(TRANSCRIPT)
+    assert kb.encode_calls == 1
+    assert kb.embeddings_seen[0] == [float(len(TRANSCRIPT[0]))]
+    assert tracker.current_state is None
+    assert len(tracker.processing_metrics) == 0
+
+
+def test_replay_matches_process_vlm_response():
+    live = StateTracker(rag_kb=FakeKnowledgeBase(), query_processor=object())
+    for text in TRANSCRIPT:
+        asyncio.run(live.process_vlm_response(text))
+
+    decisions = StateTracker(rag_kb=FakeKnowledgeBase(), query_processor=object()).replay(TRANSCRIPT)
+
+    assert [d.action for d in decisions] == [m.action_taken.value for m in live.processing_metrics]
+    assert [d.action for d in decisions] == ["UPDATE", "IGNORE", "OBSERVE", "IGNORE", "UPDATE", "OBSERVE"]
+    assert decisions[-1].task_id == "coffee_brewing" and decisions[-1].step_index == 9
+
+
+def test_threshold_sweep_reuses_embeddings():
+    kb = FakeKnowledgeBase()
+    tracker = StateTracker(rag_kb=kb, query_processor=object())
+    embeddings = tracker.encode_replay(TRANSCRIPT)
+
+    default = tracker.replay(TRANSCRIPT, query_embeddings=embeddings)
+    lenient = tracker.replay(TRANSCRIPT, high_confidence_threshold=0.45, query_embeddings=embeddings)
+
+    assert kb.encode_calls == 1
+    assert embeddings[1] is None
+    assert default[2].action == "OBSERVE"
+    assert lenient[2].action == "UPDATE" and lenient[2].state_updated
+
+
+def test_replay_quiets_only_its_own_thread(caplog):
+    kb = FakeKnowledgeBase()
+    tracker_logger = logging.getLogger("state_tracker.state_tracker")
+    search = kb.find_matching_step
+
+    def logging_search(text, **kwargs):
+        tracker_logger.info("replay thread record")
+        other = threading.Thread(target=tracker_logger.info, args=("live thread record",))
+        other.start()
+        other.join()
+        return search(text, **kwargs)
+
+    kb.find_matching_step = logging_search
+    tracker = StateTracker(rag_kb=kb, query_processor=object())
+
+    with caplog.at_level(logging.INFO, logger="state_tracker.state_tracker"):
+        tracker.replay(TRANSCRIPT[:1])
+        messages = [record.getMessage() for record in caplog.records]
+        assert "live thread record" in messages
+        assert "replay thread record" not in messages
+
+        tracker_logger.info("after replay")
+        assert caplog.records[-1].getMessage() == "after replay"
+
+    assert logging.root.manager.disable == logging.NOTSET
+    assert kb.record_stats_seen == [False]
+
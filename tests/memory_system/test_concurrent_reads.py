@@ -0,0 +1,158 @@
+"""
+Concurrent Read Path Tests
+
+Verifies the lock-free query path of ChromaVectorSearchEngine:
+1. ThreadLocalCounters lose no increments across threads
+2. Reloading a task publishes a new snapshot without touching the old one
+3. Searches running while a task is re-indexed never fail and are all counted
+4. Shards of exited threads are folded into the totals and dropped
+5. A bulk load or full reload publishes a single snapshot and keeps its rows
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.thread_counters import ThreadLocalCounters
+from memory.rag.vector_search import ChromaVectorSearchEngine
+
+
+def make_task(title="Heat water", task_name="coffee_brewing"):
+    steps = [
+        TaskStep(
+            step_id=1,
+            title=title,
+            task_description=f"{title} in the kettle",
+            tools_needed=["kettle"],
+            completion_indicators=["steam rising"],
+            visual_cues=["kettle on stove"],
+            estimated_duration="4 minutes"
+        ),
+        TaskStep(
+            step_id=2,
+            title="Grind beans",
+            task_description="Grind the coffee beans",
+            tools_needed=["grinder"],
+            completion_indicators=["ground coffee"],
+            visual_cues=["grinder running"],
+            estimated_duration="1 minute"
+        )
+    ]
+    return TaskKnowledge(task_name=task_name, display_name="Coffee", description="Brew", steps=steps)
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = ChromaVectorSearchEngine(
+        persist_directory=str(tmp_path / "chromadb"),
+        encoder=HashingEncoder(dimension=64),
+        micro_batch_size=1
+    )
+    engine.add_task_knowledge(make_task())
+    return engine
+
+
+class TestConcurrentReads:
+    """Snapshots and counters"""
+
+    def test_counters_are_exact_under_threads(self):
+        counters = ThreadLocalCounters("searches", "time")
+
+        def work():
+            for _ in range(5000):
+                counters.add("searches")
+                counters.add("time", 0.5)
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counters.totals() == {"searches": 40000, "time": 20000.0}
+
+    def test_reload_publishes_new_snapshot(self, engine):
+        before = engine._snapshot
+        engine.add_task_knowledge(make_task(title="Boil water"))
+        after = engine._snapshot
+
+        assert after.version > before.version
+        assert before.step_table[before.doc_id("coffee_brewing", 1)][1].title == "Heat water"
+        assert after.step_table[after.doc_id("coffee_brewing", 1)][1].title == "Boil water"
+        assert len(before.lexical_index) == len(after.lexical_index) == 2
+        assert before.lexical_index.score(["heat"]) and not after.lexical_index.score(["heat"])
+
+    def test_searches_during_reloads(self, engine):
+        errors = []
+        stop = threading.Event()
+
+        def search():
+            try:
+                for _ in range(30):
+                    matches = engine.find_best_match("kettle on stove with steam", top_k=2)
+                    assert matches and matches[0].step_id in (1, 2)
+            except Exception as e:
+                errors.append(e)
+
+        def reload():
+            titles = ["Heat water", "Boil water"]
+            i = 0
+            while not stop.is_set():
+                engine.add_task_knowledge(make_task(title=titles[i % 2]))
+                i += 1
+
+        writer = threading.Thread(target=reload)
+        readers = [threading.Thread(target=search) for _ in range(4)]
+        writer.start()
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        stop.set()
+        writer.join()
+
+        assert errors == []
+        assert engine.get_performance_stats()["total_searches"] == 120
+
+    def test_counters_retire_exited_threads(self):
+        counters = ThreadLocalCounters("searches")
+
+        for _ in range(20):
+            thread = threading.Thread(target=counters.add, args=("searches",))
+            thread.start()
+            thread.join()
+        counters.add("searches")
+
+        assert counters.get("searches") == 21
+        assert counters.shard_count == 1
+        counters.reset()
+        assert counters.totals() == {"searches": 0}
+
+    def test_bulk_load_publishes_once(self, engine):
+        before = engine._snapshot
+        tasks = [make_task(task_name=f"task_{i}") for i in range(5)]
+
+        engine.add_tasks_knowledge(tasks)
+        after = engine._snapshot
+
+        assert after.version == before.version + 1
+        assert set(after.task_knowledge) == {"coffee_brewing"} | {task.task_name for task in tasks}
+        assert len(after.step_table) == 12
+
+        engine.reload_all_tasks()
+        reloaded = engine._snapshot
+
+        assert reloaded.version == after.version + 1
+        assert reloaded.task_rows == after.task_rows
+        assert engine.collection.count() == 12
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,228 @@
+"""
+Embedding Cache Invalidation Tests
+
+Verifies that the VectorOptimizer embedding cache is keyed by content:
+1. A warm restart with unchanged steps re-encodes nothing
+2. Editing one step re-encodes only that step
+3. Changing the encoder model version invalidates every cached vector
+4. Legacy (unkeyed) cache files are treated as stale
+5. Changed steps of several tasks are encoded in one call
+6. The knowledge base encodes a step once; a warm restart neither re-encodes nor upserts
+"""
+
+import os
+import pickle
+import sys
+import hashlib
+
+import numpy as np
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.knowledge_base import RAGKnowledgeBase
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.vector_optimizer import VectorOptimizer
+
+
+class FakeModel:
+    """Deterministic encoder that records every text it encodes"""
+
+    def __init__(self):
+        self.encoded_texts = []
+
+    def encode(self, documents, **kwargs):
+        self.encoded_texts.extend(documents)
+        return np.array([[float(len(doc)), 1.0] for doc in documents])
+
+
+class FakeVectorEngine:
+    """Minimal stand-in for ChromaVectorSearchEngine used by the optimizer"""
+
+    def __init__(self, model_version: str = "v1"):
+        self.model = FakeModel()
+        self.model_name = "fake-model"
+        self.model_version = model_version
+
+    def compute_embedding_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}|{self.model_version}|{text}".encode()).hexdigest()
+
+    def _create_step_text_for_embedding(self, step: TaskStep) -> str:
+        return " ".join([step.task_description, step.title] + step.visual_cues)
+
+    def add_task_knowledge(self, task):
+        pass
+
+
+def make_task(step_descriptions):
+    steps = [
+        TaskStep(
+            step_id=i + 1,
+            title=f"Step {i + 1}",
+            task_description=description,
+            tools_needed=["kettle"],
+            completion_indicators=["done"],
+            visual_cues=["kettle"],
+            estimated_duration="1 minute"
+        )
+        for i, description in enumerate(step_descriptions)
+    ]
+    return TaskKnowledge(
+        task_name="coffee_brewing",
+        display_name="Coffee Brewing",
+        description="Brew coffee",
+        steps=steps
+    )
+
+
+class TestContentKeyedEmbeddingCache:
+    """Content-hash keyed cache behaviour"""
+
+    def test_warm_restart_reuses_all_embeddings(self, tmp_path):
+        task = make_task(["Heat water", "Grind beans", "Pour water"])
+
+        first = VectorOptimizer(FakeVectorEngine(), cache_dir=str(tmp_path))
+        first.precompute_all_embeddings({task.task_name: task})
+        assert len(first.vector_engine.model.encoded_texts) == 3
+
+        second = VectorOptimizer(FakeVectorEngine(), cache_dir=str(tmp_path))
+        second.precompute_all_embeddings({task.task_name: task})
+        assert second.vector_engine.model.encoded_texts == []
+        assert second.stats.reused_embeddings == 3
+        assert second.get_cached_embedding(task.task_name, 2) is not None
+
+    def test_only_changed_step_is_reencoded(self, tmp_path):
+        original = make_task(["Heat water", "Grind beans", "Pour water"])
+        VectorOptimizer(FakeVectorEngine(), cache_dir=str(tmp_path)).precompute_all_embeddings(
+            {original.task_name: original}
+        )
+
+        edited = make_task(["Heat water", "Grind beans finely", "Pour water"])
+        optimizer = VectorOptimizer(FakeVectorEngine(), cache_dir=str(tmp_path))
+        optimizer.precompute_all_embeddings({edited.task_name: edited})
+
+        encoded = optimizer.vector_engine.model.encoded_texts
+        assert len(encoded) == 1
+        assert "Grind beans finely" in encoded[0]
+        assert optimizer.stats.reencoded_embeddings == 1
+
+    def test_model_version_change_invalidates_cache(self, tmp_path):
+        task = make_task(["Heat water", "Grind beans"])
+        VectorOptimizer(FakeVectorEngine("v1"), cache_dir=str(tmp_path)).precompute_all_embeddings(
+            {task.task_name: task}
+        )
+
+        optimizer = VectorOptimizer(FakeVectorEngine("v2"), cache_dir=str(tmp_path))
+        optimizer.precompute_all_embeddings({task.task_name: task})
+        assert len(optimizer.vector_engine.model.encoded_texts) == 2
+
+    def test_legacy_cache_file_is_treated_as_stale(self, tmp_path):
+        task = make_task(["Heat water"])
+        legacy_file = tmp_path / f"{task.task_name}_embeddings.pkl"
+        with open(legacy_file, 'wb') as f:
+            pickle.dump({1: np.zeros(2)}, f)
+
+        optimizer = VectorOptimizer(FakeVectorEngine(), cache_dir=str(tmp_path))
+        optimizer.precompute_all_embeddings({task.task_name: task})
+        assert len(optimizer.vector_engine.model.encoded_texts) == 1
+
+    def test_changed_steps_across_tasks_share_one_encode_call(self, tmp_path):
+        engine = FakeVectorEngine()
+        calls = []
+        original_encode = engine.model.encode
+        engine.model.encode = lambda documents, **kwargs: calls.append(len(documents)) or original_encode(documents)
+
+        first = make_task(["Heat water", "Grind beans"])
+        second = make_task(["Boil eggs", "Peel eggs", "Slice eggs"])
+        second.task_name = "egg_salad"
+
+        optimizer = VectorOptimizer(engine, cache_dir=str(tmp_path))
+        optimizer.precompute_all_embeddings({first.task_name: first, second.task_name: second})
+
+        assert calls == [5]
+        assert optimizer.last_precompute_timings["reencoded_steps"] == 5
+        assert (tmp_path / "egg_salad_embeddings.pkl").exists()
+
+
+TASK_YAML = """task_name: coffee_brewing
+display_name: Coffee Brewing
+description: Brew pour-over coffee
+steps:
+  - step_id: 1
+    title: Heat water
+    task_description: Heat water in the kettle
+    tools_needed: [kettle]
+    completion_indicators: [steam rising]
+    visual_cues: [kettle on stove]
+    estimated_duration: 4 minutes
+  - step_id: 2
+    title: Grind beans
+    task_description: Grind the coffee beans
+    tools_needed: [grinder]
+    completion_indicators: [ground coffee]
+    visual_cues: [grinder running]
+    estimated_duration: 1 minute
+"""
+
+
+class CountingEncoder(HashingEncoder):
+    """Hashing encoder recording every text it encodes"""
+
+    def __init__(self):
+        super().__init__(dimension=32)
+        self.encoded_texts = []
+
+    def _encode_batch(self, texts):
+        self.encoded_texts.extend(texts)
+        return super()._encode_batch(texts)
+
+
+class CountingCollection:
+    """ChromaDB collection proxy counting upserted rows"""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.upserted_ids = []
+
+    def upsert(self, ids, **kwargs):
+        self.upserted_ids.extend(ids)
+        return self._collection.upsert(ids=ids, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._collection, name)
+
+
+def make_knowledge_base(tmp_path):
+    encoder = CountingEncoder()
+    knowledge_base = RAGKnowledgeBase(
+        tasks_directory=str(tmp_path / "tasks"),
+        cache_dir=str(tmp_path / "embeddings"),
+        encoder=encoder
+    )
+    collection = CountingCollection(knowledge_base.vector_engine.collection)
+    knowledge_base.vector_engine.collection = collection
+    knowledge_base.initialize()
+    return knowledge_base, encoder, collection
+
+
+class TestKnowledgeBaseEncodesOnce:
+    """Optimizer and vector index share one set of step embeddings"""
+
+    def test_steps_encoded_once_and_warm_restart_skips_upsert(self, tmp_path):
+        (tmp_path / "tasks").mkdir()
+        (tmp_path / "tasks" / "coffee_brewing.yaml").write_text(TASK_YAML, encoding='utf-8')
+
+        _, encoder, collection = make_knowledge_base(tmp_path)
+        assert len(encoder.encoded_texts) == 2
+        assert len(set(encoder.encoded_texts)) == 2
+        assert len(collection.upserted_ids) == 2
+
+        _, encoder, collection = make_knowledge_base(tmp_path)
+        assert encoder.encoded_texts == []
+        assert collection.upserted_ids == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
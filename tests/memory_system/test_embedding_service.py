@@ -0,0 +1,177 @@
+"""
+Embedding Service Tests
+
+Runs the shared embedding service on a free localhost port in front of a
+fake knowledge base and checks that:
+1. RemoteVectorSearchEngine resolves remote hits to local TaskStep data
+2. A batched search encodes all observations in one encoder call
+3. Service failures degrade to empty results instead of raising
+4. Concurrent single-query searches share service requests
+5. A locality-first search that widens is one request and one encode
+"""
+
+import os
+import sys
+import threading
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.embedding_service import EmbeddingService, RemoteVectorSearchEngine
+from memory.rag.encoders import HashingEncoder
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.vector_search import MatchResult
+
+
+def make_task():
+    steps = [
+        TaskStep(
+            step_id=step_id,
+            title=title,
+            task_description=title,
+            tools_needed=["kettle"],
+            completion_indicators=["done"],
+            visual_cues=[cue],
+            estimated_duration="1 minute"
+        )
+        for step_id, title, cue in [(1, "Heat water", "kettle, steaming"), (2, "Grind beans", "grinder")]
+    ]
+    return TaskKnowledge(task_name="coffee_brewing", display_name="Coffee", description="Brew", steps=steps)
+
+
+class CountingEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(dimension=32)
+        self.calls = []
+
+    def _encode_batch(self, texts):
+        self.calls.append(list(texts))
+        return super()._encode_batch(texts)
+
+
+class FakeVectorEngine:
+    """Scores steps by the first embedding component; enough to exercise the wire format"""
+
+    def __init__(self, task):
+        self.model = CountingEncoder()
+        self.model_name = self.model.name
+        self.model_version = self.model.version
+        self.task = task
+        self.queries = []
+
+    def find_best_match(self, observation, task_name=None, top_k=1, observation_id=None,
+                        step_ids=None, query_embedding=None):
+        self.queries.append((observation, query_embedding is not None))
+        step = self.task.steps[0] if "kettle" in observation else self.task.steps[1]
+        if step_ids and step.step_id not in step_ids:
+            return []
+        return [MatchResult(
+            step_id=step.step_id, task_description="", tools_needed=[], completion_indicators=[],
+            visual_cues=[], estimated_duration="", safety_notes=[], similarity=0.8,
+            confidence_level="", matched_cues=step.visual_cues, task_name=self.task.task_name,
+            dense_similarity=0.75, lexical_score=1.5
+        )][:top_k]
+
+    def find_best_match_local_first(self, observation, task_name, step_ids, threshold, top_k=5,
+                                    observation_id=None, query_embedding=None):
+        matches = self.find_best_match(observation, task_name, top_k, observation_id, step_ids, query_embedding)
+        if matches and matches[0].similarity >= threshold:
+            return matches, False
+        return self.find_best_match(observation, None, top_k, observation_id, None, query_embedding), True
+
+
+class FakeKnowledgeBase:
+    def __init__(self, task):
+        self.vector_engine = FakeVectorEngine(task)
+        self.loaded_tasks = {task.task_name: task}
+
+    def get_system_stats(self):
+        return {"knowledge_base": {"total_tasks": 1}}
+
+
+@pytest.fixture
+def service():
+    service = EmbeddingService(FakeKnowledgeBase(make_task()), port=0)
+    service.start()
+    yield service
+    service.stop()
+
+
+class TestEmbeddingService:
+    """Client/server round trips"""
+
+    def test_remote_results_use_local_step_data(self, service):
+        engine = RemoteVectorSearchEngine(service.url)
+        engine.add_task_knowledge(make_task())
+
+        match = engine.find_best_match("kettle on the stove", task_name="coffee_brewing")[0]
+
+        assert match.step_id == 1
+        assert match.tools_needed == ["kettle"]
+        assert match.matched_cues == ["kettle, steaming"]
+        assert match.confidence_level == "high"
+        assert engine.model_version == service.knowledge_base.vector_engine.model_version
+
+    def test_batched_search_encodes_once(self, service):
+        engine = RemoteVectorSearchEngine(service.url)
+        engine.add_task_knowledge(make_task())
+
+        results = engine.find_best_matches([
+            {"observation": "kettle steaming", "top_k": 1},
+            {"observation": "grinder running", "top_k": 1},
+            {"observation": "kettle again", "top_k": 1, "embedding": [0.0] * 32},
+        ])
+
+        assert [[match.step_id for match in matches] for matches in results] == [[1], [2], [1]]
+        assert service.knowledge_base.vector_engine.model.calls == [["kettle steaming", "grinder running"]]
+        assert service.stats()["service"] == {"requests": 1, "queries": 3}
+
+    def test_remote_encoder_round_trip(self, service):
+        engine = RemoteVectorSearchEngine(service.url)
+
+        assert engine.model.encode(["a", "b", "c"]).shape == (3, 32)
+
+    def test_unreachable_service_returns_empty_results(self, service):
+        engine = RemoteVectorSearchEngine(service.url)
+        engine.add_task_knowledge(make_task())
+        service.stop()
+        engine.client._local.connection = None
+        engine.client.port = 1  # nothing listens here
+
+        assert engine.find_best_match("kettle on the stove") == []
+
+    def test_concurrent_single_searches_share_requests(self, service):
+        engine = RemoteVectorSearchEngine(service.url, micro_batch_wait_ms=200.0)
+        engine.add_task_knowledge(make_task())
+        barrier = threading.Barrier(6)
+        results = []
+
+        def search(observation):
+            barrier.wait()
+            results.append(engine.find_best_match(observation)[0].step_id)
+
+        threads = [threading.Thread(target=search, args=(f"kettle {i}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results == [1] * 6
+        assert service.stats()["service"]["requests"] < 6
+        assert engine.get_performance_stats()["search_batcher"]["requests"] == 6
+
+    def test_widened_locality_search_is_one_request(self, service):
+        engine = RemoteVectorSearchEngine(service.url)
+        engine.add_task_knowledge(make_task())
+
+        matches, widened = engine.find_best_match_local_first("kettle steaming", "coffee_brewing", [2], 0.5)
+
+        assert widened and matches[0].step_id == 1
+        assert service.stats()["service"] == {"requests": 1, "queries": 1}
+        assert service.knowledge_base.vector_engine.model.calls == [["kettle steaming"]]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,197 @@
+"""
+Encode Micro-Batcher Tests
+
+Checks that EncodeBatcher:
+1. Coalesces concurrent single-text requests into batched encoder calls
+2. Returns each caller the same vector a direct encode would
+3. Reports queue times and propagates encoder failures to every caller
+4. A lone caller is flushed at once instead of waiting max_wait_ms
+5. Shutting down the knowledge base stops the batcher thread
+6. Without a batcher, async encoding runs off the event loop
+7. A cancelled caller or a short encoder result does not stop the worker
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encode_batcher import EncodeBatcher
+from memory.rag.encoders import HashingEncoder
+from memory.rag.knowledge_base import RAGKnowledgeBase
+from memory.rag.vector_search import ChromaVectorSearchEngine
+
+
+class RecordingEncoder(HashingEncoder):
+    def __init__(self, fail=False):
+        super().__init__(dimension=32)
+        self.batch_sizes = []
+        self.fail = fail
+
+    def _encode_batch(self, texts):
+        self.batch_sizes.append(len(texts))
+        if self.fail:
+            raise RuntimeError("encoder down")
+        return super()._encode_batch(texts)
+
+
+@pytest.fixture
+def encoder():
+    return RecordingEncoder()
+
+
+class TestEncodeBatcher:
+    """Batching behaviour"""
+
+    def test_concurrent_requests_share_encoder_calls(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=50.0)
+        texts = [f"observation {i} with kettle" for i in range(16)]
+        results = [None] * len(texts)
+        start = threading.Barrier(len(texts))
+
+        def worker(i):
+            start.wait()
+            results[i] = batcher.encode(texts[i])
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(texts))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        batcher.close()
+
+        assert len(encoder.batch_sizes) < len(texts)
+        assert max(encoder.batch_sizes) <= 8
+        for text, result in zip(texts, results):
+            np.testing.assert_allclose(result, HashingEncoder(32).encode(text))
+
+        stats = batcher.get_stats()
+        assert stats["requests"] == 16
+        assert stats["batches"] == len(encoder.batch_sizes)
+        assert stats["queue_time_ms"]["max"] >= stats["queue_time_ms"]["p50"] >= 0.0
+
+    def test_async_encode(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=4, max_wait_ms=20.0)
+
+        async def run():
+            return await asyncio.gather(*(batcher.encode_async(f"text {i}") for i in range(4)))
+
+        results = asyncio.run(run())
+        batcher.close()
+
+        assert len(results) == 4
+        assert encoder.batch_sizes == [4]
+
+    def test_encoder_failure_reaches_every_caller(self):
+        batcher = EncodeBatcher(RecordingEncoder(fail=True), max_batch_size=4, max_wait_ms=20.0)
+        futures = [batcher.submit(f"text {i}") for i in range(3)]
+
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        batcher.close()
+
+
+class SlowEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(dimension=32)
+
+    def _encode_batch(self, texts):
+        time.sleep(0.2)
+        return super()._encode_batch(texts)
+
+
+class ShortEncoder(HashingEncoder):
+    def __init__(self):
+        super().__init__(dimension=32)
+
+    def _encode_batch(self, texts):
+        return super()._encode_batch(texts)[:1]
+
+
+class TestBatcherLifecycle:
+    """Adaptive flushing, shutdown and the unbatched async path"""
+
+    def test_lone_caller_is_not_held_for_the_window(self, encoder):
+        batcher = EncodeBatcher(encoder, max_batch_size=8, max_wait_ms=1000.0)
+
+        start = time.perf_counter()
+        for i in range(3):
+            batcher.encode(f"text {i}")
+        elapsed = time.perf_counter() - start
+        batcher.close()
+
+        assert elapsed < 1.0
+        assert encoder.batch_sizes == [1, 1, 1]
+        assert batcher.get_stats()["concurrency"] == 0.0
+
+    def test_knowledge_base_shutdown_closes_batcher(self, tmp_path):
+        knowledge_base = RAGKnowledgeBase(
+            tasks_directory=str(tmp_path),
+            cache_dir=str(tmp_path / "embeddings"),
+            encoder=HashingEncoder(dimension=32)
+        )
+        batcher = knowledge_base.vector_engine.encode_batcher
+        assert batcher is not None
+
+        knowledge_base.shutdown()
+
+        assert not batcher._thread.is_alive()
+        with pytest.raises(RuntimeError):
+            batcher.encode("after shutdown")
+
+    def test_unbatched_async_encode_does_not_block_loop(self, tmp_path):
+        engine = ChromaVectorSearchEngine(
+            persist_directory=str(tmp_path / "chromadb"), encoder=SlowEncoder(), micro_batch_size=1
+        )
+        ticks = []
+
+        async def ticker():
+            for _ in range(5):
+                ticks.append(time.perf_counter())
+                await asyncio.sleep(0.01)
+
+        async def run():
+            embedding, _ = await asyncio.gather(engine.encode_observation_async("kettle"), ticker())
+            return embedding
+
+        assert len(asyncio.run(run())) == 32
+        assert len(ticks) == 5 and ticks[-1] - ticks[0] < 0.15
+
+
+    def test_cancelled_caller_does_not_stop_worker(self):
+        batcher = EncodeBatcher(SlowEncoder(), max_batch_size=4, max_wait_ms=1.0)
+        busy = batcher.submit("occupies the worker")
+
+        async def give_up():
+            with pytest.raises(asyncio.TimeoutError):
+                await asyncio.wait_for(batcher.encode_async("cancelled while queued"), timeout=0.05)
+
+        asyncio.run(give_up())
+        busy.result(timeout=5)
+
+        assert len(batcher.encode("later request", timeout=5)) == 32
+        assert batcher._thread.is_alive()
+        batcher.close()
+
+    def test_short_encoder_result_fails_leftover_callers(self):
+        batcher = EncodeBatcher(ShortEncoder(), max_batch_size=4, max_wait_ms=50.0)
+        futures = [batcher.submit(f"text {i}") for i in range(3)]
+
+        assert len(futures[0].result(timeout=5)) == 32
+        for future in futures[1:]:
+            with pytest.raises(RuntimeError):
+                future.result(timeout=5)
+        assert batcher._thread.is_alive()
+        batcher.close()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,91 @@
+"""
+Encoder Backend Tests
+
+Verifies the pluggable embedding encoders:
+1. The hashing encoder follows the SentenceTransformer encode convention
+2. create_encoder selects backends from config and rejects unknown ones
+3. The embedding cache key changes with the encoder backend and normalization
+"""
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder, create_encoder, load_rag_config
+from memory.rag.vector_search import ChromaVectorSearchEngine
+
+
+class TestHashingEncoder:
+    """Dependency-free test encoder"""
+
+    def test_single_text_and_batch_shapes(self):
+        encoder = HashingEncoder(dimension=64)
+
+        assert encoder.encode("kettle on the stove").shape == (64,)
+        assert encoder.encode(["kettle", "grinder", "mug"], batch_size=2).shape == (3, 64)
+
+    def test_vectors_are_normalized_and_deterministic(self):
+        first = HashingEncoder(dimension=64).encode(["grinding coffee beans"])
+        second = HashingEncoder(dimension=64).encode(["grinding coffee beans"])
+
+        np.testing.assert_allclose(first, second)
+        assert np.linalg.norm(first[0]) == pytest.approx(1.0)
+
+    def test_shared_words_score_higher(self):
+        encoder = HashingEncoder(dimension=256)
+        query, related, unrelated = encoder.encode(["kettle heating water", "heat water in kettle", "grind beans"])
+
+        assert query @ related > query @ unrelated
+
+
+class TestCreateEncoder:
+    """Config-driven backend selection"""
+
+    def test_hashing_backend_from_config(self):
+        encoder = create_encoder({"backend": "hashing", "hashing": {"dimension": 32}})
+
+        assert isinstance(encoder, HashingEncoder)
+        assert encoder.dimension == 32
+
+    def test_unknown_backend_raises(self):
+        with pytest.raises(ValueError):
+            create_encoder({"backend": "does-not-exist"})
+
+    def test_missing_onnx_model_raises(self, tmp_path):
+        pytest.importorskip("onnxruntime")
+        with pytest.raises(FileNotFoundError):
+            create_encoder({"backend": "onnx", "onnx": {"model_path": str(tmp_path)}})
+
+    def test_shipped_config_selects_a_known_backend(self):
+        config = load_rag_config()
+
+        assert config["encoder"]["backend"] in ("sentence_transformers", "onnx", "hashing")
+
+
+class RenormalizedEncoder(HashingEncoder):
+    normalization = "l2-v2"
+
+
+class OtherBackendEncoder(HashingEncoder):
+    backend = "onnx"
+
+
+def test_cache_key_covers_backend_and_normalization(tmp_path):
+    keys = set()
+    for i, encoder in enumerate([HashingEncoder(64), RenormalizedEncoder(64), OtherBackendEncoder(64)]):
+        engine = ChromaVectorSearchEngine(
+            persist_directory=str(tmp_path / f"chromadb_{i}"), encoder=encoder, micro_batch_size=1
+        )
+        assert encoder.backend in engine.model_version and encoder.normalization in engine.model_version
+        keys.add(engine.compute_embedding_key("heat water in the kettle"))
+
+    assert len(keys) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,111 @@
+"""
+Lexical Index Tests
+
+Verifies the BM25 inverted index used for hybrid step matching:
+1. Exact keyword hits rank the step that mentions them first
+2. Matched cues come from token-set intersection, not substrings
+3. Re-indexing and removal keep postings consistent
+4. A keyword hit ranked below the dense candidate pool is still fused and returned
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.lexical_index import LexicalIndex, tokenize
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.vector_search import ChromaVectorSearchEngine
+
+
+def make_step(step_id, title, visual_cues, tools_needed):
+    return TaskStep(
+        step_id=step_id,
+        title=title,
+        task_description=title,
+        tools_needed=tools_needed,
+        completion_indicators=["done"],
+        visual_cues=visual_cues,
+        estimated_duration="1 minute"
+    )
+
+
+@pytest.fixture
+def index():
+    index = LexicalIndex()
+    index.add_step("coffee_step_1", make_step(1, "Heat water", ["kettle on stove", "steam"], ["kettle"]))
+    index.add_step("coffee_step_2", make_step(2, "Grind beans", ["coffee grinder", "ground coffee"], ["grinder", "scale"]))
+    index.add_step("coffee_step_3", make_step(3, "Tamp grounds", ["portafilter, tamped", "tamper"], ["portafilter", "tamper"]))
+    return index
+
+
+class TestLexicalIndex:
+    """BM25 scoring and cue matching"""
+
+    def test_tokenize_drops_stopwords_and_folds_plurals(self):
+        assert tokenize("The beans and the grinders") == ["bean", "grinder"]
+
+    def test_exact_keyword_ranks_matching_step_first(self, index):
+        scores = index.score(tokenize("hand holding a portafilter"))
+        assert max(scores, key=scores.get) == "coffee_step_3"
+        assert "coffee_step_1" not in scores
+
+    def test_score_respects_candidate_restriction(self, index):
+        scores = index.score(tokenize("grinder and kettle"), doc_ids=["coffee_step_1"])
+        assert list(scores) == ["coffee_step_1"]
+
+    def test_matched_cues_use_token_intersection(self, index):
+        query = set(tokenize("tamped portafilter on the counter"))
+        assert index.matched_cues("coffee_step_3", query) == ["portafilter, tamped"]
+        # "steam" must not match "steamed" style substrings of other words
+        assert index.matched_cues("coffee_step_1", set(tokenize("steamer basket"))) == []
+
+    def test_reindex_and_remove_keep_postings_consistent(self, index):
+        index.add_step("coffee_step_2", make_step(2, "Weigh beans", ["scale display"], ["scale"]))
+        assert "coffee_step_2" not in index.postings.get("grinder", {})
+        assert len(index) == 3
+
+        index.remove("coffee_step_3")
+        assert "portafilter" not in index.postings
+        assert len(index) == 2
+        assert index.total_length == sum(index.doc_lengths.values())
+
+
+def test_lexical_candidates_outside_dense_pool_are_fused(tmp_path):
+    engine = ChromaVectorSearchEngine(
+        persist_directory=str(tmp_path / "chromadb"),
+        encoder=HashingEncoder(dimension=256),
+        lexical_weight=0.9,
+        lexical_saturation=0.5,
+        micro_batch_size=1
+    )
+    # Ten generic steps out-rank the keyword step on dense similarity alone
+    steps = [
+        TaskStep(step_id=i, title=f"Stage {i}", task_description="hands working near the counter top",
+                 tools_needed=[], completion_indicators=[], visual_cues=[], estimated_duration="1 minute")
+        for i in range(1, 11)
+    ]
+    steps.append(TaskStep(step_id=11, title="Lock portafilter", task_description="attach group handle",
+                          tools_needed=["portafilter"], completion_indicators=[],
+                          visual_cues=["portafilter locked"], estimated_duration="1 minute"))
+    engine.add_task_knowledge(TaskKnowledge(task_name="espresso", display_name="Espresso",
+                                            description="Pull a shot", steps=steps))
+    observation = "hands working near the counter with the portafilter"
+
+    dense_pool = engine.collection.query(
+        query_embeddings=[engine.encode_observation(observation)],
+        n_results=engine.candidate_pool_size, include=["distances"]
+    )["ids"][0]
+    assert engine._snapshot.doc_id("espresso", 11) not in dense_pool
+
+    match = engine.find_best_match(observation)[0]
+    assert match.step_id == 11
+    assert match.matched_cues == ["portafilter locked"]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,109 @@
+"""
+Locality-First Search Tests
+
+Verifies RAGKnowledgeBase.find_matching_step scoping with a hashing encoder:
+1. A good match among the neighbouring steps is returned from the local search
+2. A weak local best widens the search to the full index
+3. Without a current position the search is global
+4. Step 0 (before the first step) is a valid current position
+5. Searches made with record_stats=False are not counted
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.knowledge_base import RAGKnowledgeBase
+
+STEP_TEMPLATE = """  - step_id: {step_id}
+    title: {title}
+    task_description: {title} for the coffee
+    tools_needed: [{tool}]
+    completion_indicators: [{title} done]
+    visual_cues: [{tool} in use]
+    estimated_duration: 1 minute
+"""
+
+STEPS = [
+    (1, "Gather supplies", "counter"),
+    (2, "Heat water", "kettle"),
+    (3, "Grind beans", "grinder"),
+    (4, "Rinse filter", "dripper"),
+    (5, "Serve cup", "mug"),
+]
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    tasks_directory = tmp_path / "tasks"
+    tasks_directory.mkdir()
+    steps = "".join(STEP_TEMPLATE.format(step_id=step_id, title=title, tool=tool) for step_id, title, tool in STEPS)
+    (tasks_directory / "coffee_brewing.yaml").write_text(
+        "task_name: coffee_brewing\ndisplay_name: Coffee\ndescription: Brew coffee\nsteps:\n" + steps,
+        encoding='utf-8'
+    )
+    knowledge_base = RAGKnowledgeBase(
+        tasks_directory=str(tasks_directory),
+        cache_dir=str(tmp_path / "embeddings"),
+        encoder=HashingEncoder(dimension=256)
+    )
+    knowledge_base.initialize()
+    return knowledge_base
+
+
+def scope_counts(knowledge_base):
+    return knowledge_base.get_system_stats()["locality_search"]
+
+
+class TestLocalitySearch:
+    """local -> widened -> global escalation"""
+
+    def test_neighbouring_step_is_found_locally(self, knowledge_base):
+        match = knowledge_base.find_matching_step(
+            "grinder in use, grind beans", current_task="coffee_brewing", current_step=2, locality_threshold=0.1
+        )
+
+        assert match.step_id == 3
+        assert match.search_scope == "local"
+        assert scope_counts(knowledge_base)["local"] == 1
+
+    def test_weak_local_match_widens_to_full_index(self, knowledge_base):
+        match = knowledge_base.find_matching_step(
+            "serve cup, mug in use", current_task="coffee_brewing", current_step=1, locality_threshold=0.99
+        )
+
+        assert match.step_id == 5
+        assert match.search_scope == "widened"
+        assert scope_counts(knowledge_base)["widened"] == 1
+        assert scope_counts(knowledge_base)["global"] == 0
+
+    def test_search_without_position_is_global(self, knowledge_base):
+        match = knowledge_base.find_matching_step("serve cup, mug in use")
+
+        assert match.step_id == 5
+        assert match.search_scope == "global"
+        assert scope_counts(knowledge_base)["global"] == 1
+
+    def test_step_zero_uses_locality(self, knowledge_base):
+        match = knowledge_base.find_matching_step(
+            "gather supplies on the counter", current_task="coffee_brewing", current_step=0, locality_threshold=0.1
+        )
+
+        assert match.step_id == 1
+        assert match.search_scope == "local"
+
+    def test_unrecorded_searches_are_not_counted(self, knowledge_base):
+        knowledge_base.find_matching_step(
+            "grinder in use, grind beans", current_task="coffee_brewing", current_step=2,
+            locality_threshold=0.1, record_stats=False
+        )
+        knowledge_base.find_matching_step("serve cup, mug in use", record_stats=False)
+        knowledge_base.score_task_steps("grind beans", "coffee_brewing", record_stats=False)
+
+        counts = scope_counts(knowledge_base)
+        assert [counts[scope] for scope in ("local", "widened", "global", "decoded")] == [0, 0, 0, 0]
@@ -0,0 +1,114 @@
+"""
+Performance Regression Tests
+
+Checks the regression tooling in performance_tester.py:
+1. latency_summary reports nearest-rank percentiles
+2. compare_to_baseline flags slowdowns beyond tolerance and ignores noise
+3. A regression run against a fake knowledge base round-trips through a
+   JSON baseline and passes against itself
+4. The latency profile times an untraced pass and measures memory separately
+"""
+
+import os
+import sys
+import tracemalloc
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.performance_tester import (
+    PerformanceTester, compare_to_baseline, latency_summary, load_baseline, save_baseline
+)
+
+
+class FakeVectorEngine:
+    def __init__(self):
+        self.model = HashingEncoder(dimension=32)
+        self.model_name = self.model.name
+
+    def encode_observation(self, observation):
+        return self.model.encode(observation).tolist()
+
+    def find_best_match(self, observation, task_name=None, top_k=1, query_embedding=None, **kwargs):
+        return []
+
+
+class FakeKnowledgeBase:
+    def __init__(self):
+        self.vector_engine = FakeVectorEngine()
+        self.loaded_tasks = {}
+
+    def find_matching_step(self, observation, **kwargs):
+        self.vector_engine.find_best_match(observation, query_embedding=self.vector_engine.encode_observation(observation))
+        return None
+
+
+def make_results(total_p95=10.0, throughput=100.0):
+    return {
+        "latency": {"total_ms": {"p50": 5.0, "p95": total_p95, "p99": 12.0}},
+        "memory": {"python_peak_kb": 100.0},
+        "concurrency": {"1": {"throughput_per_second": throughput}}
+    }
+
+
+class TestRegressionTooling:
+    """Percentiles, baselines and comparison"""
+
+    def test_latency_summary_percentiles(self):
+        summary = latency_summary([float(value) for value in range(1, 101)])
+
+        assert summary["p50"] == 51.0
+        assert summary["p95"] == 95.0
+        assert summary["p99"] == 99.0
+        assert summary["max"] == 100.0
+        assert latency_summary([])["p99"] == 0.0
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = make_results()
+
+        assert compare_to_baseline(make_results(total_p95=11.5), baseline, tolerance=0.2)["passed"]
+
+        slower = compare_to_baseline(make_results(total_p95=20.0, throughput=50.0), baseline, tolerance=0.2)
+        assert not slower["passed"]
+        assert {r["metric"] for r in slower["regressions"]} == {
+            "latency.total_ms.p95", "concurrency.1.throughput_per_second"
+        }
+
+        # Large relative change below the absolute noise floor is ignored
+        fast, jittery = make_results(), make_results()
+        fast["latency"]["total_ms"]["p50"] = 0.1
+        jittery["latency"]["total_ms"]["p50"] = 0.4
+        assert compare_to_baseline(jittery, fast, tolerance=0.2)["passed"]
+
+    def test_regression_suite_round_trips_baseline(self, tmp_path):
+        tester = PerformanceTester(FakeKnowledgeBase())
+        results = tester.run_regression_suite(num_searches=20, levels=(1, 2), searches_per_level=8)
+
+        assert set(results["latency"]) == {"embed_ms", "search_ms", "total_ms"}
+        assert set(results["concurrency"]) == {"1", "2"}
+        assert results["memory"]["python_peak_kb"] >= 0
+
+        path = save_baseline(results, tmp_path / "baseline.json")
+        baseline = load_baseline(path)
+        assert baseline["metadata"]["encoder_backend"] == "hashing"
+        assert compare_to_baseline(results, baseline)["passed"]
+
+    def test_latency_profile_times_without_tracemalloc(self):
+        knowledge_base = FakeKnowledgeBase()
+        engine = knowledge_base.vector_engine
+        traced = []
+        engine.find_best_match = lambda observation, **kwargs: traced.append(tracemalloc.is_tracing()) or []
+
+        result = PerformanceTester(knowledge_base).run_latency_profile(num_searches=10, warmup=0)
+
+        assert traced == [False] * 10 + [True] * 10
+        assert len(result["latency"]["total_ms"]) > 0
+        assert result["memory"]["python_peak_kb"] >= 0
+        assert not tracemalloc.is_tracing()
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,57 @@
+"""
+Step Table Tests
+
+Verifies that search results are built from the typed step table rather
+than from ChromaDB metadata strings:
+1. A visual cue containing a comma comes back as one cue
+2. List fields of a result are the step's own lists, not re-parsed copies
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.encoders import HashingEncoder
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.vector_search import ChromaVectorSearchEngine
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = ChromaVectorSearchEngine(
+        persist_directory=str(tmp_path / "chromadb"),
+        encoder=HashingEncoder(dimension=64),
+        micro_batch_size=1
+    )
+    step = TaskStep(
+        step_id=1,
+        title="Heat water",
+        task_description="Heat water in the kettle",
+        tools_needed=["kettle, electric", "thermometer"],
+        completion_indicators=["steam rising, whistle"],
+        visual_cues=["kettle, steaming", "stove on"],
+        estimated_duration="4 minutes"
+    )
+    engine.add_task_knowledge(TaskKnowledge(task_name="coffee_brewing", display_name="Coffee",
+                                            description="Brew", steps=[step]))
+    return engine
+
+
+def test_comma_in_visual_cue_is_preserved(engine):
+    match = engine.find_best_match("kettle steaming on the stove")[0]
+
+    assert match.visual_cues == ["kettle, steaming", "stove on"]
+    assert match.tools_needed == ["kettle, electric", "thermometer"]
+    assert match.completion_indicators == ["steam rising, whistle"]
+    assert "kettle, steaming" in match.matched_cues
+
+
+def test_result_lists_come_from_step_table(engine):
+    match = engine.find_best_match("kettle steaming on the stove")[0]
+    _, step = engine.step_table[engine._snapshot.doc_id("coffee_brewing", 1)]
+
+    assert match.visual_cues is step.visual_cues
@@ -0,0 +1,180 @@
+"""
+Task Hot Reload Tests
+
+Verifies the pieces used to hot-reload task YAML files:
+1. TaskKnowledgeLoader re-reads a cached task when its file changes
+2. TaskFileWatcher reports added, modified and removed files once
+3. RAGKnowledgeBase keys tasks by task_name, also when it differs from the file name
+4. A reload publishes new row versions and deletes the old ones only afterwards
+5. create_knowledge_base takes the watcher settings from rag_config.json
+"""
+
+import os
+import sys
+import time
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+import state_tracker.state_tracker as state_tracker_module
+from memory.rag.encoders import HashingEncoder
+from memory.rag.knowledge_base import RAGKnowledgeBase
+from memory.rag.task_loader import TaskKnowledgeLoader
+from memory.rag.task_watcher import TaskFileWatcher
+
+TASK_TEMPLATE = """task_name: {task_name}
+display_name: Coffee Brewing
+description: Brew pour-over coffee
+steps:
+  - step_id: 1
+    title: {title}
+    task_description: Heat water in the kettle to 93 degrees
+    tools_needed: [kettle]
+    completion_indicators: [steam rising]
+    visual_cues: [kettle on stove]
+    estimated_duration: 4 minutes
+"""
+
+
+def write_task(path, title="Heat water", task_name="coffee_brewing"):
+    path.write_text(TASK_TEMPLATE.format(task_name=task_name, title=title), encoding='utf-8')
+    # Make sure the modification time moves even on coarse-grained filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestTaskLoaderCache:
+    """mtime-aware task cache"""
+
+    def test_cached_task_is_reused_while_file_is_unchanged(self, tmp_path):
+        write_task(tmp_path / "coffee_brewing.yaml")
+        loader = TaskKnowledgeLoader(tmp_path)
+
+        first = loader.load_task("coffee_brewing")
+        assert loader.load_task("coffee_brewing") is first
+
+    def test_modified_file_is_reloaded(self, tmp_path):
+        task_file = tmp_path / "coffee_brewing.yaml"
+        write_task(task_file)
+        loader = TaskKnowledgeLoader(tmp_path)
+        loader.load_task("coffee_brewing")
+
+        write_task(task_file, title="Heat filtered water")
+        assert loader.load_task("coffee_brewing").steps[0].title == "Heat filtered water"
+
+
+class TestTaskFileWatcher:
+    """Directory polling"""
+
+    def test_poll_reports_each_change_once(self, tmp_path):
+        changes = []
+        watcher = TaskFileWatcher(tmp_path, lambda *change: changes.append(change))
+        write_task(tmp_path / "coffee_brewing.yaml")
+        watcher.prime()
+
+        write_task(tmp_path / "coffee_brewing.yaml", title="Heat filtered water")
+        write_task(tmp_path / "tea.yaml", task_name="tea")
+        watcher.poll()
+        (tmp_path / "tea.yaml").unlink()
+        watcher.poll()
+        watcher.poll()
+
+        assert changes == [
+            ([tmp_path / "tea.yaml"], [tmp_path / "coffee_brewing.yaml"], []),
+            ([], [], [tmp_path / "tea.yaml"]),
+        ]
+
+    def test_background_thread_invokes_callback(self, tmp_path):
+        changes = []
+        watcher = TaskFileWatcher(tmp_path, lambda *change: changes.append(change), poll_interval=0.05)
+        watcher.start()
+        try:
+            write_task(tmp_path / "coffee_brewing.yaml")
+            deadline = time.time() + 2.0
+            while not changes and time.time() < deadline:
+                time.sleep(0.02)
+        finally:
+            watcher.stop()
+
+        assert changes and changes[0][0] == [tmp_path / "coffee_brewing.yaml"]
+        assert not watcher.is_running
+
+
+@pytest.fixture
+def knowledge_base(tmp_path):
+    tasks_directory = tmp_path / "tasks"
+    tasks_directory.mkdir()
+    write_task(tasks_directory / "pour_over.yaml", task_name="coffee_brewing")
+    knowledge_base = RAGKnowledgeBase(
+        tasks_directory=str(tasks_directory),
+        cache_dir=str(tmp_path / "embeddings"),
+        encoder=HashingEncoder(dimension=64)
+    )
+    knowledge_base.initialize()
+    return knowledge_base
+
+
+class TestKnowledgeBaseReload:
+    """Task keys and atomic row replacement"""
+
+    def test_tasks_are_keyed_by_task_name(self, knowledge_base):
+        task_file = knowledge_base.tasks_directory / "pour_over.yaml"
+        assert list(knowledge_base.loaded_tasks) == ["coffee_brewing"]
+        assert knowledge_base.get_task_summary("coffee_brewing")["task_name"] == "coffee_brewing"
+
+        write_task(task_file, title="Heat filtered water")
+        summary = knowledge_base.apply_task_file_changes([], [task_file], [])
+        assert summary["reloaded"] == ["coffee_brewing"]
+        assert knowledge_base.get_step_details("coffee_brewing", 1)["title"] == "Heat filtered water"
+
+        task_file.unlink()
+        assert knowledge_base.apply_task_file_changes([], [], [task_file])["removed"] == ["coffee_brewing"]
+        assert knowledge_base.loaded_tasks == {}
+        assert knowledge_base.vector_engine.task_knowledge == {}
+
+    def test_reload_replaces_rows_after_publishing(self, knowledge_base):
+        engine = knowledge_base.vector_engine
+        before = engine._snapshot
+        old_row = before.doc_id("coffee_brewing", 1)
+
+        write_task(knowledge_base.tasks_directory / "pour_over.yaml", title="Heat filtered water")
+        assert knowledge_base.reload_task("coffee_brewing")
+        new_row = engine._snapshot.doc_id("coffee_brewing", 1)
+
+        # The old snapshot still maps the old row to the old step
+        assert new_row != old_row
+        assert before.step_table[old_row][1].title == "Heat water"
+        assert engine.collection.get(include=[])["ids"] == [new_row]
+
+
+def test_create_knowledge_base_reads_hot_reload_config(monkeypatch):
+    watchers = []
+
+    class FakeKnowledgeBase:
+        snapshot_path = None
+
+        def __init__(self, **kwargs):
+            pass
+
+        def initialize(self, **kwargs):
+            pass
+
+        def start_task_watcher(self, poll_interval=1.0):
+            watchers.append(poll_interval)
+
+    monkeypatch.setattr(state_tracker_module, "RAGKnowledgeBase", FakeKnowledgeBase)
+    config = {"task_hot_reload": {"enabled": False, "poll_interval": 5.0}}
+    monkeypatch.setattr(state_tracker_module, "load_rag_config", lambda: config)
+
+    state_tracker_module.create_knowledge_base()
+    assert watchers == []
+
+    config["task_hot_reload"]["enabled"] = True
+    state_tracker_module.create_knowledge_base()
+    assert watchers == [5.0]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
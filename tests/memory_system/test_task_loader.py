@@ -0,0 +1,106 @@
+"""
+Task Loader Tests
+
+Verifies TaskKnowledgeLoader.load_all_tasks:
+1. Parallel (process pool) and sequential loading give the same tasks, and
+   the mode follows the number of files to parse
+2. Invalid files produce structured TaskLoadError entries with the same
+   messages as validate_task_file, in both modes
+3. Unchanged files are served from the cache on the next load
+"""
+
+import os
+import sys
+
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.task_loader import TaskKnowledgeLoader, TaskLoadError
+from memory.rag.validation import validate_task_file
+
+TASK_TEMPLATE = """task_name: {task_name}
+display_name: {task_name}
+description: Generated task
+steps:
+  - step_id: 1
+    title: First step
+    task_description: Do the first thing
+    tools_needed: [hands]
+    completion_indicators: [done]
+    visual_cues: [hands on counter]
+    estimated_duration: 1 minute
+"""
+
+
+@pytest.fixture
+def library(tmp_path):
+    for i in range(6):
+        name = f"task_{i}"
+        (tmp_path / f"{name}.yaml").write_text(TASK_TEMPLATE.format(task_name=name), encoding='utf-8')
+    (tmp_path / "broken.yaml").write_text("task_name: broken\nsteps: [\n", encoding='utf-8')
+    (tmp_path / "incomplete.yaml").write_text("task_name: incomplete\n", encoding='utf-8')
+    (tmp_path / "listed.yaml").write_text("- task_name: listed\n", encoding='utf-8')
+    return tmp_path
+
+
+class TestLoadAllTasks:
+    """Library loading"""
+
+    def test_parallel_matches_sequential(self, library):
+        sequential = TaskKnowledgeLoader(library).load_all_tasks(parallel=False)
+        parallel_loader = TaskKnowledgeLoader(library, max_workers=2)
+        parallel = parallel_loader.load_all_tasks(parallel=True)
+
+        assert sorted(parallel) == sorted(sequential) == [f"task_{i}" for i in range(6)]
+        assert parallel["task_3"] == sequential["task_3"]
+        assert parallel_loader.get_performance_stats()["last_load"]["mode"] == "process_pool"
+
+    def test_mode_follows_file_count(self, library):
+        small = TaskKnowledgeLoader(library, max_workers=2)
+        small.load_all_tasks()
+        assert small.last_load_stats["parsed"] < small.PARALLEL_MIN_FILES
+        assert small.last_load_stats["mode"] == "sequential"
+
+        large = TaskKnowledgeLoader(library, max_workers=2)
+        large.PARALLEL_MIN_FILES = 4
+        large.load_all_tasks()
+        assert large.last_load_stats["mode"] == "process_pool"
+        assert large.last_load_stats["workers"] == 2
+
+    def test_invalid_files_report_structured_errors(self, library):
+        loader = TaskKnowledgeLoader(library)
+        loader.load_all_tasks(parallel=False)
+
+        errors = {error.task_name: error for error in loader.load_errors}
+        assert set(errors) == {"broken", "incomplete", "listed"}
+        assert isinstance(errors["broken"], TaskLoadError)
+        assert errors["broken"].stage == "parse"
+        assert errors["incomplete"].stage == "validate"
+        assert any("display_name" in message for message in errors["incomplete"].errors)
+
+    def test_pool_workers_apply_file_validation(self, library):
+        loader = TaskKnowledgeLoader(library, max_workers=2)
+        loader.load_all_tasks(parallel=True)
+
+        errors = {error.task_name: error for error in loader.load_errors}
+        for name in ("incomplete", "listed"):
+            assert errors[name].stage == "validate"
+            assert errors[name].errors == validate_task_file(library / f"{name}.yaml")[1]
+
+    def test_unchanged_files_come_from_cache_with_timings(self, library):
+        loader = TaskKnowledgeLoader(library)
+        first = loader.load_all_tasks(parallel=False)
+        second = loader.load_all_tasks(parallel=False)
+
+        stats = loader.get_performance_stats()
+        assert second["task_0"] is first["task_0"]
+        assert stats["last_load"]["cached"] == 6
+        assert stats["last_load"]["parsed"] == 3  # the three invalid files are retried
+        assert set(stats["file_timings"]["task_0"]) >= {"read_ms", "parse_ms", "validate_ms", "total_ms"}
+        assert len(stats["load_errors"]) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])
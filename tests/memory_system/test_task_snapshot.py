@@ -0,0 +1,136 @@
+"""
+Task Snapshot Tests
+
+Verifies the compiled task library snapshot:
+1. A saved snapshot round-trips tasks and embeddings
+2. Editing a source file or changing the encoder makes it stale
+3. The file holds plain builtins only and other formats or versions are rejected
+4. Task metadata with YAML dates is stored as strings and the snapshot still loads
+"""
+
+import datetime
+import os
+import pickle
+import sys
+
+import numpy as np
+import pytest
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'src'))
+
+from memory.rag.task_loader import TaskKnowledge, TaskStep
+from memory.rag.task_snapshot import (
+    SNAPSHOT_FORMAT,
+    SNAPSHOT_FORMAT_VERSION,
+    TaskSnapshot,
+    compute_source_hashes,
+    load_task_snapshot,
+    save_task_snapshot,
+)
+
+
+@pytest.fixture
+def tasks_directory(tmp_path):
+    directory = tmp_path / "tasks"
+    directory.mkdir()
+    (directory / "coffee_brewing.yaml").write_text("task_name: coffee_brewing\n", encoding='utf-8')
+    return directory
+
+
+def make_snapshot(tasks_directory, model_version="v1"):
+    step = TaskStep(
+        step_id=1,
+        title="Heat water",
+        task_description="Heat water in the kettle",
+        tools_needed=["kettle"],
+        completion_indicators=["steam rising"],
+        visual_cues=["kettle on stove"],
+        estimated_duration="4 minutes"
+    )
+    task = TaskKnowledge(
+        task_name="coffee_brewing",
+        display_name="Coffee Brewing",
+        description="Brew coffee",
+        steps=[step]
+    )
+    return TaskSnapshot(
+        model_name="fake-model",
+        model_version=model_version,
+        source_hashes=compute_source_hashes(tasks_directory),
+        tasks={"coffee_brewing": task},
+        embeddings={"coffee_brewing": {1: np.array([0.6, 0.8], dtype=np.float32)}},
+        embedding_keys={"coffee_brewing": {1: "key-1"}}
+    )
+
+
+class TestTaskSnapshot:
+    """Snapshot persistence and staleness checks"""
+
+    def test_round_trip(self, tasks_directory, tmp_path):
+        path = save_task_snapshot(make_snapshot(tasks_directory), tmp_path / "snapshot.pkl")
+
+        snapshot = load_task_snapshot(path, tasks_directory, "fake-model", "v1")
+        assert snapshot is not None
+        assert snapshot.tasks["coffee_brewing"].steps[0].title == "Heat water"
+        np.testing.assert_allclose(snapshot.embeddings["coffee_brewing"][1], [0.6, 0.8])
+        assert snapshot.embedding_keys["coffee_brewing"] == {1: "key-1"}
+
+    def test_edited_source_makes_snapshot_stale(self, tasks_directory, tmp_path):
+        path = save_task_snapshot(make_snapshot(tasks_directory), tmp_path / "snapshot.pkl")
+        (tasks_directory / "coffee_brewing.yaml").write_text("task_name: edited\n", encoding='utf-8')
+
+        assert load_task_snapshot(path, tasks_directory, "fake-model", "v1") is None
+
+    def test_added_source_makes_snapshot_stale(self, tasks_directory, tmp_path):
+        path = save_task_snapshot(make_snapshot(tasks_directory), tmp_path / "snapshot.pkl")
+        (tasks_directory / "tea.yml").write_text("task_name: tea\n", encoding='utf-8')
+
+        assert load_task_snapshot(path, tasks_directory, "fake-model", "v1") is None
+
+    def test_encoder_change_makes_snapshot_stale(self, tasks_directory, tmp_path):
+        path = save_task_snapshot(make_snapshot(tasks_directory), tmp_path / "snapshot.pkl")
+
+        assert load_task_snapshot(path, tasks_directory, "fake-model", "v2") is None
+
+    def test_missing_or_corrupt_snapshot_returns_none(self, tasks_directory, tmp_path):
+        assert load_task_snapshot(tmp_path / "missing.pkl", tasks_directory, "fake-model", "v1") is None
+
+        corrupt = tmp_path / "corrupt.pkl"
+        corrupt.write_bytes(b"not a pickle")
+        assert load_task_snapshot(corrupt, tasks_directory, "fake-model", "v1") is None
+
+    def test_file_holds_plain_data_with_format_key(self, tasks_directory, tmp_path):
+        path = save_task_snapshot(make_snapshot(tasks_directory), tmp_path / "snapshot.pkl")
+        with open(path, 'rb') as f:
+            payload = pickle.load(f)
+
+        assert (payload["format"], payload["format_version"]) == (SNAPSHOT_FORMAT, SNAPSHOT_FORMAT_VERSION)
+        assert isinstance(payload["tasks"]["coffee_brewing"], dict)
+        assert isinstance(payload["embeddings"]["coffee_brewing"][1], tuple)
+
+        payload["format_version"] = SNAPSHOT_FORMAT_VERSION + 1
+        with open(path, 'wb') as f:
+            pickle.dump(payload, f)
+        assert load_task_snapshot(path, tasks_directory, "fake-model", "v1") is None
+
+    def test_pickled_objects_are_refused(self, tasks_directory, tmp_path):
+        path = tmp_path / "snapshot.pkl"
+        with open(path, 'wb') as f:
+            pickle.dump({"format": SNAPSHOT_FORMAT, "format_version": SNAPSHOT_FORMAT_VERSION,
+                         "tasks": make_snapshot(tasks_directory).tasks}, f)
+
+        assert load_task_snapshot(path, tasks_directory, "fake-model", "v1") is None
+
+
+    def test_date_metadata_is_stored_as_string(self, tasks_directory, tmp_path):
+        snapshot = make_snapshot(tasks_directory)
+        snapshot.tasks["coffee_brewing"].metadata = {"created": datetime.date(2024, 1, 5), "tags": ["hot"]}
+        path = save_task_snapshot(snapshot, tmp_path / "snapshot.pkl")
+
+        loaded = load_task_snapshot(path, tasks_directory, "fake-model", "v1")
+        assert loaded is not None
+        assert loaded.tasks["coffee_brewing"].metadata == {"created": "2024-01-05", "tags": ["hot"]}
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])